@@ -0,0 +1,100 @@
+"""
+MongoDB versus SQLite on the two access patterns that dominate the bot.
+
+- `/start`: one projected settings read plus one user upsert per request.
+- broadcast: streaming every stored user ID once.
+
+The SQLite file lives in a temporary directory. MongoDB is measured against
+`MONGODB_URL` (scratch database `FSUB_BENCHMARK`) and skipped when unreachable.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.backends
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from async_pymongo import AsyncClient
+
+from bot.base.mongo import Database
+from bot.base.sqlite import SQLiteDatabase
+from bot.utils import config
+
+DOC_ID = 1
+SETTINGS_KEYS = ["START_TEXT", "FORCE_TEXT", "PROTECT_CONTENT", "FSUB_CHATS"]
+START_REQUESTS = 500
+BROADCAST_USERS = 100_000
+
+
+async def bench(database) -> Dict[str, float]:
+    await database.set_values(
+        DOC_ID,
+        {"START_TEXT": "Hello!", "FORCE_TEXT": "Join first!", "PROTECT_CONTENT": False},
+    )
+    for offset in range(0, BROADCAST_USERS, 10_000):
+        await database.add_users(range(offset, offset + 10_000))
+
+    timings: List[float] = []
+    for _ in range(START_REQUESTS):
+        user_id = random.randrange(BROADCAST_USERS * 2)
+        start = time.perf_counter()
+        await database.get_fields(DOC_ID, SETTINGS_KEYS)
+        await database.add_users([user_id])
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    count = 0
+    async for _ in database.iter_users():
+        count += 1
+    broadcast_s = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "start_p50": statistics.median(timings),
+        "start_p95": timings[int(len(timings) * 0.95)],
+        "broadcast_s": broadcast_s,
+        "users": count,
+    }
+
+
+def report(name: str, result: Dict[str, float]) -> None:
+    print(
+        f"{name:>7} | /start p50 {result['start_p50']:7.2f} ms | "
+        f"p95 {result['start_p95']:7.2f} ms | "
+        f"broadcast scan {result['users']} users in {result['broadcast_s']:.2f} s"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_db = SQLiteDatabase(os.path.join(tmp, "bench.sqlite3"))
+        await sqlite_db.connect()
+        try:
+            report("SQLite", await bench(sqlite_db))
+        finally:
+            await sqlite_db.close()
+
+    mongo_db = Database()
+    mongo_db.client = AsyncClient(config.MONGODB_URL, serverSelectionTimeoutMS=3000)
+    mongo_db.db = mongo_db.client["FSUB_BENCHMARK"]["COLLECTIONS"]
+    mongo_db.users = mongo_db.client["FSUB_BENCHMARK"]["BOT_USERS"]
+    try:
+        await mongo_db.client.server_info()
+    except Exception as exc:
+        print(f"MongoDB | skipped ({exc.__class__.__name__})")
+        return
+
+    try:
+        report("MongoDB", await bench(mongo_db))
+    finally:
+        await mongo_db.client.drop_database("FSUB_BENCHMARK")
+        await mongo_db.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
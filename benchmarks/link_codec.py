@@ -0,0 +1,79 @@
+"""
+Size and speed of `LinkCodec` codes against the legacy `id-<n>` codes.
+
+For each link shape it reports the code length and the encode and decode
+time per code (correctness is covered by tests/test_link_codec.py).
+Legacy codes only exist for single IDs and ranges; their decode is the
+old float division by the configured channel.
+
+Usage:
+    python -m benchmarks.link_codec [iterations]
+"""
+
+import sys
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from bot.helpers.link_codec import link_codec
+from bot.helpers.url_safe import url_safe
+
+ITERATIONS = 100_000
+CHANNEL = -1001234567890
+OTHER_CHANNEL = -1009876543210
+
+SHAPES: List[Tuple[str, int, Sequence[int]]] = [
+    ("single", CHANNEL, [48_213]),
+    ("single, other channel", OTHER_CHANNEL, [48_213]),
+    ("range", CHANNEL, range(48_213, 48_713)),
+    ("multi-range", CHANNEL, [*range(100, 140), *range(300, 320), 512, 777, *range(900, 950)]),
+]
+
+
+def legacy_encode(chat_id: int, message_ids: Sequence[int]) -> Optional[str]:
+    if len(message_ids) == 1:
+        return url_safe.encode_data(f"id-{message_ids[0] * abs(chat_id)}")
+    if isinstance(message_ids, range):
+        first, last = message_ids[0] * abs(chat_id), message_ids[-1] * abs(chat_id)
+        return url_safe.encode_data(f"id-{first}-{last}")
+    return None
+
+
+def legacy_decode(code: str) -> Sequence[int]:
+    parts = url_safe.decode_data(code).split("-")
+    ids = [int(int(part) / abs(CHANNEL)) for part in parts[1:]]
+    return ids if len(ids) == 1 else range(ids[0], ids[1] + 1)
+
+
+def per_code(func: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    for shape, chat_id, message_ids in SHAPES:
+        code = link_codec.encode(chat_id, message_ids)
+        candidates = [chat_id]
+        encode_us = per_code(lambda: link_codec.encode(chat_id, message_ids), iterations)
+        decode_us = per_code(lambda: link_codec.decode(code, candidates), iterations)
+        print(
+            f"{shape:>21} | codec  | {len(code):3} chars | "
+            f"encode {encode_us:5.2f} us | decode {decode_us:5.2f} us"
+        )
+
+        legacy = legacy_encode(chat_id, message_ids)
+        if legacy is None:
+            print(f"{shape:>21} | legacy | not representable")
+            continue
+        encode_us = per_code(lambda: legacy_encode(chat_id, message_ids), iterations)
+        decode_us = per_code(lambda: legacy_decode(legacy), iterations)
+        print(
+            f"{shape:>21} | legacy | {len(legacy):3} chars | "
+            f"encode {encode_us:5.2f} us | decode {decode_us:5.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
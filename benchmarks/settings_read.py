@@ -0,0 +1,68 @@
+"""
+Per-call latency of `Database.get_doc` versus `Database.get_fields` as the
+config document grows.
+
+The config document used to carry the legacy `BOT_USERS` array, so every
+settings getter pulled the whole array just to read one key. This benchmark
+fills a scratch document with arrays of increasing size and times both reads.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.settings_read
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from async_pymongo import AsyncClient
+
+from bot.base.mongo import Database
+from bot.utils import config
+
+DOC_ID = 1
+SIZES = [0, 10_000, 100_000, 500_000]
+ROUNDS = 100
+
+
+async def measure(call: Callable[[], Awaitable[object]]) -> List[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main() -> None:
+    database = Database()
+    database.client = AsyncClient(config.MONGODB_URL)
+    database.db = database.client["FSUB_BENCHMARK"]["COLLECTIONS"]
+
+    print(f"{'users':>8} | {'get_doc p50':>12} | {'get_fields p50':>14} | speedup")
+    try:
+        for size in SIZES:
+            await database.db.replace_one(
+                {"_id": DOC_ID},
+                {"_id": DOC_ID, "START_TEXT": ["Hello!"], "BOT_USERS": list(range(size))},
+                upsert=True,
+            )
+
+            full = await measure(lambda: database.get_doc(DOC_ID))
+            projected = await measure(
+                lambda: database.get_fields(DOC_ID, ["START_TEXT"])
+            )
+
+            full_p50 = statistics.median(full)
+            projected_p50 = statistics.median(projected)
+            print(
+                f"{size:>8} | {full_p50:>9.2f} ms | {projected_p50:>11.2f} ms | "
+                f"{full_p50 / projected_p50:>6.1f}x"
+            )
+    finally:
+        await database.client.drop_database("FSUB_BENCHMARK")
+        await database.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Memory and speed of `UserIndex` against a plain `set` of user IDs.
+
+For each size it reports the memory held by the structure (tracemalloc, which
+also inflates the build times), the membership lookup rate, the cost of
+adding a batch of new users one by one (including the merges they trigger),
+and a full ascending iteration as done by a broadcast.
+
+Usage:
+    python -m benchmarks.user_index [size ...]
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Callable, List, Tuple
+
+from bot.helpers.user_index import UserIndex
+
+SIZES = [1_000_000, 10_000_000]
+LOOKUPS = 200_000
+NEW_USERS = 20_000
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, float]:
+    gc.collect()
+    tracemalloc.start()
+    structure = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, size / 1024 / 1024
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds / 1_000_000:6.2f} M/s"
+
+
+def bench(size: int) -> None:
+    # Telegram user IDs are positive and sparse; spread the sample the same way
+    ids = array("q", range(1, size * 4, 4))
+    probes: List[int] = [random.randrange(size * 4) for _ in range(LOOKUPS)]
+    new_ids: List[int] = [random.randrange(size * 4, size * 8) for _ in range(NEW_USERS)]
+
+    for name, build in (
+        ("set", lambda: set(ids)),
+        ("UserIndex", lambda: UserIndex(array("q", ids))),
+    ):
+        start = time.perf_counter()
+        structure, mib = measure(build)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user_id in probes:
+            user_id in structure
+        lookup_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user_id in new_ids:
+            structure.add(user_id)
+        add_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        count = sum(1 for _ in (sorted(structure) if name == "set" else structure))
+        iter_s = time.perf_counter() - start
+
+        print(
+            f"{size:>10} | {name:>9} | {mib:8.1f} MiB | build {build_s:5.2f} s | "
+            f"lookup {rate(LOOKUPS, lookup_s)} | add {rate(NEW_USERS, add_s)} | "
+            f"iterate {count} in {iter_s:5.2f} s"
+        )
+        del structure
+
+
+def main() -> None:
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    for size in sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
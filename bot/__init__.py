@@ -11,6 +11,9 @@ from .db_funcs import (
     get_broadcast_data_ids,
     get_users,
     initial_database,
+    migrate_users,
+    prune_page_codes,
+    settings,
     update_force_text_msg,
     update_generate_status,
     update_protect_content,
@@ -18,11 +21,25 @@ from .db_funcs import (
 )
 from .decorators import authorized_users_only
 from .helpers import (
+    CAPTION_FIELDS,
+    USER_FIELDS,
+    Template,
     admin_buttons,
+    channel_registry,
+    delivery_engine,
     helper_buttons,
     helper_handlers,
     join_buttons,
+    link_codec,
+    link_manifests,
+    media_cache,
+    member_index,
+    message_cache,
+    message_fetcher,
+    message_index,
+    tombstones,
     url_safe,
+    user_registry,
 )
 from .utils import config, logger
 
@@ -41,16 +58,33 @@ __all__ = [
     "get_broadcast_data_ids",
     "get_users",
     "initial_database",
+    "migrate_users",
+    "prune_page_codes",
+    "settings",
     "update_force_text_msg",
     "update_generate_status",
     "update_protect_content",
     "update_start_text_msg",
     "authorized_users_only",
     "admin_buttons",
+    "channel_registry",
+    "delivery_engine",
     "helper_buttons",
     "helper_handlers",
     "join_buttons",
+    "link_codec",
+    "link_manifests",
+    "media_cache",
+    "member_index",
+    "message_cache",
+    "message_fetcher",
+    "message_index",
+    "CAPTION_FIELDS",
+    "USER_FIELDS",
+    "Template",
+    "tombstones",
     "url_safe",
+    "user_registry",
     "config",
     "logger",
 ]
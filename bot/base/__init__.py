@@ -1,5 +1,5 @@
+from .backend import database
 from .client import bot
 from .exception import ForceStopLoop
-from .mongo import database
 
 __all__ = ["bot", "ForceStopLoop", "database"]
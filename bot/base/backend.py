@@ -0,0 +1,11 @@
+from typing import Union
+
+from bot.utils import config
+
+from .mongo import Database
+from .sqlite import SQLiteDatabase
+
+# Select the storage backend configured by `DATABASE_BACKEND`
+database: Union[Database, SQLiteDatabase] = (
+    SQLiteDatabase() if config.DATABASE_BACKEND == "sqlite" else Database()
+)
@@ -7,7 +7,7 @@ from hydrogram.types import BotCommand, BotCommandScopeAllPrivateChats
 from bot.utils import BOT_ID, config, logger
 
 from .exception import ForceStopLoop
-from .mongo import database
+from .backend import database
 
 # Attempt to use uvloop for the event loop if available
 try:
@@ -25,10 +25,10 @@ class Bot(Client):
 
     Methods:
         start() -> None:
-            Starts the bot and connects to MongoDB.
+            Starts the bot and connects to the database.
 
         stop() -> None:
-            Stops the bot and closes the MongoDB connection.
+            Stops the bot and closes the database connection.
 
         bot_commands_setup() -> None:
             Sets up bot commands for users.
@@ -49,9 +49,9 @@ class Bot(Client):
 
     async def start(self) -> None:
         """
-        Starts the bot, connecting to MongoDB and setting up commands.
+        Starts the bot, connecting to the database and setting up commands.
         """
-        logger.info("MongoDB: Connecting...")
+        logger.info("Database: Connecting...")
         await database.connect()
 
         logger.info("Bot: Starting...")
@@ -66,7 +66,7 @@ class Bot(Client):
 
     async def stop(self) -> None:
         """
-        Stops the bot, and closes MongoDB connection.
+        Stops the bot, and closes the database connection.
         """
         logger.info("Bot: Stopping...")
         try:
@@ -76,7 +76,7 @@ class Bot(Client):
         else:
             logger.info("Bot: Stopped")
 
-        logger.info("MongoDB: Closing...")
+        logger.info("Database: Closing...")
         await database.close()
 
     async def bot_commands_setup(self) -> None:
@@ -1,6 +1,8 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 
 from async_pymongo import AsyncClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 
 from bot.utils import config, logger
 
@@ -11,9 +13,17 @@ class Database:
     """
     A class to manage MongoDB connections and operations.
 
+    Every write to a document also increments its `VERSION_KEY` field, so
+    other processes can tell that the document changed.
+
     Attributes:
+        VERSION_KEY (str): The field counting writes to a document.
+        SUPPORTS_WATCH (bool): True; `watch_doc` still needs a replica set.
+        WATCH_UNSUPPORTED_CODE (int): The error code of `watch_doc` on a
+            server without change streams.
         client (Optional[AsyncClient]): The MongoDB client instance.
         db (Optional[Any]): The database instance.
+        users (Optional[Any]): The per-user collection, one document per user ID.
 
     Methods:
         connect() -> None:
@@ -28,23 +38,71 @@ class Database:
         get_doc(_id: int) -> Optional[Dict[str, Any]]:
             Retrieves a document by its ID.
 
-        add_value(_id: int, key: str, value: Any) -> None:
+        get_fields(_id: int, keys: Iterable[str]) -> Dict[str, Any]:
+            Retrieves only the given fields of a document.
+
+        ensure_defaults(_id: int, defaults: Dict[str, Any], ...) -> Dict[str, Any]:
+            Fills in missing fields and reads the document back, in one round trip.
+
+        set_value(_id: int, key: str, value: Any) -> int:
+            Sets a document's scalar field atomically.
+
+        set_values(_id: int, values: Dict[str, Any]) -> int:
+            Sets several scalar fields atomically.
+
+        toggle_value(_id: int, key: str, default: bool) -> Tuple[bool, int]:
+            Flips a document's boolean field atomically.
+
+        add_value(_id: int, key: str, value: Any) -> int:
             Adds a value to a document's list field.
 
-        del_value(_id: int, key: str, value: Any) -> None:
+        del_value(_id: int, key: str, value: Any) -> Optional[int]:
             Removes a value from a document's list field.
 
-        clear_value(_id: int, key: str) -> None:
+        clear_value(_id: int, key: str) -> Optional[int]:
             Clears a field in a document.
 
         del_doc(_id: int) -> None:
             Deletes a document by its ID.
+
+        get_slice(_id: int, key: str, limit: Optional[int]) -> List[Any]:
+            Retrieves the leading items of a document's list field.
+
+        del_values(_id: int, key: str, values: List[Any]) -> None:
+            Removes several values from a document's list field.
+
+        add_users(user_ids: Iterable[int]) -> int:
+            Inserts user IDs into the users collection in bulk.
+
+        del_users(user_ids: Iterable[int]) -> None:
+            Removes user IDs from the users collection in bulk.
+
+        iter_users() -> AsyncIterator[int]:
+            Streams every user ID from the users collection.
+
+        count_users() -> int:
+            Counts the documents in the users collection.
+
+        watch_doc(_id: int) -> AsyncIterator[Tuple[Set[str], Optional[int]]]:
+            Streams the top-level fields changed on a document, with its version.
+
+        watch_unsupported(exc: Exception) -> bool:
+            Tells whether a `watch_doc` error means there are no change streams.
+
+        get_records / set_records / del_records / iter_records:
+            Keyed records in auxiliary collections, one document per record.
     """
 
+    VERSION_KEY: str = "SETTINGS_VERSION"
+    SUPPORTS_WATCH: bool = True
+    # "The $changeStream stage is only supported on replica sets"
+    WATCH_UNSUPPORTED_CODE: int = 40573
+
     def __init__(self) -> None:
         """Initializes the Database instance with no active connection."""
         self.client: Optional[AsyncClient] = None
         self.db: Optional[Any] = None
+        self.users: Optional[Any] = None
 
     async def connect(self) -> None:
         """Establishes a connection to the MongoDB server."""
@@ -52,6 +110,8 @@ class Database:
             try:
                 self.client = AsyncClient(config.MONGODB_URL)
                 self.db = self.client["FSUB_DATABASE"]["COLLECTIONS"]
+                # `_id` carries MongoDB's built-in unique index, so no extra index is needed
+                self.users = self.client["FSUB_DATABASE"]["BOT_USERS"]
                 logger.info("MongoDB: Connected")
             except Exception as exc:
                 raise ForceStopLoop(str(exc))
@@ -62,6 +122,7 @@ class Database:
             await self.client.close()
             self.client = None
             self.db = None
+            self.users = None
             logger.info("MongoDB: Closed")
         else:
             logger.info("MongoDB: Already Closed")
@@ -88,34 +149,198 @@ class Database:
         document = await self.db.find_one({"_id": _id})
         return document
 
-    async def add_value(self, _id: int, key: str, value: Any) -> None:
+    async def get_fields(self, _id: int, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieves only the given fields of a document.
+
+        A projection keeps the other fields (such as large lists) on the server.
+
+        Args:
+            _id (int): The ID of the document.
+            keys (Iterable[str]): The fields to retrieve.
+
+        Returns:
+            Dict[str, Any]: The fields that exist, or an empty dict if the
+            document is not found.
+        """
+        projection = {key: 1 for key in keys}
+        projection["_id"] = 0
+        document = await self.db.find_one({"_id": _id}, projection)
+        return document or {}
+
+    async def ensure_defaults(
+        self,
+        _id: int,
+        defaults: Dict[str, Any],
+        keys: Iterable[str] = (),
+        unwrap: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Fills in missing fields and reads the document back, in one round trip.
+
+        A single upserting `findOneAndUpdate` with a pipeline `$set` writes
+        each default only where the field is missing or null (a plain
+        `$setOnInsert` would skip documents created by older versions), unwraps
+        legacy one-element arrays and returns the resulting fields. The version
+        is only bumped when something was actually written.
+
+        Args:
+            _id (int): The ID of the document.
+            defaults (Dict[str, Any]): The fields and their default values.
+            keys (Iterable[str]): Extra fields to return besides `defaults`.
+            unwrap (Iterable[str]): Fields whose `[value]` form is unwrapped.
+
+        Returns:
+            Dict[str, Any]: The requested fields after the update, including
+            `VERSION_KEY`.
+        """
+        unwrap = set(unwrap)
+        fields, changed = {}, []
+        for key in unwrap | defaults.keys():
+            value = f"${key}"
+            if key in unwrap:
+                changed.append({"$isArray": value})
+                value = {"$cond": [{"$isArray": value}, {"$arrayElemAt": [value, 0]}, value]}
+            if key in defaults:
+                changed.append({"$eq": [{"$ifNull": [f"${key}", None]}, None]})
+                value = {"$ifNull": [value, {"$literal": defaults[key]}]}
+            fields[key] = value
+
+        version = {"$ifNull": [f"${self.VERSION_KEY}", 0]}
+        fields[self.VERSION_KEY] = {
+            "$cond": [{"$or": changed}, {"$add": [version, 1]}, version]
+        }
+
+        projection = {key: 1 for key in [*keys, *fields]}
+        projection["_id"] = 0
+        document = await self.db.find_one_and_update(
+            {"_id": _id},
+            [{"$set": fields}],
+            projection=projection,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return document or {}
+
+    async def set_value(self, _id: int, key: str, value: Any) -> int:
+        """Sets a document's scalar field atomically.
+
+        Args:
+            _id (int): The ID of the document.
+            key (str): The field to set.
+            value (Any): The new value.
+
+        Returns:
+            int: The document version after the write.
+        """
+        return await self.set_values(_id, {key: value})
+
+    async def set_values(self, _id: int, values: Dict[str, Any]) -> int:
+        """Sets several scalar fields atomically, in one `$set`.
+
+        Args:
+            _id (int): The ID of the document.
+            values (Dict[str, Any]): The fields and their new values.
+
+        Returns:
+            int: The document version after the write.
+        """
+        return await self._write(
+            _id, {"$set": values, "$inc": {self.VERSION_KEY: 1}}, upsert=True
+        )
+
+    async def _write(
+        self, _id: int, update: Dict[str, Any], upsert: bool = False
+    ) -> Optional[int]:
+        """Applies an update and returns the document version it produced.
+
+        `findOneAndUpdate` costs the same round trip as `updateOne` and
+        reports the version, so callers can tell their own writes apart.
+        """
+        document = await self.db.find_one_and_update(
+            {"_id": _id},
+            update,
+            projection={self.VERSION_KEY: 1},
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER,
+        )
+        return document.get(self.VERSION_KEY) if document else None
+
+    async def toggle_value(self, _id: int, key: str, default: bool) -> Tuple[bool, int]:
+        """Flips a document's boolean field atomically.
+
+        The read and the write happen in one `findOneAndUpdate`, so
+        concurrent toggles never lose an update.
+
+        Args:
+            _id (int): The ID of the document.
+            key (str): The field to flip.
+            default (bool): The value assumed when the field is missing.
+
+        Returns:
+            Tuple[bool, int]: The value after flipping and the document
+            version after the write.
+        """
+        version = f"${self.VERSION_KEY}"
+        document = await self.db.find_one_and_update(
+            {"_id": _id},
+            [
+                {
+                    "$set": {
+                        key: {"$not": [{"$ifNull": [f"${key}", default]}]},
+                        self.VERSION_KEY: {"$add": [{"$ifNull": [version, 0]}, 1]},
+                    }
+                }
+            ],
+            projection={key: 1, self.VERSION_KEY: 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return document[key], document[self.VERSION_KEY]
+
+    async def add_value(self, _id: int, key: str, value: Any) -> int:
         """Adds a value to a document's list field.
 
         Args:
             _id (int): The ID of the document.
             key (str): The field to which the value will be added.
             value (Any): The value to be added.
+
+        Returns:
+            int: The document version after the write.
         """
-        await self.db.update_one({"_id": _id}, {"$addToSet": {key: value}}, upsert=True)
+        return await self._write(
+            _id, {"$addToSet": {key: value}, "$inc": {self.VERSION_KEY: 1}}, upsert=True
+        )
 
-    async def del_value(self, _id: int, key: str, value: Any) -> None:
+    async def del_value(self, _id: int, key: str, value: Any) -> Optional[int]:
         """Removes a value from a document's list field.
 
         Args:
             _id (int): The ID of the document.
             key (str): The field from which the value will be removed.
             value (Any): The value to be removed.
+
+        Returns:
+            Optional[int]: The document version after the write, or None if
+            there is no such document.
         """
-        await self.db.update_one({"_id": _id}, {"$pull": {key: value}})
+        return await self._write(
+            _id, {"$pull": {key: value}, "$inc": {self.VERSION_KEY: 1}}
+        )
 
-    async def clear_value(self, _id: int, key: str) -> None:
+    async def clear_value(self, _id: int, key: str) -> Optional[int]:
         """Clears a field in a document.
 
         Args:
             _id (int): The ID of the document.
             key (str): The field to be cleared.
+
+        Returns:
+            Optional[int]: The document version after the write, or None if
+            there is no such document.
         """
-        await self.db.update_one({"_id": _id}, {"$unset": {key: ""}})
+        return await self._write(
+            _id, {"$unset": {key: ""}, "$inc": {self.VERSION_KEY: 1}}
+        )
 
     async def del_doc(self, _id: int) -> None:
         """Deletes a document by its ID.
@@ -125,5 +350,207 @@ class Database:
         """
         await self.db.delete_one({"_id": _id})
 
+    async def get_slice(
+        self, _id: int, key: str, limit: Optional[int] = None
+    ) -> List[Any]:
+        """Retrieves the leading items of a document's list field.
+
+        Only the requested slice travels over the wire, not the whole document.
+
+        Args:
+            _id (int): The ID of the document.
+            key (str): The list field to read.
+            limit (Optional[int]): The maximum number of items, or None for all.
 
-database: Database = Database()
+        Returns:
+            List[Any]: The items, or an empty list if the field is missing.
+        """
+        field = f"${key}"
+        pipeline = [
+            {"$match": {"_id": _id}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "items": {"$slice": [field, limit]} if limit else field,
+                }
+            },
+        ]
+        async for document in self.db.aggregate(pipeline):
+            items = document.get("items")
+            return items if isinstance(items, list) else []
+        return []
+
+    async def del_values(self, _id: int, key: str, values: List[Any]) -> None:
+        """Removes several values from a document's list field.
+
+        Args:
+            _id (int): The ID of the document.
+            key (str): The field from which the values will be removed.
+            values (List[Any]): The values to be removed.
+        """
+        await self.db.update_one(
+            {"_id": _id}, {"$pullAll": {key: values}, "$inc": {self.VERSION_KEY: 1}}
+        )
+
+    async def add_users(self, user_ids: Iterable[int]) -> int:
+        """Inserts user IDs into the users collection in bulk.
+
+        Existing IDs are left untouched, so the call is idempotent.
+
+        Args:
+            user_ids (Iterable[int]): The user IDs to insert.
+
+        Returns:
+            int: The number of newly inserted users.
+        """
+        requests = [
+            UpdateOne({"_id": user_id}, {"$setOnInsert": {"_id": user_id}}, upsert=True)
+            for user_id in user_ids
+        ]
+        if not requests:
+            return 0
+
+        result = await self.users.bulk_write(requests, ordered=False)
+        return result.upserted_count
+
+    async def del_users(self, user_ids: Iterable[int]) -> None:
+        """Removes user IDs from the users collection in bulk.
+
+        Args:
+            user_ids (Iterable[int]): The user IDs to remove.
+        """
+        user_ids = list(user_ids)
+        if user_ids:
+            await self.users.delete_many({"_id": {"$in": user_ids}})
+
+    async def iter_users(self, batch_size: int = 5000) -> AsyncIterator[int]:
+        """Streams every user ID from the users collection, in ascending order.
+
+        The sort is served by the `_id` index, so it costs nothing extra.
+
+        Args:
+            batch_size (int): The number of IDs fetched per cursor batch.
+
+        Yields:
+            int: A user ID.
+        """
+        cursor = (
+            self.users.find({}, {"_id": 1}).sort("_id", 1).batch_size(batch_size)
+        )
+        async for document in cursor:
+            yield document["_id"]
+
+    async def count_users(self) -> int:
+        """Counts the documents in the users collection.
+
+        Returns:
+            int: The number of stored users.
+        """
+        return await self.users.count_documents({})
+
+    def _records(self, collection: str) -> Any:
+        """Returns an auxiliary collection in the bot's database."""
+        return self.client["FSUB_DATABASE"][collection]
+
+    async def get_records(
+        self, collection: str, ids: Iterable[Any]
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Retrieves records by their IDs.
+
+        Args:
+            collection (str): The name of the collection.
+            ids (Iterable[Any]): The IDs of the records.
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: The records found, keyed by ID.
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+
+        cursor = self._records(collection).find({"_id": {"$in": ids}})
+        return {document["_id"]: document async for document in cursor}
+
+    async def set_records(
+        self, collection: str, records: Dict[Any, Dict[str, Any]]
+    ) -> None:
+        """Upserts records in bulk, setting the given fields on each.
+
+        Args:
+            collection (str): The name of the collection.
+            records (Dict[Any, Dict[str, Any]]): The fields to set, keyed by ID.
+        """
+        requests = [
+            UpdateOne({"_id": _id}, {"$set": fields}, upsert=True)
+            for _id, fields in records.items()
+        ]
+        if requests:
+            await self._records(collection).bulk_write(requests, ordered=False)
+
+    async def del_records(self, collection: str, ids: Iterable[Any]) -> None:
+        """Removes records in bulk.
+
+        Args:
+            collection (str): The name of the collection.
+            ids (Iterable[Any]): The IDs of the records.
+        """
+        ids = list(ids)
+        if ids:
+            await self._records(collection).delete_many({"_id": {"$in": ids}})
+
+    async def iter_records(
+        self, collection: str, batch_size: int = 5000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams every record of a collection.
+
+        Args:
+            collection (str): The name of the collection.
+            batch_size (int): The number of records fetched per cursor batch.
+
+        Yields:
+            Dict[str, Any]: A record, including its `_id`.
+        """
+        cursor = self._records(collection).find({}).batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
+    async def watch_doc(self, _id: int) -> AsyncIterator[Tuple[Set[str], Optional[int]]]:
+        """Streams the top-level fields changed on a document, with its version.
+
+        Requires a replica set (a single-node one is enough, e.g.
+        `mongod --replSet rs0` followed by `rs.initiate()`); on a standalone
+        server the first iteration raises `pymongo.errors.OperationFailure`.
+
+        Args:
+            _id (int): The ID of the document to watch.
+
+        Yields:
+            Tuple[Set[str], Optional[int]]: The changed fields (an empty set
+            when the whole document was replaced or deleted) and the
+            `VERSION_KEY` value the change wrote, if it wrote one.
+        """
+        pipeline = [{"$match": {"documentKey._id": _id}}]
+        async with self.db.watch(pipeline) as stream:
+            async for change in stream:
+                description = change.get("updateDescription")
+                if not description:
+                    yield set(), None
+                    continue
+
+                updated = description.get("updatedFields", {})
+                paths = [*updated, *description.get("removedFields", [])]
+                yield {path.split(".", 1)[0] for path in paths}, updated.get(self.VERSION_KEY)
+
+    def watch_unsupported(self, exc: Exception) -> bool:
+        """Tells whether a `watch_doc` error means the server has no change streams.
+
+        Args:
+            exc (Exception): The error raised while following the stream.
+
+        Returns:
+            bool: True for a standalone server, False for transient errors
+            (network, failover) after which the stream can be reopened.
+        """
+        return isinstance(exc, OperationFailure) and (
+            exc.code == self.WATCH_UNSUPPORTED_CODE or "replica set" in str(exc)
+        )
@@ -0,0 +1,354 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+from bot.utils import config, logger
+
+from .exception import ForceStopLoop
+
+
+class SQLiteDatabase:
+    """
+    A SQLite storage backend with the same interface as the MongoDB `Database`.
+
+    Documents are stored as JSON in a `docs` table, users in a separate
+    `users` table keyed by user ID, and keyed records of the auxiliary
+    collections in a `records` table (IDs stored JSON-encoded, so int and
+    str IDs survive a round trip). The file is opened in WAL mode, so reads
+    do not block on writes. Meant for small single-process deployments,
+    where it removes the network hop to a remote MongoDB.
+
+    Attributes:
+        VERSION_KEY (str): The field counting writes to a document.
+        SUPPORTS_WATCH (bool): False; there are no change streams, so
+            settings changed by another process are picked up by polling.
+        conn (Optional[aiosqlite.Connection]): The SQLite connection.
+
+    Methods:
+        connect() -> None:
+            Opens the SQLite file and creates the tables.
+
+        close() -> None:
+            Closes the SQLite connection.
+
+        list_docs() -> List[int]:
+            Lists all document IDs.
+
+        get_doc(_id: int) -> Optional[Dict[str, Any]]:
+            Retrieves a document by its ID.
+
+        get_fields(_id: int, keys: Iterable[str]) -> Dict[str, Any]:
+            Retrieves only the given fields of a document.
+
+        ensure_defaults / set_value / set_values / toggle_value / add_value /
+        del_value / clear_value / del_values / get_slice / del_doc:
+            Same semantics as the MongoDB `Database` methods.
+
+        add_users / del_users / iter_users / count_users:
+            Same semantics as the MongoDB `Database` methods.
+
+        get_records / set_records / del_records / iter_records:
+            Same semantics as the MongoDB `Database` methods.
+
+        watch_unsupported(exc: Exception) -> bool:
+            Always True; there is no `watch_doc`.
+    """
+
+    VERSION_KEY: str = "SETTINGS_VERSION"
+    SUPPORTS_WATCH: bool = False
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initializes the SQLiteDatabase instance with no active connection.
+
+        Args:
+            path (Optional[str]): The database file, `config.SQLITE_PATH` by default.
+        """
+        self.path: str = path or config.SQLITE_PATH
+        self.conn: Optional[aiosqlite.Connection] = None
+        # Serializes writes (and read-modify-write cycles) on the connection
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """Opens the SQLite file and creates the tables."""
+        try:
+            self.conn = await aiosqlite.connect(self.path)
+            await self.conn.execute("PRAGMA journal_mode=WAL")
+            await self.conn.execute("PRAGMA synchronous=NORMAL")
+            await self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs (_id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            await self.conn.execute("CREATE TABLE IF NOT EXISTS users (_id INTEGER PRIMARY KEY)")
+            await self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS records (collection TEXT NOT NULL, "
+                "_id TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (collection, _id))"
+            )
+            await self.conn.commit()
+            logger.info(f"SQLite: Connected ({self.path})")
+        except Exception as exc:
+            raise ForceStopLoop(str(exc))
+
+    async def close(self) -> None:
+        """Closes the SQLite connection."""
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+            logger.info("SQLite: Closed")
+        else:
+            logger.info("SQLite: Already Closed")
+
+    async def _load(self, _id: int) -> Optional[Dict[str, Any]]:
+        async with self.conn.execute("SELECT data FROM docs WHERE _id = ?", (_id,)) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def _update(
+        self, _id: int, mutate: Callable[[Dict[str, Any]], Any], upsert: bool = True
+    ) -> Tuple[Any, Optional[int]]:
+        """
+        Applies `mutate` to a document and bumps its version, atomically.
+
+        Returns `mutate`'s result and the new version, or (None, None) when
+        there is no document and `upsert` is off.
+        """
+        async with self._lock:
+            document = await self._load(_id)
+            if document is None:
+                if not upsert:
+                    return None, None
+                document = {}
+
+            result = mutate(document)
+            document[self.VERSION_KEY] = document.get(self.VERSION_KEY, 0) + 1
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO docs (_id, data) VALUES (?, ?)",
+                (_id, json.dumps(document)),
+            )
+            await self.conn.commit()
+            return result, document[self.VERSION_KEY]
+
+    async def list_docs(self) -> List[int]:
+        """Lists all document IDs."""
+        async with self.conn.execute("SELECT _id FROM docs") as cursor:
+            return [row[0] async for row in cursor]
+
+    async def get_doc(self, _id: int) -> Optional[Dict[str, Any]]:
+        """Retrieves a document by its ID."""
+        document = await self._load(_id)
+        if document is not None:
+            document["_id"] = _id
+        return document
+
+    async def get_fields(self, _id: int, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieves only the given fields of a document."""
+        document = await self._load(_id) or {}
+        return {key: document[key] for key in keys if key in document}
+
+    async def ensure_defaults(
+        self,
+        _id: int,
+        defaults: Dict[str, Any],
+        keys: Iterable[str] = (),
+        unwrap: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Fills in missing fields and reads the document back, in one transaction."""
+        async with self._lock:
+            document = await self._load(_id) or {}
+            changed = False
+            for key in unwrap:
+                if isinstance(document.get(key), list):
+                    items = document.pop(key)
+                    if items:
+                        document[key] = items[0]
+                    changed = True
+            for key, value in defaults.items():
+                if document.get(key) is None:
+                    document[key] = value
+                    changed = True
+
+            if changed:
+                document[self.VERSION_KEY] = document.get(self.VERSION_KEY, 0) + 1
+                await self.conn.execute(
+                    "INSERT OR REPLACE INTO docs (_id, data) VALUES (?, ?)",
+                    (_id, json.dumps(document)),
+                )
+                await self.conn.commit()
+
+        wanted = {*keys, *defaults, *unwrap, self.VERSION_KEY}
+        return {key: document[key] for key in wanted if key in document}
+
+    async def set_value(self, _id: int, key: str, value: Any) -> int:
+        """Sets a document's scalar field atomically and returns the new version."""
+        return await self.set_values(_id, {key: value})
+
+    async def set_values(self, _id: int, values: Dict[str, Any]) -> int:
+        """Sets several scalar fields atomically and returns the new version."""
+        _, version = await self._update(_id, lambda document: document.update(values))
+        return version
+
+    async def toggle_value(self, _id: int, key: str, default: bool) -> Tuple[bool, int]:
+        """Flips a document's boolean field atomically; returns it and the new version."""
+
+        def toggle(document: Dict[str, Any]) -> bool:
+            current = document.get(key)
+            document[key] = not (default if current is None else current)
+            return document[key]
+
+        return await self._update(_id, toggle)
+
+    async def add_value(self, _id: int, key: str, value: Any) -> int:
+        """Adds a value to a document's list field, like `$addToSet`."""
+
+        def add(document: Dict[str, Any]) -> None:
+            items = document.setdefault(key, [])
+            if value not in items:
+                items.append(value)
+
+        _, version = await self._update(_id, add)
+        return version
+
+    async def del_value(self, _id: int, key: str, value: Any) -> Optional[int]:
+        """Removes a value from a document's list field, like `$pull`."""
+        return await self.del_values(_id, key, [value])
+
+    async def del_values(self, _id: int, key: str, values: List[Any]) -> Optional[int]:
+        """Removes several values from a document's list field, like `$pullAll`."""
+
+        def pull(document: Dict[str, Any]) -> None:
+            if isinstance(document.get(key), list):
+                document[key] = [item for item in document[key] if item not in values]
+
+        _, version = await self._update(_id, pull, upsert=False)
+        return version
+
+    async def clear_value(self, _id: int, key: str) -> Optional[int]:
+        """Clears a field in a document, like `$unset`."""
+        _, version = await self._update(
+            _id, lambda document: document.pop(key, None), upsert=False
+        )
+        return version
+
+    async def del_doc(self, _id: int) -> None:
+        """Deletes a document by its ID."""
+        async with self._lock:
+            await self.conn.execute("DELETE FROM docs WHERE _id = ?", (_id,))
+            await self.conn.commit()
+
+    async def get_slice(
+        self, _id: int, key: str, limit: Optional[int] = None
+    ) -> List[Any]:
+        """Retrieves the leading items of a document's list field."""
+        items = (await self.get_fields(_id, [key])).get(key)
+        if not isinstance(items, list):
+            return []
+        return items[:limit] if limit else items
+
+    async def add_users(self, user_ids: Iterable[int]) -> int:
+        """Inserts user IDs in bulk and returns how many were new."""
+        async with self._lock:
+            before = self.conn.total_changes
+            await self.conn.executemany(
+                "INSERT OR IGNORE INTO users (_id) VALUES (?)",
+                ((user_id,) for user_id in user_ids),
+            )
+            await self.conn.commit()
+            return self.conn.total_changes - before
+
+    async def del_users(self, user_ids: Iterable[int]) -> None:
+        """Removes user IDs in bulk."""
+        async with self._lock:
+            await self.conn.executemany(
+                "DELETE FROM users WHERE _id = ?", ((user_id,) for user_id in user_ids)
+            )
+            await self.conn.commit()
+
+    async def iter_users(self, batch_size: int = 5000) -> AsyncIterator[int]:
+        """Streams every user ID, in ascending order."""
+        async with self.conn.execute("SELECT _id FROM users ORDER BY _id") as cursor:
+            cursor.arraysize = batch_size
+            while True:
+                rows = await cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0]
+
+    async def count_users(self) -> int:
+        """Counts the stored users."""
+        async with self.conn.execute("SELECT COUNT(*) FROM users") as cursor:
+            row = await cursor.fetchone()
+        return row[0]
+
+    async def get_records(
+        self, collection: str, ids: Iterable[Any]
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Retrieves records by their IDs."""
+        keys = [json.dumps(_id) for _id in ids]
+        records = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            query = (
+                "SELECT _id, data FROM records WHERE collection = ? "
+                f"AND _id IN ({', '.join('?' * len(chunk))})"
+            )
+            async with self.conn.execute(query, (collection, *chunk)) as cursor:
+                async for key, data in cursor:
+                    record = json.loads(data)
+                    record["_id"] = json.loads(key)
+                    records[record["_id"]] = record
+        return records
+
+    async def set_records(
+        self, collection: str, records: Dict[Any, Dict[str, Any]]
+    ) -> None:
+        """Upserts records in bulk, setting the given fields on each."""
+        if not records:
+            return
+
+        async with self._lock:
+            existing = await self.get_records(collection, records.keys())
+            rows = []
+            for _id, fields in records.items():
+                record = existing.get(_id, {})
+                record.pop("_id", None)
+                record.update(fields)
+                rows.append((collection, json.dumps(_id), json.dumps(record)))
+
+            await self.conn.executemany(
+                "INSERT OR REPLACE INTO records (collection, _id, data) VALUES (?, ?, ?)",
+                rows,
+            )
+            await self.conn.commit()
+
+    async def del_records(self, collection: str, ids: Iterable[Any]) -> None:
+        """Removes records in bulk."""
+        async with self._lock:
+            await self.conn.executemany(
+                "DELETE FROM records WHERE collection = ? AND _id = ?",
+                ((collection, json.dumps(_id)) for _id in ids),
+            )
+            await self.conn.commit()
+
+    async def iter_records(
+        self, collection: str, batch_size: int = 5000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams every record of a collection."""
+        async with self.conn.execute(
+            "SELECT _id, data FROM records WHERE collection = ?", (collection,)
+        ) as cursor:
+            cursor.arraysize = batch_size
+            while True:
+                rows = await cursor.fetchmany()
+                if not rows:
+                    break
+                for key, data in rows:
+                    record = json.loads(data)
+                    record["_id"] = json.loads(key)
+                    yield record
+
+    def watch_unsupported(self, exc: Exception) -> bool:
+        """Always True: SQLite has no change streams (see `SUPPORTS_WATCH`)."""
+        return True
@@ -1,10 +1,17 @@
 from .admin import add_admin, del_admin, get_admins
 from .content import (
+    del_db_channel,
+    get_db_channels,
+    get_delivery_page_size,
     get_generate_status,
     get_protect_content,
+    get_retired_db_channels,
+    update_db_channel,
+    update_delivery_page_size,
     update_generate_status,
     update_protect_content,
 )
+from .cursor import add_page_code, get_page_code, prune_page_codes
 from .fsub import add_fs_chat, del_fs_chat, get_fs_chats
 from .initial import initial_database
 from .restart import (
@@ -12,22 +19,32 @@ from .restart import (
     del_broadcast_data_id,
     get_broadcast_data_ids,
 )
+from .settings import settings
 from .text import (
     get_force_text_msg,
     get_start_text_msg,
     update_force_text_msg,
     update_start_text_msg,
 )
-from .user import add_user, del_user, get_users
+from .user import add_user, add_users, del_user, del_users, get_users, migrate_users
 
 __all__ = [
     "add_admin",
     "del_admin",
     "get_admins",
+    "del_db_channel",
+    "get_db_channels",
+    "get_delivery_page_size",
     "get_generate_status",
     "get_protect_content",
+    "get_retired_db_channels",
+    "update_db_channel",
+    "update_delivery_page_size",
     "update_generate_status",
     "update_protect_content",
+    "add_page_code",
+    "get_page_code",
+    "prune_page_codes",
     "initial_database",
     "add_fs_chat",
     "del_fs_chat",
@@ -35,11 +52,15 @@ __all__ = [
     "add_broadcast_data_id",
     "del_broadcast_data_id",
     "get_broadcast_data_ids",
+    "settings",
     "get_force_text_msg",
     "get_start_text_msg",
     "update_force_text_msg",
     "update_start_text_msg",
     "add_user",
+    "add_users",
     "del_user",
+    "del_users",
     "get_users",
+    "migrate_users",
 ]
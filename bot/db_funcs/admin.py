@@ -1,7 +1,6 @@
-from typing import List, Optional
+from typing import List
 
-from bot.base import database
-from bot.utils import BOT_ID
+from .settings import settings
 
 
 async def add_admin(chat_id: int) -> None:
@@ -11,7 +10,7 @@ async def add_admin(chat_id: int) -> None:
     Args:
         chat_id (int): The chat ID to add as an administrator.
     """
-    await database.add_value(int(BOT_ID), "BOT_ADMINS", chat_id)
+    await settings.add_value("BOT_ADMINS", chat_id)
 
 
 async def del_admin(chat_id: int) -> None:
@@ -21,7 +20,7 @@ async def del_admin(chat_id: int) -> None:
     Args:
         chat_id (int): The chat ID to remove from the list of administrators.
     """
-    await database.del_value(int(BOT_ID), "BOT_ADMINS", chat_id)
+    await settings.del_value("BOT_ADMINS", chat_id)
 
 
 async def get_admins() -> List[int]:
@@ -31,10 +30,4 @@ async def get_admins() -> List[int]:
     Returns:
         List[int]: A list of chat IDs that are administrators.
     """
-    doc: Optional[dict] = await database.get_doc(int(BOT_ID))
-    # Ensure `BOT_ADMINS` exists in the document and is of the correct type
-    return (
-        doc.get("BOT_ADMINS", [])
-        if doc and isinstance(doc.get("BOT_ADMINS"), list)
-        else []
-    )
+    return await settings.get_value("BOT_ADMINS")
@@ -1,5 +1,8 @@
-from bot.base import database
-from bot.utils import BOT_ID
+from typing import List
+
+from bot.utils import config
+
+from .settings import settings
 
 
 async def add_generate_status(value: bool) -> None:
@@ -9,14 +12,14 @@ async def add_generate_status(value: bool) -> None:
     Args:
         value (bool): The status to set for generating URLs.
     """
-    await database.add_value(int(BOT_ID), "GENERATE_URL", value)
+    await settings.set_value("GENERATE_URL", value)
 
 
 async def del_generate_status() -> None:
     """
     Clears the generate URL status from the database.
     """
-    await database.clear_value(int(BOT_ID), "GENERATE_URL")
+    await settings.clear_value("GENERATE_URL")
 
 
 async def get_generate_status() -> bool:
@@ -26,18 +29,17 @@ async def get_generate_status() -> bool:
     Returns:
         bool: The current status of generate URLs.
     """
-    doc = await database.get_doc(int(BOT_ID))
-    # Assume default value of False if no status is found
-    return doc.get("GENERATE_URL", [False])[0]
+    return await settings.get_value("GENERATE_URL")
 
 
-async def update_generate_status() -> None:
+async def update_generate_status() -> bool:
     """
     Toggles the generate URL status in the database.
+
+    Returns:
+        bool: The status after toggling.
     """
-    current_generate_status = await get_generate_status()
-    await del_generate_status()
-    await add_generate_status(not current_generate_status)
+    return await settings.toggle_value("GENERATE_URL")
 
 
 async def add_protect_content(value: bool) -> None:
@@ -47,14 +49,14 @@ async def add_protect_content(value: bool) -> None:
     Args:
         value (bool): The status to set for protecting content.
     """
-    await database.add_value(int(BOT_ID), "PROTECT_CONTENT", value)
+    await settings.set_value("PROTECT_CONTENT", value)
 
 
 async def del_protect_content() -> None:
     """
     Clears the protect content status from the database.
     """
-    await database.clear_value(int(BOT_ID), "PROTECT_CONTENT")
+    await settings.clear_value("PROTECT_CONTENT")
 
 
 async def get_protect_content() -> bool:
@@ -64,15 +66,77 @@ async def get_protect_content() -> bool:
     Returns:
         bool: The current status of protecting content.
     """
-    doc = await database.get_doc(int(BOT_ID))
-    # Assume default value of False if no status is found
-    return doc.get("PROTECT_CONTENT", [False])[0]
+    return await settings.get_value("PROTECT_CONTENT")
 
 
-async def update_protect_content() -> None:
+async def update_protect_content() -> bool:
     """
     Toggles the protect content status in the database.
+
+    Returns:
+        bool: The status after toggling.
+    """
+    return await settings.toggle_value("PROTECT_CONTENT")
+
+
+async def get_db_channels() -> List[int]:
+    """
+    Retrieves the registered database channels, in registration order.
+
+    Returns:
+        List[int]: The channel IDs; a channel's position is its link index.
+    """
+    return await settings.get_value("DATABASE_CHANNELS")
+
+
+async def get_retired_db_channels() -> List[int]:
+    """
+    Retrieves the database channels no longer used for new files.
+
+    Returns:
+        List[int]: The retired channel IDs.
+    """
+    return await settings.get_value("DATABASE_CHANNELS_RETIRED")
+
+
+async def update_db_channel(chat_id: int) -> None:
+    """
+    Registers a database channel for new files (or re-activates it).
+
+    Args:
+        chat_id (int): The ID of the channel to store messages in.
+    """
+    await settings.add_value("DATABASE_CHANNELS", chat_id)
+    await settings.del_value("DATABASE_CHANNELS_RETIRED", chat_id)
+
+
+async def del_db_channel() -> None:
+    """
+    Stores new files in `DATABASE_CHAT_ID` only again.
+
+    The other channels are retired, not removed: links to them keep working.
+    """
+    channels = await get_db_channels()
+    retired = [chat_id for chat_id in channels if chat_id != config.DATABASE_CHAT_ID]
+    await settings.set_value("DATABASE_CHANNELS_RETIRED", retired)
+    await settings.clear_value("DATABASE_CHAT_ID_OVERRIDE")
+
+
+async def get_delivery_page_size() -> int:
+    """
+    Retrieves how many messages of a batch link are sent per page.
+
+    Returns:
+        int: The page size; 0 sends the whole link at once.
+    """
+    return await settings.get_value("DELIVERY_PAGE_SIZE")
+
+
+async def update_delivery_page_size(value: int) -> None:
+    """
+    Sets how many messages of a batch link are sent per page.
+
+    Args:
+        value (int): The page size; 0 sends the whole link at once.
     """
-    current_protect_content_status = await get_protect_content()
-    await del_protect_content()
-    await add_protect_content(not current_protect_content_status)
+    await settings.set_value("DELIVERY_PAGE_SIZE", value)
@@ -0,0 +1,74 @@
+import base64
+import hashlib
+import time
+from typing import List, Optional
+
+from bot.base import database
+from bot.utils import config
+
+COLLECTION = "DELIVERY_CURSORS"
+
+
+def page_code_token(code: str) -> str:
+    """
+    Derives a short, stable token for a deep-link code.
+
+    Args:
+        code (str): The deep-link code.
+
+    Returns:
+        str: A 12-character URL-safe token.
+    """
+    digest = hashlib.sha1(code.encode()).digest()[:9]
+    return base64.urlsafe_b64encode(digest).decode()
+
+
+async def add_page_code(code: str) -> str:
+    """
+    Stores a deep-link code too long to fit in callback data.
+
+    The token is derived from the code, so every page of the same link
+    reuses one record; storing it again renews its `PAGE_CODE_TTL`.
+
+    Args:
+        code (str): The deep-link code.
+
+    Returns:
+        str: The token to put in the callback data instead.
+    """
+    token = page_code_token(code)
+    await database.set_records(COLLECTION, {token: {"code": code, "at": int(time.time())}})
+    return token
+
+
+async def get_page_code(token: str) -> Optional[str]:
+    """
+    Retrieves a deep-link code stored with `add_page_code`.
+
+    Args:
+        token (str): The token from the callback data.
+
+    Returns:
+        Optional[str]: The code, or None if it is unknown or expired.
+    """
+    record = (await database.get_records(COLLECTION, [token])).get(token)
+    if not record or record.get("at", 0) < time.time() - config.PAGE_CODE_TTL:
+        return None
+    return record.get("code")
+
+
+async def prune_page_codes() -> int:
+    """
+    Deletes the codes older than `PAGE_CODE_TTL`.
+
+    Returns:
+        int: The number of codes deleted.
+    """
+    oldest = time.time() - config.PAGE_CODE_TTL
+    expired: List[str] = [
+        record["_id"]
+        async for record in database.iter_records(COLLECTION)
+        if record.get("at", 0) < oldest
+    ]
+    await database.del_records(COLLECTION, expired)
+    return len(expired)
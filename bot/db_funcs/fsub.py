@@ -1,7 +1,6 @@
 from typing import List
 
-from bot.base import database
-from bot.utils import BOT_ID
+from .settings import settings
 
 
 async def add_fs_chat(chat_id: int) -> None:
@@ -11,7 +10,7 @@ async def add_fs_chat(chat_id: int) -> None:
     Args:
         chat_id (int): The ID of the chat to be added.
     """
-    await database.add_value(int(BOT_ID), "FSUB_CHATS", chat_id)
+    await settings.add_value("FSUB_CHATS", chat_id)
 
 
 async def del_fs_chat(chat_id: int) -> None:
@@ -21,7 +20,7 @@ async def del_fs_chat(chat_id: int) -> None:
     Args:
         chat_id (int): The ID of the chat to be removed.
     """
-    await database.del_value(int(BOT_ID), "FSUB_CHATS", chat_id)
+    await settings.del_value("FSUB_CHATS", chat_id)
 
 
 async def get_fs_chats() -> List[int]:
@@ -31,6 +30,4 @@ async def get_fs_chats() -> List[int]:
     Returns:
         List[int]: A list of chat IDs that are subscribed.
     """
-    doc = await database.get_doc(int(BOT_ID))
-    # Ensure the value is a list or return an empty list
-    return doc.get("FSUB_CHATS", []) if isinstance(doc.get("FSUB_CHATS"), list) else []
+    return await settings.get_value("FSUB_CHATS")
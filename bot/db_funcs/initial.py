@@ -1,15 +1,19 @@
-from typing import Dict
+from typing import Any, Dict
 
-from bot.base import database
-from bot.utils import BOT_ID, logger
+from bot.utils import logger
+
+from .settings import settings
 
 
 async def initial_database() -> None:
     """
-    Initializes the database with default values if they are not already present.
+    Initializes the database with default values and loads the settings.
 
-    This function sets up initial configuration values in the database.
-    It checks if certain keys exist in the database; if not, it adds them with default values.
+    Everything happens in one round trip: missing defaults are written,
+    scalar settings still in the legacy one-element-array format (written by
+    older versions via `$addToSet`) are unwrapped so they can be updated with
+    atomic `$set`/`findOneAndUpdate`, and the resulting document is read back
+    into the settings snapshot.
 
     Default values added:
         - "GENERATE_URL": False
@@ -26,7 +30,7 @@ async def initial_database() -> None:
         "To view messages shared by bots, join first, then press the Try Again button."
     )
 
-    default_key_value_db: Dict[str, bool] = {
+    default_key_value_db: Dict[str, Any] = {
         "GENERATE_URL": False,
         "PROTECT_CONTENT": False,
         "FORCE_TEXT": default_force_text,
@@ -34,17 +38,7 @@ async def initial_database() -> None:
         "SPONSOR_TEXT": "",
         "SPONSOR_PHOTO": "",
     }
+    legacy_keys = [key for key in settings.FIELDS if key not in settings.LIST_FIELDS]
 
-    bot_id = int(BOT_ID)
-    doc = await database.get_doc(
-        bot_id
-    )  # Fetch the document once to avoid multiple database calls
-
-    for key, value in default_key_value_db.items():
-        data = key.replace("_", " ").title()
-
-        if doc is None or key not in doc:
-            await database.add_value(bot_id, key, value)
-            logger.info(f"{data}: Default")
-        else:
-            logger.info(f"{data}: Existed")
+    await settings.load(default_key_value_db, [*legacy_keys, "RESTART_IDS"])
+    logger.info(f"Initial Database: Version {settings.version}")
@@ -0,0 +1,395 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, TypedDict
+
+from bot.base import database
+from bot.utils import BOT_ID, config, logger
+
+
+class SettingsValues(TypedDict):
+    """The settings keys and the type of each value."""
+
+    GENERATE_URL: bool
+    PROTECT_CONTENT: bool
+    FORCE_TEXT: str
+    START_TEXT: str
+    SPONSOR_TEXT: str
+    SPONSOR_PHOTO: str
+    SPONSOR_ENABLED: bool
+    CUSTOM_CAPTION_TEXT: str
+    CUSTOM_CAPTION_ENABLED: bool
+    START_PHOTO: str
+    FORCE_PHOTO: str
+    START_PHOTO_FILE_ID: Dict[str, str]
+    FORCE_PHOTO_FILE_ID: Dict[str, str]
+    SPONSOR_PHOTO_FILE_ID: Dict[str, str]
+    DATABASE_CHAT_ID_OVERRIDE: int
+    DELIVERY_PAGE_SIZE: int
+    BOT_ADMINS: List[int]
+    FSUB_CHATS: List[int]
+    DATABASE_CHANNELS: List[int]
+    DATABASE_CHANNELS_RETIRED: List[int]
+
+
+class SettingsSnapshot:
+    """
+    An in-process copy of the settings stored on the `BOT_ID` document.
+
+    All keys are loaded with a single projected read at boot; afterwards the
+    getters in `db_funcs` read from memory only. Every write goes to MongoDB
+    first and is then applied to the snapshot (write-through), so the copy
+    never drifts from what this process wrote.
+
+    Scalar settings are stored as plain values written with a single `$set`;
+    values still in the legacy one-element-array format are unwrapped on read.
+
+    Writes made by other processes are picked up by `watch()`, which follows
+    a change stream on the document (or polls its version counter when change
+    streams are unavailable) and refreshes only the keys that changed.
+    Listeners registered with `add_listener()` are told which keys those were.
+
+    `values()` returns every setting at once, typed as `SettingsValues`;
+    `get_value()` reads a single key.
+
+    Attributes:
+        FIELDS (SettingsValues): The settings keys and their default values.
+        LIST_FIELDS (frozenset): The keys holding a list rather than a scalar.
+        RETRY_DELAY (int): Seconds before reopening a broken change stream.
+        MAX_RETRY_DELAY (int): The cap on that delay as it doubles.
+        version (int): The document version the snapshot was last synced to,
+            local writes included.
+        written (Set[int]): Versions written by this process whose change
+            events have not arrived yet; those events are skipped.
+        streaming (bool): Whether a change stream is followed (or retried).
+        hits (int): Reads answered from memory.
+        misses (int): Reads that had to go to the database first.
+    """
+
+    FIELDS: SettingsValues = {
+        "GENERATE_URL": False,
+        "PROTECT_CONTENT": False,
+        "FORCE_TEXT": "",
+        "START_TEXT": "",
+        "SPONSOR_TEXT": "",
+        "SPONSOR_PHOTO": "",
+        "SPONSOR_ENABLED": True,
+        "CUSTOM_CAPTION_TEXT": "",
+        "CUSTOM_CAPTION_ENABLED": False,
+        "START_PHOTO": "",
+        "FORCE_PHOTO": "",
+        "START_PHOTO_FILE_ID": {},
+        "FORCE_PHOTO_FILE_ID": {},
+        "SPONSOR_PHOTO_FILE_ID": {},
+        "DATABASE_CHAT_ID_OVERRIDE": config.DATABASE_CHAT_ID,
+        "DELIVERY_PAGE_SIZE": 100,
+        "BOT_ADMINS": [],
+        "FSUB_CHATS": [],
+        "DATABASE_CHANNELS": [],
+        "DATABASE_CHANNELS_RETIRED": [],
+    }
+    LIST_FIELDS = frozenset(
+        {"BOT_ADMINS", "FSUB_CHATS", "DATABASE_CHANNELS", "DATABASE_CHANNELS_RETIRED"}
+    )
+    RETRY_DELAY: int = 1
+    MAX_RETRY_DELAY: int = 300
+
+    def __init__(self) -> None:
+        """Initializes an empty, not yet loaded snapshot."""
+        self._values: Dict[str, Any] = {}
+        self._listeners: List[Callable[[Set[str]], Awaitable[None]]] = []
+        self.loaded: bool = False
+        self.version: int = 0
+        self.written: Set[int] = set()
+        self.streaming: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _unwrap(self, key: str, value: Any) -> Optional[Any]:
+        """Converts a stored value to its in-memory form, or None if unusable."""
+        if key in self.LIST_FIELDS:
+            return list(value) if isinstance(value, list) else None
+        if isinstance(value, list):
+            # Legacy one-element-array format
+            return value[0] if value else None
+        return value
+
+    async def load(
+        self, defaults: Optional[Dict[str, Any]] = None, unwrap: Iterable[str] = ()
+    ) -> None:
+        """
+        Loads every settings key with one projected read.
+
+        Args:
+            defaults (Optional[Dict[str, Any]]): Values stored first where a key
+                is missing, in the same round trip as the read.
+            unwrap (Iterable[str]): Keys converted from the legacy
+                one-element-array format in that same round trip.
+        """
+        keys = [*self.FIELDS, database.VERSION_KEY]
+        if defaults is None:
+            doc = await database.get_fields(int(BOT_ID), keys)
+        else:
+            doc = await database.ensure_defaults(int(BOT_ID), defaults, keys, unwrap)
+        self.apply(doc)
+        self.loaded = True
+        logger.info(f"Settings: {len(self._values)} Keys Loaded")
+
+    def apply(self, doc: Dict[str, Any]) -> None:
+        """
+        Replaces the snapshot with the settings found in a document.
+
+        Args:
+            doc (Dict[str, Any]): The (projected) settings document.
+        """
+        values = {}
+        for key in self.FIELDS:
+            value = self._unwrap(key, doc.get(key))
+            if value is not None:
+                values[key] = value
+        self._values = values
+        self.version = doc.get(database.VERSION_KEY, 0)
+
+    def add_listener(self, listener: Callable[[Set[str]], Awaitable[None]]) -> None:
+        """
+        Registers a coroutine called with the keys changed by another process.
+
+        Args:
+            listener (Callable[[Set[str]], Awaitable[None]]): The callback.
+        """
+        self._listeners.append(listener)
+
+    async def refresh(self, keys: Iterable[str] = ()) -> Set[str]:
+        """
+        Re-reads settings keys from the database and notifies listeners.
+
+        Args:
+            keys (Iterable[str]): The keys to re-read; all keys if empty.
+
+        Returns:
+            Set[str]: The keys whose value actually changed.
+        """
+        keys = [key for key in keys if key in self.FIELDS] or list(self.FIELDS)
+        doc = await database.get_fields(int(BOT_ID), [*keys, database.VERSION_KEY])
+
+        changed = set()
+        for key in keys:
+            value = self._unwrap(key, doc.get(key))
+            if value == self._values.get(key):
+                continue
+
+            changed.add(key)
+            if value is None:
+                self._values.pop(key, None)
+            else:
+                self._values[key] = value
+
+        self.version = doc.get(database.VERSION_KEY, self.version)
+        if changed:
+            logger.info(f"Settings: Refreshed {', '.join(sorted(changed))}")
+            for listener in self._listeners:
+                try:
+                    await listener(changed)
+                except Exception as exc:
+                    logger.error(f"Settings Listener: {exc}")
+
+        return changed
+
+    async def watch(self) -> None:
+        """
+        Keeps the snapshot in sync with writes made by other processes.
+
+        Follows a change stream on the settings document. When the stream
+        breaks (a network error, a failover), it is reopened after a delay
+        doubling from `RETRY_DELAY` up to `MAX_RETRY_DELAY`, and the version
+        counter is checked first for changes missed in between. Only when
+        change streams are unsupported (`SUPPORTS_WATCH`, or a server that is
+        not a replica set) does it poll the version counter instead.
+
+        Events carrying a version this process wrote are skipped: the
+        snapshot already holds those values.
+        """
+        if not database.SUPPORTS_WATCH:
+            logger.info("Settings: No Change Streams, Polling")
+            await self.poll()
+            return
+
+        delay = self.RETRY_DELAY
+        self.streaming = True
+        while True:
+            try:
+                async for keys, version in database.watch_doc(int(BOT_ID)):
+                    delay = self.RETRY_DELAY
+                    if version is not None:
+                        own = version in self.written
+                        # Events arrive in order: older local versions never will
+                        self.written = {v for v in self.written if v > version}
+                        if own:
+                            continue
+                    # An empty set means the whole document changed
+                    if keys and not keys & self.FIELDS.keys():
+                        continue
+                    await self.refresh(keys)
+            except Exception as exc:
+                if database.watch_unsupported(exc):
+                    logger.warning(f"Settings: Change Streams Unsupported, Polling ({exc})")
+                    self.streaming = False
+                    self.written.clear()
+                    await self.poll()
+                    return
+                logger.warning(f"Settings: Change Stream Lost, Retrying in {delay}s ({exc})")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+            try:
+                await self.check()
+            except Exception as exc:
+                logger.error(f"Settings Check: {exc}")
+            # Writes made while the stream was down will not be streamed
+            self.written = {v for v in self.written if v > self.version}
+
+    async def poll(self) -> None:
+        """
+        Polls the document version and refreshes the snapshot when it moves.
+        """
+        while True:
+            await asyncio.sleep(config.SETTINGS_POLL_INTERVAL)
+            try:
+                await self.check()
+            except Exception as exc:
+                logger.error(f"Settings Poll: {exc}")
+
+    async def check(self) -> None:
+        """
+        Refreshes the snapshot if the document version is not the one synced.
+        """
+        doc = await database.get_fields(int(BOT_ID), [database.VERSION_KEY])
+        if doc.get(database.VERSION_KEY, 0) != self.version:
+            await self.refresh()
+
+    def wrote(self, version: Optional[int]) -> None:
+        """
+        Records the document version a local write produced.
+
+        If it directly follows `version`, nothing else was written in
+        between and the snapshot is synced to it, so polling does not
+        refresh for it; otherwise another process wrote too and the
+        snapshot waits for the next refresh. While streaming, the version
+        is also kept in `written` so its change event is skipped.
+
+        Args:
+            version (Optional[int]): The version returned by the database,
+                None if nothing was written.
+        """
+        if version is None:
+            return
+        if version == self.version + 1:
+            self.version = version
+        if self.streaming:
+            self.written.add(version)
+
+    async def _ensure_loaded(self) -> None:
+        """Counts a read as a hit, or as a miss after loading the snapshot."""
+        if self.loaded:
+            self.hits += 1
+        else:
+            self.misses += 1
+            await self.load()
+
+    async def values(self) -> SettingsValues:
+        """
+        Retrieves every setting at once, loading the snapshot first if needed.
+
+        Returns:
+            SettingsValues: A copy of the settings, defaults filled in.
+        """
+        await self._ensure_loaded()
+
+        values = {**self.FIELDS, **self._values}
+        for key in self.LIST_FIELDS:
+            values[key] = list(values[key])
+        return SettingsValues(**values)
+
+    async def get_value(self, key: str) -> Any:
+        """
+        Retrieves a setting, loading the snapshot first if needed.
+
+        Args:
+            key (str): The settings key.
+
+        Returns:
+            Any: The stored value, or the key's default if it is not set.
+        """
+        await self._ensure_loaded()
+
+        default = self.FIELDS.get(key)
+        value = self._values.get(key, default)
+        # Hand out copies of lists so callers cannot mutate the snapshot
+        return list(value) if isinstance(value, list) else value
+
+    async def set_value(self, key: str, value: Any) -> None:
+        """
+        Replaces a scalar setting with one atomic `$set`.
+
+        Args:
+            key (str): The settings key.
+            value (Any): The new value.
+        """
+        version = await database.set_value(int(BOT_ID), key, value)
+        self._values[key] = value
+        self.wrote(version)
+
+    async def toggle_value(self, key: str) -> bool:
+        """
+        Flips a boolean setting with one atomic `findOneAndUpdate`.
+
+        Args:
+            key (str): The settings key.
+
+        Returns:
+            bool: The value after flipping.
+        """
+        value, version = await database.toggle_value(int(BOT_ID), key, self.FIELDS[key])
+        self._values[key] = value
+        self.wrote(version)
+        return value
+
+    async def add_value(self, key: str, value: Any) -> None:
+        """
+        Adds a value to a list setting, mirroring MongoDB's `$addToSet`.
+
+        Args:
+            key (str): The settings key.
+            value (Any): The value to add.
+        """
+        self.wrote(await database.add_value(int(BOT_ID), key, value))
+
+        items = self._values.setdefault(key, [])
+        if value not in items:
+            items.append(value)
+
+    async def del_value(self, key: str, value: Any) -> None:
+        """
+        Removes a value from a list setting.
+
+        Args:
+            key (str): The settings key.
+            value (Any): The value to remove.
+        """
+        self.wrote(await database.del_value(int(BOT_ID), key, value))
+
+        items: List[Any] = self._values.get(key, [])
+        if value in items:
+            items.remove(value)
+
+    async def clear_value(self, key: str) -> None:
+        """
+        Clears a setting, so reads fall back to its default.
+
+        Args:
+            key (str): The settings key.
+        """
+        version = await database.clear_value(int(BOT_ID), key)
+        self._values.pop(key, None)
+        self.wrote(version)
+
+
+settings: SettingsSnapshot = SettingsSnapshot()
@@ -1,5 +1,4 @@
-from bot.base import database
-from bot.utils import BOT_ID
+from .settings import settings
 
 
 async def add_force_text_msg(value: str) -> None:
@@ -9,14 +8,14 @@ async def add_force_text_msg(value: str) -> None:
     Args:
         value (str): The force text message to set.
     """
-    await database.add_value(int(BOT_ID), "FORCE_TEXT", value)
+    await settings.set_value("FORCE_TEXT", value)
 
 
 async def del_force_text_msg() -> None:
     """
     Clears the force text message from the database.
     """
-    await database.clear_value(int(BOT_ID), "FORCE_TEXT")
+    await settings.clear_value("FORCE_TEXT")
 
 
 async def get_force_text_msg() -> str:
@@ -26,21 +25,18 @@ async def get_force_text_msg() -> str:
     Returns:
         str: The force text message. Defaults to an empty string if not set.
     """
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("FORCE_TEXT", [""])[0] if doc else ""
+    return await settings.get_value("FORCE_TEXT")
 
 
 async def update_force_text_msg(value: str) -> None:
     """
     Updates the force text message in the database.
 
-    This function first deletes the existing force text message and then
-    adds the new message.
+    The new message replaces the old one in a single atomic write.
 
     Args:
         value (str): The new force text message to set.
     """
-    await del_force_text_msg()
     await add_force_text_msg(value)
 
 
@@ -51,14 +47,14 @@ async def add_start_text_msg(value: str) -> None:
     Args:
         value (str): The start text message to set.
     """
-    await database.add_value(int(BOT_ID), "START_TEXT", value)
+    await settings.set_value("START_TEXT", value)
 
 
 async def del_start_text_msg() -> None:
     """
     Clears the start text message from the database.
     """
-    await database.clear_value(int(BOT_ID), "START_TEXT")
+    await settings.clear_value("START_TEXT")
 
 
 async def get_start_text_msg() -> str:
@@ -68,98 +64,101 @@ async def get_start_text_msg() -> str:
     Returns:
         str: The start text message. Defaults to an empty string if not set.
     """
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("START_TEXT", [""])[0] if doc else ""
+    return await settings.get_value("START_TEXT")
 
 
 async def update_start_text_msg(value: str) -> None:
     """
     Updates the start text message in the database.
 
-    This function first deletes the existing start text message and then
-    adds the new message.
+    The new message replaces the old one in a single atomic write.
 
     Args:
         value (str): The new start text message to set.
     """
-    await del_start_text_msg()
     await add_start_text_msg(value)
 
 # --- Sponsor Text ---
 async def add_sponsor_text_msg(value: str) -> None:
-    await database.add_value(int(BOT_ID), "SPONSOR_TEXT", value)
+    await settings.set_value("SPONSOR_TEXT", value)
 
 async def del_sponsor_text_msg() -> None:
-    await database.clear_value(int(BOT_ID), "SPONSOR_TEXT")
+    await settings.clear_value("SPONSOR_TEXT")
 
 async def get_sponsor_text_msg() -> str:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("SPONSOR_TEXT", [""])[0] if doc else ""
+    return await settings.get_value("SPONSOR_TEXT")
 
 async def update_sponsor_text_msg(value: str) -> None:
-    await del_sponsor_text_msg()
     await add_sponsor_text_msg(value)
 
 # --- Sponsor Photo ---
 async def add_sponsor_photo_msg(value: str) -> None:
-    await database.add_value(int(BOT_ID), "SPONSOR_PHOTO", value)
+    await settings.set_value("SPONSOR_PHOTO", value)
+    await settings.clear_value("SPONSOR_PHOTO_FILE_ID")
 
 async def del_sponsor_photo_msg() -> None:
-    await database.clear_value(int(BOT_ID), "SPONSOR_PHOTO")
+    await settings.clear_value("SPONSOR_PHOTO")
+    await settings.clear_value("SPONSOR_PHOTO_FILE_ID")
 
 async def get_sponsor_photo_msg() -> str:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("SPONSOR_PHOTO", [""])[0] if doc else ""
+    return await settings.get_value("SPONSOR_PHOTO")
 
 async def update_sponsor_photo_msg(value: str) -> None:
-    await del_sponsor_photo_msg()
     await add_sponsor_photo_msg(value)
 
 async def get_sponsor_enabled() -> bool:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("SPONSOR_ENABLED", [True])[0] if doc else True
+    return await settings.get_value("SPONSOR_ENABLED")
 
 async def set_sponsor_enabled(value: bool) -> None:
-    await database.clear_value(int(BOT_ID), "SPONSOR_ENABLED")
-    await database.add_value(int(BOT_ID), "SPONSOR_ENABLED", value)
+    await settings.set_value("SPONSOR_ENABLED", value)
+
+async def toggle_sponsor_enabled() -> bool:
+    return await settings.toggle_value("SPONSOR_ENABLED")
 
 async def get_custom_caption_text() -> str:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("CUSTOM_CAPTION_TEXT", [""])[0] if doc else ""
+    return await settings.get_value("CUSTOM_CAPTION_TEXT")
 
 async def set_custom_caption_text(value: str) -> None:
-    await database.clear_value(int(BOT_ID), "CUSTOM_CAPTION_TEXT")
-    await database.add_value(int(BOT_ID), "CUSTOM_CAPTION_TEXT", value)
+    await settings.set_value("CUSTOM_CAPTION_TEXT", value)
 
 async def del_custom_caption_text() -> None:
-    await database.clear_value(int(BOT_ID), "CUSTOM_CAPTION_TEXT")
+    await settings.clear_value("CUSTOM_CAPTION_TEXT")
 
 async def get_custom_caption_enabled() -> bool:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("CUSTOM_CAPTION_ENABLED", [False])[0] if doc else False
+    return await settings.get_value("CUSTOM_CAPTION_ENABLED")
 
 async def set_custom_caption_enabled(value: bool) -> None:
-    await database.clear_value(int(BOT_ID), "CUSTOM_CAPTION_ENABLED")
-    await database.add_value(int(BOT_ID), "CUSTOM_CAPTION_ENABLED", value)
+    await settings.set_value("CUSTOM_CAPTION_ENABLED", value)
+
+async def toggle_custom_caption_enabled() -> bool:
+    return await settings.toggle_value("CUSTOM_CAPTION_ENABLED")
 
 # --- Start Photo ---
 async def add_start_photo_msg(value: str) -> None:
-    await database.add_value(int(BOT_ID), "START_PHOTO", value)
+    await settings.set_value("START_PHOTO", value)
+    await settings.clear_value("START_PHOTO_FILE_ID")
 
 async def del_start_photo_msg() -> None:
-    await database.clear_value(int(BOT_ID), "START_PHOTO")
+    await settings.clear_value("START_PHOTO")
+    await settings.clear_value("START_PHOTO_FILE_ID")
 
 async def get_start_photo_msg() -> str:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("START_PHOTO", [""])[0] if doc else ""
+    return await settings.get_value("START_PHOTO")
+
+async def update_start_photo_msg(value: str) -> None:
+    await add_start_photo_msg(value)
 
 # --- Force Photo ---
 async def add_force_photo_msg(value: str) -> None:
-    await database.add_value(int(BOT_ID), "FORCE_PHOTO", value)
+    await settings.set_value("FORCE_PHOTO", value)
+    await settings.clear_value("FORCE_PHOTO_FILE_ID")
 
 async def del_force_photo_msg() -> None:
-    await database.clear_value(int(BOT_ID), "FORCE_PHOTO")
+    await settings.clear_value("FORCE_PHOTO")
+    await settings.clear_value("FORCE_PHOTO_FILE_ID")
 
 async def get_force_photo_msg() -> str:
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("FORCE_PHOTO", [""])[0] if doc else ""
\ No newline at end of file
+    return await settings.get_value("FORCE_PHOTO")
+
+async def update_force_photo_msg(value: str) -> None:
+    await add_force_photo_msg(value)
@@ -1,39 +1,104 @@
-from typing import List
+from typing import Iterable, List
 
 from bot.base import database
-from bot.utils import BOT_ID
+from bot.utils import BOT_ID, logger
 
 
 async def add_user(user_id: int) -> None:
     """
-    Adds a user ID to the list of bot users in the database.
+    Adds a user ID to the users collection in the database.
 
     Args:
         user_id (int): The ID of the user to add.
     """
-    await database.add_value(int(BOT_ID), "BOT_USERS", user_id)
+    await database.add_users([user_id])
+
+
+async def add_users(user_ids: Iterable[int]) -> int:
+    """
+    Adds several user IDs to the users collection in one bulk write.
+
+    Args:
+        user_ids (Iterable[int]): The IDs of the users to add.
+
+    Returns:
+        int: The number of users that were not stored before.
+    """
+    return await database.add_users(user_ids)
 
 
 async def del_user(user_id: int) -> None:
     """
-    Removes a user ID from the list of bot users in the database.
+    Removes a user ID from the users collection in the database.
 
     Args:
         user_id (int): The ID of the user to remove.
     """
-    await database.del_value(int(BOT_ID), "BOT_USERS", user_id)
+    await del_users([user_id])
+
+
+async def del_users(user_ids: Iterable[int]) -> None:
+    """
+    Removes several user IDs from the users collection in one bulk write.
+
+    The legacy `BOT_USERS` array is pruned as well, so a user deleted while
+    the migration is still running is not copied back afterwards.
+
+    Args:
+        user_ids (Iterable[int]): The IDs of the users to remove.
+    """
+    user_ids = list(user_ids)
+    await database.del_users(user_ids)
+    await database.del_values(int(BOT_ID), "BOT_USERS", user_ids)
 
 
 async def get_users() -> List[int]:
     """
     Retrieves the list of bot users from the database.
 
+    Users that still live in the legacy `BOT_USERS` array (migration in
+    progress) are merged in without duplicates.
+
     Returns:
         List[int]: A list of user IDs that are associated with the bot.
-                   Returns an empty list if no users are found or if the document does not exist.
+                   Returns an empty list if no users are found.
+    """
+    users = {user_id: None async for user_id in database.iter_users()}
+    for user_id in await database.get_slice(int(BOT_ID), "BOT_USERS"):
+        users.setdefault(user_id)
+
+    return list(users)
+
+
+async def migrate_users(chunk_size: int = 5000) -> int:
     """
-    doc = await database.get_doc(int(BOT_ID))
-    if doc:
-        return doc.get("BOT_USERS", [])
-    else:
-        return []
+    Moves user IDs from the legacy `BOT_USERS` array into the users collection.
+
+    The array is streamed in chunks: each chunk is bulk-inserted into the
+    collection and then pulled from the array, so the migration can run while
+    the bot serves requests and resumes where it stopped after a restart.
+
+    Args:
+        chunk_size (int): The number of user IDs moved per round.
+
+    Returns:
+        int: The number of user IDs moved.
+    """
+    bot_id = int(BOT_ID)
+    moved = 0
+
+    while True:
+        chunk = await database.get_slice(bot_id, "BOT_USERS", chunk_size)
+        if not chunk:
+            break
+
+        await database.add_users(chunk)
+        await database.del_values(bot_id, "BOT_USERS", chunk)
+        moved += len(chunk)
+        logger.info(f"Users Migration: {moved} Moved")
+
+    if moved:
+        await database.clear_value(bot_id, "BOT_USERS")
+        logger.info("Users Migration: Done")
+
+    return moved
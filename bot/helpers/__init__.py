@@ -1,11 +1,37 @@
 from .buttons import admin_buttons, helper_buttons, join_buttons
+from .channel_registry import channel_registry
+from .delivery import delivery_engine
+from .fetcher import message_fetcher
 from .handlers import helper_handlers
+from .link_codec import link_codec
+from .manifests import link_manifests
+from .media_cache import media_cache
+from .member_index import member_index
+from .message_cache import message_cache
+from .message_index import message_index
+from .templates import CAPTION_FIELDS, USER_FIELDS, Template
+from .tombstones import tombstones
 from .url_safe import url_safe
+from .user_registry import user_registry
 
 __all__ = [
     "admin_buttons",
     "helper_buttons",
     "join_buttons",
+    "channel_registry",
+    "delivery_engine",
+    "message_fetcher",
     "helper_handlers",
+    "link_codec",
+    "link_manifests",
+    "media_cache",
+    "member_index",
+    "message_cache",
+    "message_index",
+    "CAPTION_FIELDS",
+    "USER_FIELDS",
+    "Template",
+    "tombstones",
     "url_safe",
+    "user_registry",
 ]
@@ -32,7 +32,12 @@ def admin_buttons() -> ikb:
     return ikb(button_layouts)
 
 
-async def join_buttons(client: Client, message: Message, user_id: int) -> Optional[ikb]:
+async def join_buttons(
+    client: Client,
+    message: Message,
+    user_id: int,
+    no_join_ids: Optional[List[int]] = None,
+) -> Optional[ikb]:
     """
     Creates an inline keyboard with buttons for joining chats the user hasn't joined yet.
 
@@ -40,11 +45,14 @@ async def join_buttons(client: Client, message: Message, user_id: int) -> Option
         client (Client): The hydrogram client instance.
         message (Message): The message that triggered this action.
         user_id (int): The ID of the user for whom the join buttons are being created.
+        no_join_ids (Optional[List[int]]): The result of `user_is_not_join`, when
+            the caller already resolved it; checked here otherwise.
 
     Returns:
         Optional[ikb]: An inline keyboard with join buttons, or None if the user is already joined.
     """
-    no_join_ids = await helper_handlers.user_is_not_join(user_id)
+    if no_join_ids is None:
+        no_join_ids = await helper_handlers.user_is_not_join(user_id)
     if not no_join_ids:
         return None
 
@@ -91,6 +99,7 @@ class HelperButtons:
         [("Sponsor", "menu sponsor")],
         [("🗄️ DB Channel", "menu dbchannel")],
         [("📝 Custom Caption", "menu custom_caption")],
+        [("📄 Delivery Page", "menu pagesize")],
         [("Close", "close")],
     ]
     Cancel: List[List[Tuple[str, str]]] = [[("Cancel", "cancel")]]
@@ -148,7 +157,7 @@ class HelperButtons:
     Sponsor_: List[List[Tuple[str, str]]] = [[("« Back", "menu sponsor")]]
 
     DBChannel: List[List[Tuple[str, str]]] = [
-        [("🔄 Ganti DB Channel", "update dbchannel"), ("♻️ Reset ke Default", "reset dbchannel")],
+        [("➕ Tambah DB Channel", "update dbchannel"), ("♻️ Reset ke Default", "reset dbchannel")],
         [("« Back", "settings")],
     ]
     DBChannel_: List[List[Tuple[str, str]]] = [[("« Back", "menu dbchannel")]]
@@ -160,5 +169,11 @@ class HelperButtons:
     ]
     CustomCaption_: List[List[Tuple[str, str]]] = [[("« Back", "menu custom_caption")]]
 
+    PageSize: List[List[Tuple[str, str]]] = [
+        [("✏️ Ubah Jumlah", "update pagesize")],
+        [("« Back", "settings")],
+    ]
+    PageSize_: List[List[Tuple[str, str]]] = [[("« Back", "menu pagesize")]]
+
 
 helper_buttons: HelperButtons = HelperButtons()
@@ -0,0 +1,159 @@
+import itertools
+import time
+from typing import Dict, List, Optional, Set
+
+from bot.db_funcs import (
+    get_db_channels,
+    get_retired_db_channels,
+    settings,
+    update_db_channel,
+)
+from bot.utils import config, logger
+
+
+class ChannelRegistry:
+    """
+    The database channels, cached in memory and spread over for ingestion.
+
+    Channels are stored in the order they were registered (the configured
+    `DATABASE_CHAT_ID` first) and are never removed, so an index stays valid
+    for as long as links point at it. Links carry that index, so every
+    channel, old or new, keeps resolving.
+
+    New files are stored round-robin across the channels that are not
+    retired, skipping any channel still under a flood wait, so a busy
+    generator does not hit one channel's flood limits.
+
+    Attributes:
+        SETTINGS_KEYS (Set[str]): The settings keys the registry is built from.
+        channels (List[int]): Every registered channel, by index.
+        retired (Set[int]): Channels still resolved but no longer written to.
+        stored (Dict[int, int]): Files stored per channel since startup.
+    """
+
+    SETTINGS_KEYS: Set[str] = {
+        "DATABASE_CHANNELS",
+        "DATABASE_CHANNELS_RETIRED",
+        "DATABASE_CHAT_ID_OVERRIDE",
+    }
+
+    def __init__(self) -> None:
+        """Initializes the registry with the configured channel until loaded."""
+        self.channels: List[int] = [config.DATABASE_CHAT_ID]
+        self.retired: Set[int] = set()
+        self.stored: Dict[int, int] = {}
+        self._flood_until: Dict[int, float] = {}
+        self._turn = itertools.count()
+
+        settings.add_listener(self.settings_changed)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self.channels
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    @property
+    def active(self) -> List[int]:
+        """The channels new files are stored in."""
+        return [chat_id for chat_id in self.channels if chat_id not in self.retired]
+
+    async def load(self) -> List[int]:
+        """
+        Builds the registry from the settings snapshot.
+
+        The configured channel and one set through the old single override
+        are registered first if missing, so their indexes never move and
+        links made while the override was active keep working.
+
+        Returns:
+            List[int]: Every registered channel, by index.
+        """
+        channels = await get_db_channels()
+        override = await settings.get_value("DATABASE_CHAT_ID_OVERRIDE")
+        for chat_id in dict.fromkeys([config.DATABASE_CHAT_ID, override]):
+            if chat_id not in channels:
+                await update_db_channel(chat_id)
+                channels.append(chat_id)
+
+        self.channels = channels
+        self.retired = set(await get_retired_db_channels()) - {config.DATABASE_CHAT_ID}
+        for i, chat_id in enumerate(self.channels):
+            status = "Retired" if chat_id in self.retired else "Active"
+            logger.info(f"DB Channel {i}: {chat_id} ({status})")
+        return self.channels
+
+    async def settings_changed(self, keys: Set[str]) -> None:
+        """
+        Rebuilds the registry when another process changed it.
+
+        Args:
+            keys (Set[str]): The settings keys changed by another process.
+        """
+        if keys & self.SETTINGS_KEYS:
+            await self.load()
+
+    def index(self, chat_id: int) -> Optional[int]:
+        """
+        Looks up the index of a channel.
+
+        Args:
+            chat_id (int): The channel ID.
+
+        Returns:
+            Optional[int]: The index, or None if the channel is not registered.
+        """
+        try:
+            return self.channels.index(chat_id)
+        except ValueError:
+            return None
+
+    def channel(self, index: int) -> Optional[int]:
+        """
+        Looks up the channel at an index.
+
+        Args:
+            index (int): The index from a link.
+
+        Returns:
+            Optional[int]: The channel ID, or None if there is no such index.
+        """
+        return self.channels[index] if 0 <= index < len(self.channels) else None
+
+    def next_channel(self) -> int:
+        """
+        Picks the channel the next file is stored in.
+
+        Returns:
+            int: The next active channel not under a flood wait, or the one
+            whose wait ends first if all of them are.
+        """
+        active = self.active or [config.DATABASE_CHAT_ID]
+        now = time.monotonic()
+        start = next(self._turn)
+        for offset in range(len(active)):
+            chat_id = active[(start + offset) % len(active)]
+            if self._flood_until.get(chat_id, 0) <= now:
+                return chat_id
+        return min(active, key=lambda chat_id: self._flood_until[chat_id])
+
+    def report_flood(self, chat_id: int, seconds: float) -> None:
+        """
+        Skips a channel for ingestion until its flood wait ends.
+
+        Args:
+            chat_id (int): The channel that raised the flood wait.
+            seconds (float): The wait reported by Telegram.
+        """
+        self._flood_until[chat_id] = time.monotonic() + seconds
+
+    def flood_wait(self, chat_id: int) -> float:
+        """Returns the seconds left before a channel may be written to again."""
+        return max(0.0, self._flood_until.get(chat_id, 0) - time.monotonic())
+
+    def report_stored(self, chat_id: int) -> None:
+        """Counts a file stored in a channel."""
+        self.stored[chat_id] = self.stored.get(chat_id, 0) + 1
+
+
+channel_registry: ChannelRegistry = ChannelRegistry()
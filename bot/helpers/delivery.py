@@ -0,0 +1,399 @@
+import asyncio
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import hydrogram
+from hydrogram import enums, errors, raw, types
+from hydrogram.types import Message
+
+from bot.base import bot
+from bot.utils import get_histogram, logger
+
+from .fetcher import MessageFetcher, message_fetcher
+from .message_cache import StoredMessage
+
+
+class DeliveryEngine:
+    """
+    Delivers stored messages to a user with as few RPCs as possible.
+
+    Messages are fetched page by page through a `MessageFetcher` (the next
+    page is fetched while the current one is sent) and sent in chunks of up
+    to `CHUNK_SIZE` with one `messages.forwardMessages` call per chunk.
+    `drop_author` makes the result look like a copy (no "Forwarded from"
+    header, captions kept), and `noforwards` applies `protect_content`.
+    Albums (messages sharing a `media_group_id`) are never split across
+    calls, so they arrive as albums. The `Updates` a forward returns tell
+    which IDs were sent; the others were deleted and are recorded as such,
+    so the count stays exact even when the index lagged. If a chunk fails,
+    it is re-fetched in one call (the fetcher hands out cached records, not
+    copyable messages); its albums are then sent with `send_media_group`,
+    exactly the items fetched, and its other messages are copied one by one.
+
+    Each delivery counts its own RPCs in a local `Counter` (under "rpcs")
+    passed down the calls, so concurrent deliveries do not mix into
+    `last_rpcs`; the count is added to `rpcs` when the delivery ends.
+
+    Attributes:
+        CHUNK_SIZE (int): The maximum number of IDs per forward call.
+        ALBUM_MEDIA (Dict): The input media type of each album media type.
+        deliveries (int): The number of deliveries made.
+        messages (int): The number of messages delivered.
+        rpcs (int): The number of RPCs made, page fetches included.
+        fallbacks (int): The number of chunks delivered message by message.
+        last_rpcs (int): The number of RPCs of the latest delivery.
+        albums (int): The number of albums delivered intact.
+        saved (int): Send RPCs avoided compared with one copy per message.
+    """
+
+    CHUNK_SIZE: int = 100
+    ALBUM_MEDIA: Dict[enums.MessageMediaType, Callable[..., types.InputMedia]] = {
+        enums.MessageMediaType.PHOTO: types.InputMediaPhoto,
+        enums.MessageMediaType.VIDEO: types.InputMediaVideo,
+        enums.MessageMediaType.AUDIO: types.InputMediaAudio,
+        enums.MessageMediaType.DOCUMENT: types.InputMediaDocument,
+    }
+
+    def __init__(self, client: hydrogram.Client, fetcher: MessageFetcher) -> None:
+        """
+        Initializes the engine with the given bot client.
+
+        Args:
+            client (hydrogram.Client): The bot client instance.
+            fetcher (MessageFetcher): Fetches the messages to deliver.
+        """
+        self.client = client
+        self.fetcher = fetcher
+        self.deliveries: int = 0
+        self.messages: int = 0
+        self.rpcs: int = 0
+        self.fallbacks: int = 0
+        self.last_rpcs: int = 0
+        self.albums: int = 0
+        self.saved: int = 0
+        self.latency = get_histogram("Delivery")
+
+    async def deliver(
+        self,
+        chat_id: int,
+        from_chat_id: int,
+        message_ids: Iterable[int],
+        protect_content: bool = False,
+    ) -> int:
+        """
+        Delivers messages from a chat to a user, in order.
+
+        Args:
+            chat_id (int): The ID of the receiving chat.
+            from_chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The message IDs; deleted ones are skipped.
+            protect_content (bool): Whether the delivered messages are protected.
+
+        Returns:
+            int: The number of messages delivered.
+        """
+        tally: Counter = Counter()
+        sent = 0
+        with self.latency.time():
+            carry: List[StoredMessage] = []
+            pages = self.fetcher.iter_pages(from_chat_id, message_ids, tally)
+            async for messages in pages:
+                groups = self.group(carry + messages)
+                # An album at the end of a page may continue on the next one
+                carry = groups.pop() if groups[-1][0].media_group_id else []
+                sent += await self.send_groups(
+                    chat_id, from_chat_id, groups, protect_content, tally
+                )
+            if carry:
+                sent += await self.send_groups(
+                    chat_id, from_chat_id, [carry], protect_content, tally
+                )
+
+        self.deliveries += 1
+        self.messages += sent
+        self.rpcs += tally["rpcs"]
+        self.last_rpcs = tally["rpcs"]
+        return sent
+
+    @staticmethod
+    def group(messages: List[StoredMessage]) -> List[List[StoredMessage]]:
+        """
+        Splits messages into albums and singles, keeping their order.
+
+        Args:
+            messages (List[StoredMessage]): The messages, in delivery order.
+
+        Returns:
+            List[List[StoredMessage]]: Consecutive messages sharing a
+            `media_group_id` form one group; every other message is its own.
+        """
+        groups: List[List[StoredMessage]] = []
+        for message in messages:
+            album = message.media_group_id
+            if groups and album and groups[-1][0].media_group_id == album:
+                groups[-1].append(message)
+            else:
+                groups.append([message])
+        return groups
+
+    async def send_groups(
+        self,
+        chat_id: int,
+        from_chat_id: int,
+        groups: List[List[StoredMessage]],
+        protect_content: bool,
+        tally: Counter,
+    ) -> int:
+        """
+        Packs groups into chunks of up to `CHUNK_SIZE` messages and sends them.
+
+        An album is never split across two chunks, since one forward call
+        of all its items is what keeps it an album.
+
+        Args:
+            chat_id (int): The ID of the receiving chat.
+            from_chat_id (int): The ID of the chat holding the messages.
+            groups (List[List[StoredMessage]]): The groups from `group()`.
+            protect_content (bool): Whether the delivered messages are protected.
+            tally (Counter): The delivery's RPC count.
+
+        Returns:
+            int: The number of messages delivered.
+        """
+        sent, chunk = 0, []
+        for group in groups:
+            if chunk and sum(map(len, chunk)) + len(group) > self.CHUNK_SIZE:
+                sent += await self.send_chunk(chat_id, from_chat_id, chunk, protect_content, tally)
+                chunk = []
+            chunk.append(group)
+        if chunk:
+            sent += await self.send_chunk(chat_id, from_chat_id, chunk, protect_content, tally)
+        return sent
+
+    async def send_chunk(
+        self,
+        chat_id: int,
+        from_chat_id: int,
+        chunk: List[List[StoredMessage]],
+        protect_content: bool,
+        tally: Counter,
+    ) -> int:
+        """
+        Forwards one chunk in a single call, copying group by group on failure.
+
+        Args:
+            chat_id (int): The ID of the receiving chat.
+            from_chat_id (int): The ID of the chat holding the messages.
+            chunk (List[List[StoredMessage]]): Groups totalling up to
+                `CHUNK_SIZE` messages.
+            protect_content (bool): Whether the delivered messages are protected.
+            tally (Counter): The delivery's RPC count.
+
+        Returns:
+            int: The number of messages delivered.
+        """
+        message_ids = [message.id for group in chunk for message in group]
+        random_ids = [self.client.rnd_id() for _ in message_ids]
+        while True:
+            try:
+                tally["rpcs"] += 1
+                result = await self.client.invoke(
+                    raw.functions.messages.ForwardMessages(
+                        from_peer=await self.client.resolve_peer(from_chat_id),
+                        to_peer=await self.client.resolve_peer(chat_id),
+                        id=message_ids,
+                        random_id=random_ids,
+                        drop_author=True,
+                        noforwards=protect_content,
+                    )
+                )
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+            except errors.RPCError as rpc:
+                logger.warning(f"Delivery: Bulk Forward Failed ({rpc.MESSAGE})")
+                break
+
+            # Deleted IDs the index still lists are skipped without an error
+            sent, dead = self.forwarded(result, message_ids, random_ids)
+            if dead:
+                await self.fetcher.mark_deleted(from_chat_id, dead)
+            missing = set(dead)
+            self.albums += sum(
+                len(group) > 1 and not any(record.id in missing for record in group)
+                for group in chunk
+            )
+            self.saved += max(sent - 1, 0)
+            return sent
+
+        self.fallbacks += 1
+        messages = await self.refetch(
+            from_chat_id, [record.id for group in chunk for record in group], tally
+        )
+
+        sent = 0
+        for group in chunk:
+            items = [messages[record.id] for record in group if record.id in messages]
+            if len(items) > 1:
+                delivered = await self.copy_album(chat_id, items, protect_content, tally)
+                if delivered:
+                    sent += delivered
+                    continue
+            for message in items:
+                sent += await self.copy_one(chat_id, message, protect_content, tally)
+        return sent
+
+    @staticmethod
+    def forwarded(
+        result: object, message_ids: List[int], random_ids: List[int]
+    ) -> Tuple[int, List[int]]:
+        """
+        Reads which messages a `ForwardMessages` call actually sent.
+
+        Telegram skips deleted IDs without raising, so the result is the
+        only account of what arrived: an `UpdateMessageID` per sent message,
+        carrying the `random_id` it was sent with.
+
+        Args:
+            result (object): The `Updates` returned by the call.
+            message_ids (List[int]): The IDs forwarded, in order.
+            random_ids (List[int]): Their random IDs, in the same order.
+
+        Returns:
+            Tuple[int, List[int]]: The number of messages sent and the IDs
+            that were not (empty when the result does not tell).
+        """
+        updates = getattr(result, "updates", None)
+        if updates is None:
+            return len(message_ids), []
+
+        sent_random = {
+            update.random_id
+            for update in updates
+            if isinstance(update, raw.types.UpdateMessageID)
+        }
+        if sent_random:
+            dead = [
+                message_id
+                for message_id, random_id in zip(message_ids, random_ids)
+                if random_id not in sent_random
+            ]
+            return len(message_ids) - len(dead), dead
+
+        # No random IDs to match: count the new messages, blame none
+        new = sum(
+            isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage))
+            for update in updates
+        )
+        return min(new, len(message_ids)), []
+
+    async def refetch(
+        self, from_chat_id: int, message_ids: List[int], tally: Counter
+    ) -> Dict[int, Message]:
+        """
+        Fetches full messages for copying, waiting out flood limits.
+
+        Args:
+            from_chat_id (int): The ID of the chat holding the messages.
+            message_ids (List[int]): Up to `CHUNK_SIZE` message IDs.
+            tally (Counter): The delivery's RPC count.
+
+        Returns:
+            Dict[int, Message]: The non-empty messages by ID.
+        """
+        if not message_ids:
+            return {}
+
+        while True:
+            try:
+                tally["rpcs"] += 1
+                messages = await self.client.get_messages(from_chat_id, message_ids)
+                break
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+            except errors.RPCError:
+                return {}
+
+        # Deleted after they were cached or indexed: do not try them again
+        dead = [message.id for message in messages if message.empty]
+        if dead:
+            await self.fetcher.mark_deleted(from_chat_id, dead)
+        return {message.id: message for message in messages if not message.empty}
+
+    async def copy_album(
+        self, chat_id: int, messages: List[Message], protect_content: bool, tally: Counter
+    ) -> int:
+        """
+        Sends album items as one album, waiting out flood limits.
+
+        Only the fetched items are sent (`copy_media_group` would copy the
+        whole source album, including items outside the link or page).
+
+        Args:
+            chat_id (int): The ID of the receiving chat.
+            messages (List[Message]): The (re-fetched) album items, in order.
+            protect_content (bool): Whether the delivered messages are protected.
+            tally (Counter): The delivery's RPC count.
+
+        Returns:
+            int: The number of messages delivered, 0 if the caller should copy
+            them one by one instead.
+        """
+        media = []
+        for message in messages:
+            input_media = self.ALBUM_MEDIA.get(message.media)
+            if input_media is None:
+                return 0
+            media.append(
+                input_media(
+                    getattr(message, message.media.value).file_id,
+                    caption=message.caption or "",
+                    caption_entities=message.caption_entities,
+                )
+            )
+
+        while True:
+            try:
+                tally["rpcs"] += 1
+                await self.client.send_media_group(
+                    chat_id, media, protect_content=protect_content
+                )
+                self.albums += 1
+                self.saved += len(messages) - 1
+                return len(messages)
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+            except (errors.RPCError, ValueError):
+                return 0
+
+    async def copy_one(
+        self, chat_id: int, message: Message, protect_content: bool, tally: Counter
+    ) -> int:
+        """
+        Copies a single message, waiting out flood limits.
+
+        Args:
+            chat_id (int): The ID of the receiving chat.
+            message (Message): The (re-fetched) message.
+            protect_content (bool): Whether the delivered message is protected.
+            tally (Counter): The delivery's RPC count.
+
+        Returns:
+            int: 1 if the message was delivered, 0 otherwise.
+        """
+        while True:
+            try:
+                tally["rpcs"] += 1
+                await message.copy(chat_id, protect_content=protect_content)
+                return 1
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+            except (errors.RPCError, ValueError):
+                # ValueError: service messages cannot be copied
+                return 0
+
+
+delivery_engine: DeliveryEngine = DeliveryEngine(bot, message_fetcher)
@@ -0,0 +1,236 @@
+import asyncio
+from collections import Counter
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+import hydrogram
+from hydrogram import errors
+from hydrogram.types import Message
+
+from bot.base import bot
+from bot.utils import SingleFlight, logger, single_flight
+
+from .message_cache import MessageCache, StoredMessage, message_cache
+from .message_index import MessageIndex, message_index
+from .tombstones import Tombstones, tombstones
+
+
+class MessageFetcher:
+    """
+    Fetches stored messages in pages, streaming instead of materializing.
+
+    `get_messages` accepts at most `PAGE_SIZE` IDs per call, so a link
+    covering thousands of messages is walked page by page. While the caller
+    handles one page the next one is already being fetched, and at most two
+    pages are held at a time, so memory stays bounded whatever the range
+    size. Empty (deleted) messages are dropped before they reach the caller.
+
+    Messages are read through a `MessageCache` and handed out as compact
+    `StoredMessage` records. IDs missing from the cache are looked up in the
+    `MessageIndex`, and only those it does not know are fetched (and then
+    indexed), so a hot or indexed link costs no `get_messages` call at all.
+    Concurrent fetches of the same IDs (many users opening a freshly posted
+    link) share one call through a `SingleFlight`. IDs found in `Tombstones`
+    are left out before paging, so pages hold live messages only.
+
+    Attributes:
+        PAGE_SIZE (int): The maximum number of IDs per `get_messages` call.
+        pages (int): The number of `get_messages` calls made.
+        fetched (int): The number of non-empty messages returned.
+        skipped (int): The number of empty messages dropped.
+    """
+
+    PAGE_SIZE: int = 200
+
+    def __init__(
+        self,
+        client: hydrogram.Client,
+        cache: MessageCache,
+        index: MessageIndex,
+        tombstones: Tombstones,
+        flight: SingleFlight,
+    ) -> None:
+        """
+        Initializes the fetcher with the given bot client.
+
+        Args:
+            client (hydrogram.Client): The bot client instance.
+            cache (MessageCache): The cache read before fetching.
+            index (MessageIndex): The index read before fetching.
+            tombstones (Tombstones): The deleted IDs left out before fetching.
+            flight (SingleFlight): Coalesces concurrent fetches of the same IDs.
+        """
+        self.client = client
+        self.cache = cache
+        self.index = index
+        self.tombstones = tombstones
+        self.flight = flight
+        self.pages: int = 0
+        self.fetched: int = 0
+        self.skipped: int = 0
+
+    async def fetch(
+        self, chat_id: int, message_ids: Sequence[int], tally: Optional[Counter] = None
+    ) -> List[StoredMessage]:
+        """
+        Fetches one page of messages, waiting out flood limits.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Sequence[int]): Up to `PAGE_SIZE` message IDs.
+            tally (Optional[Counter]): The caller's RPC count, bumped under
+                "rpcs" only if this call (not a coalesced one) hits Telegram.
+
+        Returns:
+            List[StoredMessage]: The non-empty messages, in the order requested.
+        """
+        records = self.cache.get_many(chat_id, message_ids)
+        missing = tuple(
+            message_id for message_id in message_ids if message_id not in records
+        )
+        if missing:
+            # Keyed on the set: the same IDs in another order share the call
+            records.update(
+                await self.flight.do(
+                    ("get_messages", chat_id, frozenset(missing)),
+                    self.fetch_missing,
+                    chat_id,
+                    missing,
+                    tally,
+                )
+            )
+
+        found = [
+            records[message_id]
+            for message_id in message_ids
+            if message_id in records and not records[message_id].empty
+        ]
+        self.fetched += len(found)
+        self.skipped += len(message_ids) - len(found)
+        return found
+
+    async def fetch_missing(
+        self, chat_id: int, message_ids: Sequence[int], tally: Optional[Counter] = None
+    ) -> Dict[int, StoredMessage]:
+        """
+        Resolves messages absent from the cache, from the index or Telegram.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Sequence[int]): Up to `PAGE_SIZE` message IDs.
+            tally (Optional[Counter]): The caller's RPC count.
+
+        Returns:
+            Dict[int, StoredMessage]: The records by message ID, empty ones
+            included; IDs not posted yet are absent.
+        """
+        records = await self.index.get_many(chat_id, message_ids)
+        for record in records.values():
+            self.cache.put(record)
+
+        missing = [message_id for message_id in message_ids if message_id not in records]
+        while missing:
+            try:
+                messages = await self.client.get_messages(chat_id, missing)
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+                continue
+
+            self.pages += 1
+            if tally is not None:
+                tally["rpcs"] += 1
+            # Empty above the newest message means not posted yet, not deleted:
+            # leave those unknown so a later post is fetched
+            self.index.see(chat_id, messages)
+            messages = [
+                message
+                for message in messages
+                if not message.empty or self.index.posted(chat_id, message.id)
+            ]
+            for message in messages:
+                record = StoredMessage.from_message(chat_id, message)
+                self.cache.put(record)
+                records[record.id] = record
+            await self.index.add(chat_id, messages)
+            break
+
+        # Every empty record left is below a live message, so truly deleted
+        self.tombstones.add(
+            chat_id, [record.id for record in records.values() if record.empty]
+        )
+        self.tombstones.discard(
+            chat_id, [record.id for record in records.values() if not record.empty]
+        )
+        return records
+
+    async def mark_deleted(self, chat_id: int, message_ids: List[int]) -> None:
+        """
+        Records deleted messages everywhere a fetch would look for them.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (List[int]): The deleted message IDs.
+        """
+        self.tombstones.add(chat_id, message_ids)
+        self.cache.invalidate(chat_id, message_ids)
+        await self.index.mark_deleted(chat_id, message_ids)
+
+    async def mark_posted(self, chat_id: int, messages: List[Message]) -> None:
+        """
+        Records new posts, replacing whatever was known of their IDs.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            messages (List[Message]): The posted messages.
+        """
+        message_ids = [message.id for message in messages]
+        self.tombstones.discard(chat_id, message_ids)
+        self.cache.invalidate(chat_id, message_ids)
+        await self.index.add(chat_id, messages)
+
+    async def iter_pages(
+        self, chat_id: int, message_ids: Iterable[int], tally: Optional[Counter] = None
+    ) -> AsyncIterator[List[StoredMessage]]:
+        """
+        Yields the non-empty messages page by page, prefetching the next page.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The message IDs; a `range` stays lazy.
+            tally (Optional[Counter]): The caller's RPC count.
+
+        Yields:
+            List[StoredMessage]: The non-empty messages of one page.
+        """
+        live = self.tombstones.live(chat_id, message_ids)
+        task: Optional[asyncio.Task] = None
+        try:
+            page_ids = list(islice(live, self.PAGE_SIZE))
+            while page_ids:
+                if task is None:
+                    task = asyncio.create_task(self.fetch(chat_id, page_ids, tally))
+                page = await task
+
+                following = page_ids = list(islice(live, self.PAGE_SIZE))
+                task = (
+                    asyncio.create_task(self.fetch(chat_id, following, tally))
+                    if following
+                    else None
+                )
+                if page:
+                    yield page
+        finally:
+            # The caller stopped early: do not leave a prefetch running, and
+            # consume the error of one that already failed, so asyncio does
+            # not log "Task exception was never retrieved"
+            if task is not None:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()
+
+
+message_fetcher: MessageFetcher = MessageFetcher(
+    bot, message_cache, message_index, tombstones, single_flight
+)
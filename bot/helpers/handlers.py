@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Union
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import hydrogram
 from hydrogram import enums, errors
@@ -12,17 +13,42 @@ from bot.db_funcs import (
     get_generate_status,
     get_protect_content,
     get_start_text_msg,
+    settings,
+)
+from bot.utils import (
+    TTLCache,
+    config,
+    get_chat,
+    get_histogram,
+    logger,
 )
-from bot.utils import config, logger
 from bot.db_funcs.text import (
+    get_custom_caption_text,
     get_sponsor_text_msg,
     get_sponsor_photo_msg,
 )
 
-from .url_safe import url_safe
+from .channel_registry import channel_registry
+from .link_codec import ManifestRef, MessageIds, link_codec
+from .manifests import link_manifests
+from .member_index import member_index
+from .templates import CAPTION_FIELDS, USER_FIELDS, Template
 
 
 class HelperHandlers:
+    # Settings keys mapped to the init method caching them
+    SETTINGS_INITS: Dict[str, str] = {
+        "START_TEXT": "start_text_init",
+        "FORCE_TEXT": "force_text_init",
+        "GENERATE_URL": "generate_status_init",
+        "PROTECT_CONTENT": "protect_content_init",
+        "BOT_ADMINS": "admins_init",
+        "FSUB_CHATS": "fs_chats_init",
+        "SPONSOR_TEXT": "sponsor_text_init",
+        "SPONSOR_PHOTO": "sponsor_photo_init",
+        "CUSTOM_CAPTION_TEXT": "custom_caption_init",
+    }
+
     def __init__(self, client: hydrogram.Client) -> None:
         """
         Initializes the HelperHandlers with the given bot client.
@@ -39,6 +65,40 @@ class HelperHandlers:
         self.generate_status: bool = False
         self.sponsor_text: str = ""
         self.sponsor_photo: str = ""
+        # Parsed once per change, rendered on every request
+        self.start_template: Template = Template("", USER_FIELDS)
+        self.force_template: Template = Template("", USER_FIELDS)
+        self.sponsor_template: Template = Template("", USER_FIELDS)
+        self.caption_template: Template = Template("", CAPTION_FIELDS)
+        # Bounds membership RPCs across all requests; created on first use
+        self.fsub_semaphore: Optional[asyncio.Semaphore] = None
+        self.fsub_failures: int = 0
+        self.fsub_latency = get_histogram("Force-Sub Check")
+        # (chat_id, user_id) -> joined; only definite answers are cached
+        self.membership_cache: TTLCache[Tuple[int, int], bool] = TTLCache(
+            config.FSUB_CACHE_SIZE
+        )
+
+        settings.add_listener(self.settings_changed)
+
+    async def settings_init(self) -> None:
+        """
+        Initializes every cached field from the loaded settings snapshot.
+
+        The snapshot is filled by `initial_database()`, so this costs no
+        database reads; only `fs_chats_init` talks to Telegram.
+        """
+        await self.settings_changed(set(self.SETTINGS_INITS))
+
+    async def settings_changed(self, keys: Set[str]) -> None:
+        """
+        Re-initializes only the cached fields whose settings keys changed.
+
+        Args:
+            keys (Set[str]): The settings keys changed by another process.
+        """
+        inits = {self.SETTINGS_INITS[key] for key in keys if key in self.SETTINGS_INITS}
+        await asyncio.gather(*(getattr(self, init)() for init in inits))
 
     async def start_text_init(self) -> str:
         """
@@ -48,6 +108,7 @@ class HelperHandlers:
             str: The start text.
         """
         self.start_text = await get_start_text_msg()
+        self.start_template = Template(self.start_text, USER_FIELDS)
         return self.start_text
 
     async def force_text_init(self) -> str:
@@ -58,6 +119,7 @@ class HelperHandlers:
             str: The force text.
         """
         self.force_text = await get_force_text_msg()
+        self.force_template = Template(self.force_text, USER_FIELDS)
         return self.force_text
 
     async def admins_init(self) -> List[int]:
@@ -87,7 +149,7 @@ class HelperHandlers:
         if fs_chats:
             for i, chat_id in enumerate(fs_chats):
                 try:
-                    chat = await self.client.get_chat(chat_id=chat_id)
+                    chat = await get_chat(self.client, chat_id)
                     chat_type = (
                         "Group"
                         if chat.type
@@ -109,6 +171,7 @@ class HelperHandlers:
         else:
             logger.info("Sub. Chats: None")
 
+        await member_index.retain(self.fs_chats)
         return self.fs_chats
 
     async def protect_content_init(self) -> bool:
@@ -131,10 +194,67 @@ class HelperHandlers:
         self.generate_status = await get_generate_status()
         return self.generate_status
 
+    async def is_member(self, chat_id: int, user_id: int) -> bool:
+        """
+        Checks whether a user is a member of a subscription chat.
+
+        The member index (fed by `chat_member` updates) is asked first, then
+        the membership cache, and only then Telegram. Index entries and cached
+        answers are trusted for long when they say "joined" (`FSUB_INDEX_MAX_AGE`,
+        `FSUB_CACHE_TTL`) but only `FSUB_CACHE_NEGATIVE_TTL` seconds when they
+        say "not joined", so "Try Again" right after joining is not refused
+        for long. "Joined" answers also go into the index.
+
+        At most `FSUB_CHECK_CONCURRENCY` checks run at once, each limited to
+        `FSUB_CHECK_TIMEOUT` seconds. A check that fails or times out counts
+        as joined when `FSUB_FAIL_OPEN` is set, and as not joined otherwise;
+        such guesses are never cached.
+
+        Args:
+            chat_id (int): The ID of the subscription chat.
+            user_id (int): The ID of the user to check.
+
+        Returns:
+            bool: True if the user is (assumed to be) a member.
+        """
+        indexed = member_index.get(chat_id, user_id)
+        if indexed is not None:
+            return indexed
+
+        cached = self.membership_cache.get((chat_id, user_id))
+        if cached is not None:
+            return cached
+
+        if self.fsub_semaphore is None:
+            self.fsub_semaphore = asyncio.Semaphore(config.FSUB_CHECK_CONCURRENCY)
+
+        async with self.fsub_semaphore:
+            try:
+                await asyncio.wait_for(
+                    self.client.get_chat_member(chat_id, user_id),
+                    timeout=config.FSUB_CHECK_TIMEOUT,
+                )
+                joined = True
+            except errors.UserNotParticipant:
+                joined = False
+            except (asyncio.TimeoutError, errors.RPCError) as exc:
+                self.fsub_failures += 1
+                logger.warning(f"Sub. Check {chat_id}: {exc.__class__.__name__}")
+                return config.FSUB_FAIL_OPEN
+
+        ttl = config.FSUB_CACHE_TTL if joined else config.FSUB_CACHE_NEGATIVE_TTL
+        self.membership_cache.set((chat_id, user_id), joined, ttl)
+        if joined:
+            member_index.set(chat_id, user_id, True)
+        return joined
+
     async def user_is_not_join(self, user_id: int) -> Optional[List[int]]:
         """
         Checks which subscription chats the user has not joined yet.
 
+        All chats are checked concurrently, so the cost is one round trip
+        rather than one per chat.
+
         Args:
             user_id (int): The ID of the user to check.
 
@@ -145,46 +265,50 @@ class HelperHandlers:
         if not chat_ids or user_id in self.admins:
             return None
 
-        already_joined = set()
-        for chat_id in chat_ids:
-            try:
-                await self.client.get_chat_member(chat_id, user_id)
-                already_joined.add(chat_id)
-            except errors.RPCError:
-                continue
+        with self.fsub_latency.time():
+            joined = await asyncio.gather(
+                *(self.is_member(chat_id, user_id) for chat_id in chat_ids)
+            )
 
-        return [chat_id for chat_id in chat_ids if chat_id not in already_joined]
+        return [chat_id for chat_id, member in zip(chat_ids, joined) if not member]
 
-    def decode_data(self, encoded_data: str) -> Union[List[int], range]:
+    async def decode_data(self, encoded_data: str) -> Optional[Tuple[int, MessageIds]]:
         """
-        Decodes the given encoded data into a list of IDs or a range of IDs.
+        Decodes the given encoded data into a channel and its message IDs.
+
+        Legacy codes are tried against every registered database channel;
+        manifest codes are resolved to their IDs.
 
         Args:
             encoded_data (str): The encoded data to decode.
 
         Returns:
-            Union[List[int], range]: A list of IDs or a range of IDs.
+            Optional[Tuple[int, MessageIds]]: The channel ID and a list or
+            range of message IDs, or None if the code is invalid.
         """
-        database_chat_id = config.DATABASE_CHAT_ID
-        decoded_data = url_safe.decode_data(encoded_data).split("-")
-        if len(decoded_data) == 2:
-            return [int(int(decoded_data[1]) / abs(database_chat_id))]
-
-        elif len(decoded_data) == 3:
-            start_id = int(int(decoded_data[1]) / abs(database_chat_id))
-            end_id = int(int(decoded_data[2]) / abs(database_chat_id))
-            if start_id < end_id:
-                return range(start_id, end_id + 1)
-            else:
-                return range(start_id, end_id - 1, -1)
+        decoded = link_codec.decode(encoded_data, channel_registry.channels)
+        if decoded and isinstance(decoded[1], ManifestRef):
+            return await link_manifests.resolve(decoded[1].key)
+        return decoded
 
     async def sponsor_text_init(self) -> str:
         self.sponsor_text = await get_sponsor_text_msg()
+        self.sponsor_template = Template(self.sponsor_text, USER_FIELDS)
         return self.sponsor_text
 
     async def sponsor_photo_init(self) -> str:
         self.sponsor_photo = await get_sponsor_photo_msg()
         return self.sponsor_photo
 
+    async def custom_caption_init(self) -> Template:
+        """
+        Initializes the custom caption template from the database.
+
+        Returns:
+            Template: The parsed custom caption.
+        """
+        self.caption_template = Template(await get_custom_caption_text(), CAPTION_FIELDS)
+        return self.caption_template
+
 
 helper_handlers: HelperHandlers = HelperHandlers(bot)
@@ -0,0 +1,321 @@
+import base64
+import binascii
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from bot.utils import config
+
+from .channel_registry import ChannelRegistry, channel_registry
+from .url_safe import url_safe
+
+MessageIds = Union[range, List[int]]
+
+
+class ManifestRef(NamedTuple):
+    """A decoded link whose IDs are stored server-side, under `key`."""
+
+    key: int
+
+
+class LinkCodec:
+    """
+    Packs a channel and its message IDs into a short, URL-safe deep-link code.
+
+    Layout (then URL-safe base64 without padding)::
+
+        version | channel | kind | body
+
+    Every number is an unsigned LEB128 varint; signed deltas are zigzag
+    encoded first.
+
+    - `channel` is, in version 2, the channel's index in the
+      `ChannelRegistry` (one byte for the first 128 channels). Version 1,
+      still written for unregistered channels, stores 0 for
+      `config.DATABASE_CHAT_ID`, otherwise the ID without its `-100` prefix.
+    - `KIND_SINGLE`: the message ID.
+    - `KIND_RANGE`: the first ID, then the signed distance to the last one
+      (a batch may run backwards).
+    - `KIND_MULTI`: the number of runs, then for each run of consecutive IDs
+      its signed distance from the previous run's end and its length - 1.
+    - `KIND_MANIFEST`: the key of a stored link manifest; decoding yields a
+      `ManifestRef` for the caller to resolve.
+
+    Legacy codes (base64 of `id-<id*|chat|>[-<id*|chat|>]`) are still
+    decoded. Their IDs are recovered by exact integer division against the
+    candidate channels, instead of float division by the configured one.
+
+    Attributes:
+        VERSION (int): The version byte of registry-indexed codes.
+        VERSION_CHANNEL_ID (int): The version byte of channel-ID codes.
+        KIND_SINGLE (int): Body holds one message ID.
+        KIND_RANGE (int): Body holds a range of message IDs.
+        KIND_MULTI (int): Body holds runs of consecutive message IDs.
+        KIND_MANIFEST (int): Body holds the key of a link manifest.
+        MAX_MULTI_IDS (int): The most IDs a multi-range code may expand to.
+    """
+
+    VERSION: int = 2
+    VERSION_CHANNEL_ID: int = 1
+    KIND_SINGLE: int = 0
+    KIND_RANGE: int = 1
+    KIND_MULTI: int = 2
+    KIND_MANIFEST: int = 3
+    MAX_MULTI_IDS: int = 10_000
+
+    CHANNEL_PREFIX: int = 10**12
+
+    def __init__(self, registry: ChannelRegistry) -> None:
+        """
+        Initializes the codec.
+
+        Args:
+            registry (ChannelRegistry): Maps channels to link indexes.
+        """
+        self.registry = registry
+
+    @staticmethod
+    def write_varint(buffer: bytearray, value: int) -> None:
+        """Appends an unsigned LEB128 varint."""
+        while value > 0x7F:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    @staticmethod
+    def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+        """Reads an unsigned LEB128 varint, returning it and the next position."""
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, pos
+            shift += 7
+
+    @staticmethod
+    def zigzag(value: int) -> int:
+        """Maps a signed integer to an unsigned one (0, -1, 1, -2 -> 0, 1, 2, 3)."""
+        return value * 2 if value >= 0 else -value * 2 - 1
+
+    @staticmethod
+    def unzigzag(value: int) -> int:
+        """Reverses `zigzag`."""
+        return value // 2 if not value & 1 else -(value + 1) // 2
+
+    @staticmethod
+    def runs(message_ids: Iterable[int]) -> List[Tuple[int, int]]:
+        """
+        Splits IDs into runs of consecutive ascending IDs.
+
+        Args:
+            message_ids (Iterable[int]): The IDs, in delivery order.
+
+        Returns:
+            List[Tuple[int, int]]: (first ID, length) per run.
+        """
+        runs: List[Tuple[int, int]] = []
+        for message_id in message_ids:
+            if runs and runs[-1][0] + runs[-1][1] == message_id:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((message_id, 1))
+        return runs
+
+    @staticmethod
+    def is_run(message_ids: Sequence[int]) -> bool:
+        """Tells whether IDs are one run of consecutive IDs, either direction."""
+        if isinstance(message_ids, range):
+            return message_ids.step in (1, -1)
+        if not message_ids:
+            return False
+
+        first, last = message_ids[0], message_ids[-1]
+        if len(message_ids) != abs(last - first) + 1:
+            return False
+        step = 1 if last >= first else -1
+        return all(a + step == b for a, b in zip(message_ids, message_ids[1:]))
+
+    def header(self, chat_id: int) -> bytearray:
+        """Starts a payload with the version and `channel` fields of a chat ID."""
+        index = self.registry.index(chat_id)
+        if index is not None:
+            buffer = bytearray([self.VERSION])
+            self.write_varint(buffer, index)
+        else:
+            buffer = bytearray([self.VERSION_CHANNEL_ID])
+            ref = 0 if chat_id == config.DATABASE_CHAT_ID else -chat_id - self.CHANNEL_PREFIX
+            self.write_varint(buffer, ref)
+        return buffer
+
+    def channel_id(self, version: int, ref: int) -> Optional[int]:
+        """Reverses `header`, or None for an unknown registry index."""
+        if version == self.VERSION:
+            return self.registry.channel(ref)
+        if ref == 0:
+            return config.DATABASE_CHAT_ID
+        return -(ref + self.CHANNEL_PREFIX)
+
+    def encode(self, chat_id: int, message_ids: Sequence[int]) -> str:
+        """
+        Encodes a channel and message IDs into a deep-link code.
+
+        Args:
+            chat_id (int): The ID of the channel holding the messages.
+            message_ids (Sequence[int]): The IDs; one run of consecutive IDs
+                (ascending or descending) is stored as its two ends.
+
+        Returns:
+            str: The URL-safe code.
+
+        Raises:
+            ValueError: If the IDs are not one run and there are more than
+                `MAX_MULTI_IDS` of them, which `decode` would refuse.
+        """
+        buffer = self.header(chat_id)
+
+        if len(message_ids) == 1:
+            buffer.append(self.KIND_SINGLE)
+            self.write_varint(buffer, message_ids[0])
+        elif self.is_run(message_ids):
+            buffer.append(self.KIND_RANGE)
+            self.write_varint(buffer, message_ids[0])
+            self.write_varint(buffer, self.zigzag(message_ids[-1] - message_ids[0]))
+        elif len(message_ids) > self.MAX_MULTI_IDS:
+            raise ValueError(f"A link holds at most {self.MAX_MULTI_IDS} scattered IDs")
+        else:
+            runs = self.runs(message_ids)
+            buffer.append(self.KIND_MULTI)
+            self.write_varint(buffer, len(runs))
+            previous = 0
+            for start, length in runs:
+                self.write_varint(buffer, self.zigzag(start - previous))
+                self.write_varint(buffer, length - 1)
+                previous = start + length - 1
+
+        return self.to_code(buffer)
+
+    def encode_manifest(self, chat_id: int, key: int) -> str:
+        """
+        Encodes a reference to a stored link manifest.
+
+        Args:
+            chat_id (int): The ID of the channel holding the messages.
+            key (int): The manifest key.
+
+        Returns:
+            str: The URL-safe code.
+        """
+        buffer = self.header(chat_id)
+        buffer.append(self.KIND_MANIFEST)
+        self.write_varint(buffer, key)
+        return self.to_code(buffer)
+
+    @staticmethod
+    def to_code(buffer: bytearray) -> str:
+        """Turns an encoded payload into URL-safe base64 without padding."""
+        return url_safe.del_padding(base64.urlsafe_b64encode(bytes(buffer)).decode())
+
+    def decode(
+        self, code: str, candidates: Sequence[int] = ()
+    ) -> Optional[Tuple[int, Union[MessageIds, ManifestRef]]]:
+        """
+        Decodes a deep-link code, current or legacy.
+
+        Args:
+            code (str): The code from the deep link.
+            candidates (Sequence[int]): The channels a legacy code may have
+                been made for, most likely first.
+
+        Returns:
+            Optional[Tuple[int, Union[MessageIds, ManifestRef]]]: The channel
+            ID and message IDs (or manifest reference), or None if the code
+            is invalid.
+        """
+        try:
+            data = base64.urlsafe_b64decode(url_safe.add_padding(code))
+        except (binascii.Error, ValueError):
+            return None
+
+        if data.startswith(b"id-"):
+            return self.decode_legacy(data, candidates or [config.DATABASE_CHAT_ID])
+        if not data or data[0] not in (self.VERSION, self.VERSION_CHANNEL_ID):
+            return None
+
+        try:
+            ref, pos = self.read_varint(data, 1)
+            kind, pos = data[pos], pos + 1
+            if kind == self.KIND_SINGLE:
+                message_id, pos = self.read_varint(data, pos)
+                message_ids: Union[MessageIds, ManifestRef] = [message_id]
+            elif kind == self.KIND_RANGE:
+                start, pos = self.read_varint(data, pos)
+                distance, pos = self.read_varint(data, pos)
+                end = start + self.unzigzag(distance)
+                step = 1 if end >= start else -1
+                message_ids = range(start, end + step, step)
+            elif kind == self.KIND_MULTI:
+                count, pos = self.read_varint(data, pos)
+                expanded: List[int] = []
+                previous = 0
+                for _ in range(count):
+                    delta, pos = self.read_varint(data, pos)
+                    extra, pos = self.read_varint(data, pos)
+                    start = previous + self.unzigzag(delta)
+                    # Runs are expanded, so a forged code must not ask for millions
+                    if len(expanded) + extra >= self.MAX_MULTI_IDS:
+                        return None
+                    expanded.extend(range(start, start + extra + 1))
+                    previous = start + extra
+                message_ids = expanded
+            elif kind == self.KIND_MANIFEST:
+                key, pos = self.read_varint(data, pos)
+                message_ids = ManifestRef(key)
+            else:
+                return None
+        except IndexError:
+            return None
+
+        chat_id = self.channel_id(data[0], ref)
+        if pos != len(data) or chat_id is None:
+            return None
+        return chat_id, message_ids
+
+    @staticmethod
+    def decode_legacy(
+        data: bytes, candidates: Sequence[int]
+    ) -> Optional[Tuple[int, MessageIds]]:
+        """
+        Decodes a legacy `id-<n>[-<n>]` payload.
+
+        Args:
+            data (bytes): The base64-decoded payload.
+            candidates (Sequence[int]): The channels to try, most likely first.
+
+        Returns:
+            Optional[Tuple[int, MessageIds]]: The channel ID and message IDs,
+            or None if no candidate divides every number exactly.
+        """
+        try:
+            numbers = [int(part) for part in data.decode().split("-")[1:]]
+        except (UnicodeDecodeError, ValueError):
+            return None
+        if len(numbers) not in (1, 2):
+            return None
+
+        for chat_id in candidates:
+            divisor = abs(chat_id)
+            if any(number % divisor for number in numbers):
+                continue
+
+            message_ids = [number // divisor for number in numbers]
+            if len(message_ids) == 1:
+                return chat_id, message_ids
+
+            start, end = message_ids
+            step = 1 if end >= start else -1
+            return chat_id, range(start, end + step, step)
+
+        return None
+
+
+link_codec: LinkCodec = LinkCodec(channel_registry)
@@ -0,0 +1,128 @@
+import hashlib
+from typing import List, Optional, Sequence, Tuple
+
+from bot.base import database
+from bot.utils import TTLCache, config, single_flight
+
+
+class LinkManifests:
+    """
+    Server-side lists of message IDs, referenced from links by a short key.
+
+    A deep link holds at most 64 characters, which is enough for a range
+    but not for a set of scattered files. A manifest stores the channel and
+    the IDs (in delivery order) in the `LINK_MANIFESTS` collection; the
+    link only carries its key.
+
+    Keys are derived from the content, so bundling the same files twice
+    gives the same link. Manifests never change once stored, so resolved
+    ones stay in an LRU and a hot link never reaches the database.
+
+    Attributes:
+        COLLECTION (str): The collection holding the manifests.
+        KEY_BYTES (int): Hash bytes in a key (at most 7 varint bytes).
+        MAX_IDS (int): The most IDs a manifest may hold.
+        cache (TTLCache): Resolved manifests by key.
+    """
+
+    COLLECTION: str = "LINK_MANIFESTS"
+    KEY_BYTES: int = 6
+    MAX_IDS: int = 10_000
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initializes the resolver.
+
+        Args:
+            maxsize (int): The maximum number of manifests kept in memory.
+        """
+        self.cache: TTLCache = TTLCache(maxsize)
+
+    def derive_key(self, chat_id: int, message_ids: Sequence[int], salt: int = 0) -> int:
+        """
+        Derives the key of a manifest from its content.
+
+        Args:
+            chat_id (int): The ID of the channel holding the messages.
+            message_ids (Sequence[int]): The IDs, in delivery order.
+            salt (int): Bumped to step past a (very unlikely) collision.
+
+        Returns:
+            int: The key.
+        """
+        content = f"{salt}:{chat_id}:{','.join(map(str, message_ids))}".encode()
+        digest = hashlib.sha1(content).digest()[: self.KEY_BYTES]
+        return int.from_bytes(digest, "big")
+
+    async def create(self, chat_id: int, message_ids: Sequence[int]) -> int:
+        """
+        Stores a manifest, or finds the identical one already stored.
+
+        Args:
+            chat_id (int): The ID of the channel holding the messages.
+            message_ids (Sequence[int]): The IDs, in delivery order.
+
+        Returns:
+            int: The key to put in the link.
+
+        Raises:
+            ValueError: If there are no IDs or more than `MAX_IDS`.
+        """
+        message_ids = list(message_ids)
+        if not 0 < len(message_ids) <= self.MAX_IDS:
+            raise ValueError(f"A manifest holds 1 to {self.MAX_IDS} IDs")
+
+        salt = 0
+        while True:
+            key = self.derive_key(chat_id, message_ids, salt)
+            stored = await self.resolve(key)
+            if stored is None:
+                break
+            if stored == (chat_id, message_ids):
+                return key
+            salt += 1
+
+        await database.set_records(
+            self.COLLECTION, {key: {"chat": chat_id, "ids": message_ids}}
+        )
+        self.cache.set(key, (chat_id, message_ids), float("inf"))
+        return key
+
+    async def resolve(self, key: int) -> Optional[Tuple[int, List[int]]]:
+        """
+        Looks up a manifest, from memory when possible.
+
+        Args:
+            key (int): The key from the link.
+
+        Returns:
+            Optional[Tuple[int, List[int]]]: The channel ID and message IDs,
+            or None if there is no such manifest.
+        """
+        manifest = self.cache.get(key)
+        if manifest is None:
+            # Concurrent opens of a cold link share one database read
+            manifest = await single_flight.do(("manifest", key), self.load, key)
+        return manifest
+
+    async def load(self, key: int) -> Optional[Tuple[int, List[int]]]:
+        """
+        Reads a manifest from the database and keeps it in memory.
+
+        Args:
+            key (int): The key from the link.
+
+        Returns:
+            Optional[Tuple[int, List[int]]]: The channel ID and message IDs,
+            or None if there is no such manifest.
+        """
+        record = (await database.get_records(self.COLLECTION, [key])).get(key)
+        if record is None:
+            return None
+
+        manifest = (record["chat"], list(record["ids"]))
+        self.cache.set(key, manifest, float("inf"))
+        return manifest
+
+
+link_manifests: LinkManifests = LinkManifests(config.MANIFEST_CACHE_SIZE)
@@ -0,0 +1,162 @@
+from typing import Any, Dict, Optional
+
+from hydrogram import Client, errors
+from hydrogram.types import Message
+
+from bot.db_funcs import settings
+from bot.utils import config, logger, single_flight
+
+
+class MediaCache:
+    """
+    Telegram `file_id`s of the photos configured by URL.
+
+    Sending a photo by URL makes Telegram download it again every time,
+    which is slow and fails when the host is. The first send of a URL
+    uploads it once to the database channel (then deletes that copy); the
+    `file_id` Telegram returns is stored next to the setting (`<KEY>_FILE_ID`,
+    together with the URL it belongs to) and every send reuses it.
+
+    Concurrent first sends share that upload only, never each other's
+    delivery. If the upload fails, each caller sends the URL to its own
+    chat and the first success stores the `file_id` instead.
+
+    A stored `file_id` only counts while its URL is still the one set, so
+    changing the photo (here or in another process) invalidates it; the
+    setters in `db_funcs.text` also clear it right away. A `file_id`
+    Telegram rejects as such is dropped and the URL is sent instead.
+
+    Attributes:
+        FILE_ID_ERRORS (tuple): The errors meaning the `file_id` itself is bad.
+        hits (int): Photos sent by a stored `file_id`.
+        uploads (int): Photos sent by URL to obtain a `file_id`.
+    """
+
+    FILE_ID_ERRORS = (
+        errors.FileIdInvalid,
+        errors.FileReferenceExpired,
+        errors.FileReferenceInvalid,
+        errors.MediaEmpty,
+    )
+
+    def __init__(self) -> None:
+        """Initializes the counters."""
+        self.hits: int = 0
+        self.uploads: int = 0
+
+    @staticmethod
+    def settings_key(key: str) -> str:
+        """Returns the settings key holding the `file_id` for a photo setting."""
+        return f"{key}_FILE_ID"
+
+    async def get_file_id(self, key: str, url: str) -> Optional[str]:
+        """
+        Looks up the stored `file_id` of a photo setting.
+
+        Args:
+            key (str): The photo setting, e.g. `START_PHOTO`.
+            url (str): The URL currently set.
+
+        Returns:
+            Optional[str]: The `file_id`, or None if none is stored for `url`.
+        """
+        cached: Dict[str, str] = await settings.get_value(self.settings_key(key)) or {}
+        return cached.get("file_id") if cached.get("url") == url else None
+
+    async def store_file_id(self, key: str, url: str, file_id: str) -> None:
+        """Stores a `file_id`, unless the URL changed while it was obtained."""
+        if await settings.get_value(key) == url:
+            await settings.set_value(self.settings_key(key), {"url": url, "file_id": file_id})
+
+    async def send_photo(
+        self, client: Client, chat_id: int, key: str, url: str, **kwargs: Any
+    ) -> Message:
+        """
+        Sends a configured photo, by `file_id` when one is stored.
+
+        Args:
+            client (Client): The bot client.
+            chat_id (int): The chat to send to.
+            key (str): The photo setting, e.g. `START_PHOTO`.
+            url (str): The URL currently set.
+            **kwargs (Any): Passed on to `send_photo` (caption, markup, ...).
+
+        Returns:
+            Message: The sent message.
+        """
+        file_id = await self.get_file_id(key, url)
+        if file_id:
+            message = await self.send_file_id(client, chat_id, key, file_id, kwargs)
+            if message:
+                return message
+
+        # Concurrent first sends of a URL share one upload; if it fails,
+        # each caller sends the URL to its own chat
+        try:
+            file_id = await single_flight.do(("photo", key, url), self.upload, client, key, url)
+        except errors.RPCError as exc:
+            logger.warning(f"Media Cache: {key} Upload Failed ({exc})")
+        else:
+            message = await self.send_file_id(client, chat_id, key, file_id, kwargs)
+            if message:
+                return message
+
+        message = await client.send_photo(chat_id, url, **kwargs)
+        self.uploads += 1
+        await self.store_file_id(key, url, message.photo.file_id)
+        return message
+
+    async def send_file_id(
+        self, client: Client, chat_id: int, key: str, file_id: str, kwargs: Dict[str, Any]
+    ) -> Optional[Message]:
+        """
+        Sends a photo by `file_id`, dropping the `file_id` if Telegram rejects it.
+
+        Args:
+            client (Client): The bot client.
+            chat_id (int): The chat to send to.
+            key (str): The photo setting, e.g. `START_PHOTO`.
+            file_id (str): The stored `file_id`.
+            kwargs (Dict[str, Any]): Passed on to `send_photo`.
+
+        Returns:
+            Optional[Message]: The sent message, or None if the `file_id` is bad.
+        """
+        try:
+            message = await client.send_photo(chat_id, file_id, **kwargs)
+        except self.FILE_ID_ERRORS as exc:
+            logger.warning(f"Media Cache: {key} file_id Rejected ({exc})")
+            await settings.clear_value(self.settings_key(key))
+            return None
+
+        self.hits += 1
+        return message
+
+    async def upload(self, client: Client, key: str, url: str) -> str:
+        """
+        Uploads a photo by URL to obtain its `file_id`.
+
+        The photo goes to the database channel, where the bot can always
+        post, and is deleted again right away; the `file_id` stays valid.
+
+        Args:
+            client (Client): The bot client.
+            key (str): The photo setting, e.g. `START_PHOTO`.
+            url (str): The URL currently set.
+
+        Returns:
+            str: The `file_id`.
+        """
+        message = await client.send_photo(config.DATABASE_CHAT_ID, url, disable_notification=True)
+        self.uploads += 1
+        try:
+            await message.delete()
+        except errors.RPCError as exc:
+            logger.warning(f"Media Cache: Upload Not Deleted ({exc})")
+
+        file_id = message.photo.file_id
+        await self.store_file_id(key, url, file_id)
+        return file_id
+
+
+media_cache: MediaCache = MediaCache()
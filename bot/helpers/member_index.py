@@ -0,0 +1,220 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from bot.base import database
+from bot.utils import config, logger
+
+
+class MemberIndex:
+    """
+    A persistent index of who joined or left the subscription chats.
+
+    Fed by `chat_member` updates (the bot is admin in every subscription
+    chat) and by positive `get_chat_member` answers. Entries live in memory
+    as signed timestamps (positive: joined, negative: left) and are written
+    to the `FSUB_MEMBERS` collection in the background, one record per
+    (chat, user) pair.
+
+    Updates can be missed while the bot is offline, so entries older than
+    `FSUB_INDEX_MAX_AGE` seconds count as unknown and the caller falls back
+    to asking Telegram. A missed join must not keep blocking a user, so
+    "left" entries are only trusted for `FSUB_CACHE_NEGATIVE_TTL` seconds,
+    like a cached "not joined" answer. Stale records are deleted when the
+    index is loaded, and expired entries are evicted from memory every
+    `EVICT_INTERVAL` seconds, so neither grows without bound.
+
+    Attributes:
+        COLLECTION (str): The collection holding the records.
+        EVICT_INTERVAL (int): Seconds between evictions of expired entries.
+        DELETE_BATCH (int): The maximum number of stale records per delete.
+        members (Dict[int, Dict[int, int]]): Chat ID -> user ID -> signed timestamp.
+        pending (Dict[str, Dict[str, Any]]): Records not yet written.
+        hits (int): Lookups answered by the index.
+        misses (int): Lookups for unknown or stale pairs.
+    """
+
+    COLLECTION: str = "FSUB_MEMBERS"
+    EVICT_INTERVAL: int = 3600
+    DELETE_BATCH: int = 5000
+
+    def __init__(self) -> None:
+        """Initializes an empty index."""
+        self.members: Dict[int, Dict[int, int]] = {}
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(users) for users in self.members.values())
+
+    @staticmethod
+    def record_id(chat_id: int, user_id: int) -> str:
+        """Builds the record ID of a (chat, user) pair."""
+        return f"{chat_id}:{user_id}"
+
+    @staticmethod
+    def max_age(stamp: int) -> int:
+        """Returns the seconds an entry is trusted: joins long, leaves briefly."""
+        return config.FSUB_INDEX_MAX_AGE if stamp > 0 else config.FSUB_CACHE_NEGATIVE_TTL
+
+    async def load(self) -> int:
+        """
+        Loads the stored, still fresh entries into memory.
+
+        Records older than `FSUB_INDEX_MAX_AGE` can never be trusted again
+        and are deleted, so the collection (and every boot's scan of it)
+        stays bounded.
+
+        Returns:
+            int: The number of entries loaded.
+        """
+        oldest = time.time() - config.FSUB_INDEX_MAX_AGE
+        members: Dict[int, Dict[int, int]] = {}
+        stale: List[str] = []
+        async for record in database.iter_records(self.COLLECTION):
+            if record.get("at", 0) < oldest:
+                stale.append(record["_id"])
+                continue
+            stamp = record["at"] if record.get("joined") else -record["at"]
+            members.setdefault(record["chat"], {})[record["user"]] = stamp
+
+        # Deleted after the scan, not while its cursor is open
+        for start in range(0, len(stale), self.DELETE_BATCH):
+            await database.del_records(self.COLLECTION, stale[start : start + self.DELETE_BATCH])
+
+        self.members = members
+        logger.info(f"Member Index: {len(self)} Entries Loaded, {len(stale)} Stale Removed")
+        return len(self)
+
+    def evict(self) -> int:
+        """
+        Drops the entries `get` would no longer trust from memory.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        now = time.time()
+        evicted = 0
+        for chat_id in list(self.members):
+            users = self.members[chat_id]
+            expired = [
+                user_id
+                for user_id, stamp in users.items()
+                if now - abs(stamp) > self.max_age(stamp)
+            ]
+            for user_id in expired:
+                del users[user_id]
+            evicted += len(expired)
+            if not users:
+                del self.members[chat_id]
+        return evicted
+
+    def get(self, chat_id: int, user_id: int) -> Optional[bool]:
+        """
+        Looks up whether a user is in a subscription chat.
+
+        Args:
+            chat_id (int): The ID of the subscription chat.
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[bool]: Whether the user joined, or None if unknown or stale.
+        """
+        stamp = self.members.get(chat_id, {}).get(user_id)
+        if stamp is None or time.time() - abs(stamp) > self.max_age(stamp):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return stamp > 0
+
+    def set(self, chat_id: int, user_id: int, joined: bool) -> None:
+        """
+        Records that a user joined or left a subscription chat.
+
+        Args:
+            chat_id (int): The ID of the subscription chat.
+            user_id (int): The ID of the user.
+            joined (bool): Whether the user is now a member.
+        """
+        now = int(time.time())
+        self.members.setdefault(chat_id, {})[user_id] = now if joined else -now
+        self.pending[self.record_id(chat_id, user_id)] = {
+            "chat": chat_id,
+            "user": user_id,
+            "joined": joined,
+            "at": now,
+        }
+
+    async def retain(self, chat_ids: Iterable[int]) -> None:
+        """
+        Forgets the chats that are no longer subscription chats.
+
+        Args:
+            chat_ids (Iterable[int]): The current subscription chat IDs.
+        """
+        chat_ids = set(chat_ids)
+        for chat_id in [chat_id for chat_id in self.members if chat_id not in chat_ids]:
+            users = self.members.pop(chat_id)
+            record_ids = [self.record_id(chat_id, user_id) for user_id in users]
+            for record_id in record_ids:
+                self.pending.pop(record_id, None)
+            await database.del_records(self.COLLECTION, record_ids)
+            logger.info(f"Member Index: {len(users)} Entries Of {chat_id} Removed")
+
+    async def flush(self) -> int:
+        """
+        Writes the pending records in one bulk write.
+
+        Returns:
+            int: The number of records written.
+        """
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, {}
+        try:
+            await database.set_records(self.COLLECTION, batch)
+        except asyncio.CancelledError:
+            self.pending = {**batch, **self.pending}
+            raise
+        except Exception as exc:
+            self.pending = {**batch, **self.pending}
+            logger.error(f"Member Index Flush: {exc}")
+            return 0
+
+        return len(batch)
+
+    async def run(self) -> None:
+        """Flushes the pending records and evicts expired entries periodically."""
+        next_evict = time.monotonic() + self.EVICT_INTERVAL
+        while True:
+            await asyncio.sleep(config.USERS_FLUSH_INTERVAL)
+            await self.flush()
+            if time.monotonic() >= next_evict:
+                next_evict = time.monotonic() + self.EVICT_INTERVAL
+                evicted = self.evict()
+                if evicted:
+                    logger.info(f"Member Index: {evicted} Expired Entries Evicted")
+
+    def start(self) -> None:
+        """Starts the background flush loop."""
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stops the flush loop and writes whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+
+member_index: MemberIndex = MemberIndex()
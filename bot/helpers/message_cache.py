@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, Optional, Sequence
+
+from hydrogram.types import Message
+
+from bot.utils import TTLCache, config
+
+
+class StoredMessage:
+    """
+    The part of a database-channel message that delivery needs.
+
+    A full hydrogram `Message` carries its media, entities, chat and client
+    references; caching thousands of them would pin all of that in memory.
+    This record keeps only what is needed to group and forward a message.
+
+    Attributes:
+        chat_id (int): The ID of the chat holding the message.
+        id (int): The message ID.
+        media_group_id (Optional[str]): The album the message belongs to.
+        empty (bool): Whether the message was deleted.
+    """
+
+    __slots__ = ("chat_id", "id", "media_group_id", "empty")
+
+    def __init__(
+        self,
+        chat_id: int,
+        id: int,
+        media_group_id: Optional[str] = None,
+        empty: bool = False,
+    ) -> None:
+        self.chat_id = chat_id
+        self.id = id
+        self.media_group_id = media_group_id
+        self.empty = empty
+
+    def __repr__(self) -> str:
+        return f"StoredMessage({self.chat_id}, {self.id}, {self.media_group_id!r}, {self.empty})"
+
+    @classmethod
+    def from_message(cls, chat_id: int, message: Message) -> "StoredMessage":
+        """
+        Builds a record from a fetched message.
+
+        Args:
+            chat_id (int): The ID of the chat holding the message.
+            message (Message): The fetched message, possibly empty.
+
+        Returns:
+            StoredMessage: The compact record.
+        """
+        return cls(chat_id, message.id, message.media_group_id, bool(message.empty))
+
+
+class MessageCache:
+    """
+    Bounded LRU+TTL cache of database-channel messages.
+
+    Keyed by `(chat_id, message_id)`. Deleted messages are cached too (as
+    empty records), so a dead ID is not fetched again on every open. Edits
+    and deletions in the channel invalidate the affected entries.
+
+    Attributes:
+        ttl (float): Seconds an entry stays valid.
+        entries (TTLCache): The underlying cache.
+        invalidations (int): Entries dropped by edit or delete updates.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of cached messages.
+            ttl (float): Seconds an entry stays valid.
+        """
+        self.ttl = ttl
+        self.entries: TTLCache = TTLCache(maxsize)
+        self.invalidations: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_many(self, chat_id: int, message_ids: Sequence[int]) -> Dict[int, StoredMessage]:
+        """
+        Looks up several messages of one chat.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Sequence[int]): The message IDs.
+
+        Returns:
+            Dict[int, StoredMessage]: The cached records by message ID; IDs
+            that are missing or expired are absent.
+        """
+        found = {}
+        for message_id in message_ids:
+            record = self.entries.get((chat_id, message_id))
+            if record is not None:
+                found[message_id] = record
+        return found
+
+    def put(self, record: StoredMessage) -> None:
+        """
+        Stores a message record.
+
+        Args:
+            record (StoredMessage): The record to store.
+        """
+        self.entries.set((record.chat_id, record.id), record, self.ttl)
+
+    def invalidate(self, chat_id: int, message_ids: Iterable[int]) -> None:
+        """
+        Drops the entries of edited or deleted messages.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The affected message IDs.
+        """
+        for message_id in message_ids:
+            if self.entries.pop((chat_id, message_id)) is not None:
+                self.invalidations += 1
+
+
+message_cache: MessageCache = MessageCache(
+    config.MESSAGE_CACHE_SIZE, config.MESSAGE_CACHE_TTL
+)
@@ -0,0 +1,222 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import hydrogram
+from hydrogram import errors
+from hydrogram.types import Message
+
+from bot.base import database
+from bot.utils import logger
+
+from .message_cache import StoredMessage
+
+
+class MessageIndex:
+    """
+    A persistent index of the messages stored in the database channel.
+
+    `generate_handler` records every message it copies into the channel,
+    fetches fill in what they learn, and `backfill` scans a whole channel.
+    Deleted messages stay as empty records, so delivery can skip them and
+    group albums without asking Telegram first. Records live in the
+    `MESSAGE_INDEX` collection, one per (chat, message) pair.
+
+    Telegram also returns IDs that were not posted yet as empty messages,
+    so an empty result only means "deleted" below a message known to exist
+    (`posted`); IDs above the newest one seen are never recorded, and empty
+    records up there (written before this check) are ignored.
+
+    Attributes:
+        COLLECTION (str): The collection holding the records.
+        PAGE_SIZE (int): The maximum number of IDs per `get_messages` call.
+        EMPTY_PAGES (int): Consecutive empty pages that end a backfill.
+        hits (int): Messages answered by the index.
+        misses (int): Messages the index did not know.
+        newest (Dict[int, int]): Chat ID -> the newest message ID seen.
+    """
+
+    COLLECTION: str = "MESSAGE_INDEX"
+    PAGE_SIZE: int = 200
+    EMPTY_PAGES: int = 5
+
+    def __init__(self) -> None:
+        """Initializes the index counters."""
+        self.hits: int = 0
+        self.misses: int = 0
+        self.newest: Dict[int, int] = {}
+
+    @staticmethod
+    def record_id(chat_id: int, message_id: int) -> str:
+        """Builds the record ID of a (chat, message) pair."""
+        return f"{chat_id}:{message_id}"
+
+    @staticmethod
+    def describe(chat_id: int, message: Message) -> Dict[str, Any]:
+        """
+        Extracts the indexed fields of a message.
+
+        Args:
+            chat_id (int): The ID of the chat holding the message.
+            message (Message): The message, possibly empty.
+
+        Returns:
+            Dict[str, Any]: The record fields.
+        """
+        if message.empty:
+            return {"chat": chat_id, "id": message.id, "empty": True}
+
+        media = message.media.value if message.media else None
+        return {
+            "chat": chat_id,
+            "id": message.id,
+            "empty": False,
+            "media": media,
+            "file_unique_id": getattr(
+                getattr(message, media, None) if media else None, "file_unique_id", None
+            ),
+            "media_group_id": message.media_group_id,
+            "caption": str(message.caption) if message.caption else None,
+        }
+
+    def see(self, chat_id: int, messages: Iterable[Message]) -> None:
+        """
+        Moves the newest message ID of a chat past the non-empty messages given.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            messages (Iterable[Message]): The messages, empty ones included.
+        """
+        newest = max((message.id for message in messages if not message.empty), default=0)
+        if newest > self.newest.get(chat_id, 0):
+            self.newest[chat_id] = newest
+
+    def posted(self, chat_id: int, message_id: int) -> bool:
+        """Tells whether a message ID is at or below the newest one seen."""
+        return message_id <= self.newest.get(chat_id, 0)
+
+    async def add(self, chat_id: int, messages: Iterable[Message]) -> None:
+        """
+        Records (or refreshes) messages of a chat.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            messages (Iterable[Message]): The messages, empty ones included;
+                callers leave out empty ones that may not be posted yet.
+        """
+        messages = list(messages)
+        self.see(chat_id, messages)
+        await database.set_records(
+            self.COLLECTION,
+            {
+                self.record_id(chat_id, message.id): self.describe(chat_id, message)
+                for message in messages
+            },
+        )
+
+    async def mark_deleted(self, chat_id: int, message_ids: Iterable[int]) -> None:
+        """
+        Records messages as deleted.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The deleted message IDs.
+        """
+        await database.set_records(
+            self.COLLECTION,
+            {
+                self.record_id(chat_id, message_id): {
+                    "chat": chat_id,
+                    "id": message_id,
+                    "empty": True,
+                }
+                for message_id in message_ids
+            },
+        )
+
+    async def get_many(
+        self, chat_id: int, message_ids: Sequence[int]
+    ) -> Dict[int, StoredMessage]:
+        """
+        Looks up several messages of one chat.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Sequence[int]): The message IDs.
+
+        Returns:
+            Dict[int, StoredMessage]: The indexed messages by ID, empty ones
+            included; unknown IDs are absent.
+        """
+        records = await database.get_records(
+            self.COLLECTION,
+            [self.record_id(chat_id, message_id) for message_id in message_ids],
+        )
+        found = {
+            record["id"]: StoredMessage(
+                chat_id, record["id"], record.get("media_group_id"), record.get("empty", False)
+            )
+            for record in records.values()
+            if not record.get("empty") or self.posted(chat_id, record["id"])
+        }
+        self.hits += len(found)
+        self.misses += len(message_ids) - len(found)
+        return found
+
+    async def backfill(
+        self,
+        client: hydrogram.Client,
+        chat_id: int,
+        start: int = 1,
+        progress: Optional[Callable[[int, int], Awaitable[Any]]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Scans a chat in `PAGE_SIZE`-ID pages and records every message.
+
+        Bots cannot ask for a chat's latest message ID, so the scan ends
+        after `EMPTY_PAGES` pages in a row without any message. Empty
+        results are recorded only once a later message shows they are
+        gaps; the ones after the newest message are not posted yet.
+
+        Args:
+            client (hydrogram.Client): The bot client instance.
+            chat_id (int): The ID of the chat to scan.
+            start (int): The first message ID to scan.
+            progress (Optional[Callable[[int, int], Awaitable[Any]]]): Called
+                after every page with the IDs scanned and messages found.
+
+        Returns:
+            Tuple[int, int]: The IDs scanned and the messages found.
+        """
+        scanned = found = empty_pages = 0
+        page_start = start
+        # Empty results after the newest message found so far
+        pending: List[Message] = []
+        while empty_pages < self.EMPTY_PAGES:
+            message_ids = list(range(page_start, page_start + self.PAGE_SIZE))
+            try:
+                messages = await client.get_messages(chat_id, message_ids)
+            except errors.FloodWait as fw:
+                logger.warning(f"FloodWait: Sleep {fw.value}")
+                await asyncio.sleep(fw.value)
+                continue
+
+            present = sum(not message.empty for message in messages)
+            empty_pages = 0 if present else empty_pages + 1
+            if present:
+                last = max(i for i, message in enumerate(messages) if not message.empty)
+                await self.add(chat_id, pending + messages[: last + 1])
+                pending = messages[last + 1 :]
+            else:
+                pending.extend(messages)
+
+            scanned += len(message_ids)
+            found += present
+            page_start += self.PAGE_SIZE
+            if progress:
+                await progress(scanned, found)
+
+        logger.info(f"Message Index: {found} Messages Indexed ({scanned} IDs Scanned)")
+        return scanned, found
+
+
+message_index: MessageIndex = MessageIndex()
@@ -0,0 +1,146 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Sequence, Tuple
+
+# Placeholders each kind of template may use
+USER_FIELDS: Tuple[str, ...] = ("first_name", "last_name", "full_name", "mention")
+CAPTION_FIELDS: Tuple[str, ...] = ("original_caption", "link_file")
+
+# Tags Telegram accepts with the HTML parse mode
+TELEGRAM_TAGS = frozenset(
+    {
+        "a", "b", "blockquote", "code", "del", "em", "i", "ins", "pre", "s",
+        "span", "strike", "strong", "tg-emoji", "tg-spoiler", "u",
+    }
+)
+
+TOKEN = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+
+
+class HTMLChecker(HTMLParser):
+    """
+    Collects what Telegram would reject in a template's HTML.
+
+    Attributes:
+        errors (List[str]): The problems found, in order.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.errors: List[str] = []
+        self.open_tags: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag not in TELEGRAM_TAGS:
+            self.errors.append(f"Tag <{tag}> tidak didukung Telegram")
+        else:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in TELEGRAM_TAGS:
+            self.errors.append(f"Tag </{tag}> tidak didukung Telegram")
+        elif not self.open_tags or self.open_tags[-1] != tag:
+            self.errors.append(f"Tag penutup </{tag}> tanpa pasangan")
+        else:
+            self.open_tags.pop()
+
+    def handle_data(self, data: str) -> None:
+        if "<" in data or ">" in data:
+            self.errors.append("Karakter < atau > harus ditulis &lt; / &gt;")
+
+    def check(self, html: str) -> List[str]:
+        """
+        Checks a piece of HTML.
+
+        Args:
+            html (str): The HTML, with placeholders already taken out.
+
+        Returns:
+            List[str]: The problems found; empty if Telegram would accept it.
+        """
+        self.feed(html)
+        self.close()
+        self.errors.extend(f"Tag <{tag}> tidak ditutup" for tag in self.open_tags)
+        return self.errors
+
+
+class Template:
+    """
+    A message template, parsed once and rendered many times.
+
+    `{name}` is a placeholder and `{{` / `}}` are literal braces, as in
+    `str.format`. Parsing splits the text into literal and placeholder
+    segments, so rendering is a single join: no parsing, and nothing that
+    can raise. Problems (an unknown placeholder, a stray brace, HTML that
+    Telegram would reject) are collected in `errors` instead of raised;
+    the parts concerned are kept as literal text, so a template stored
+    before it was validated still renders.
+
+    Attributes:
+        source (str): The template as written.
+        segments (List[str]): Literal text at even and placeholder names at
+            odd indexes.
+        errors (List[str]): The problems found; empty if the template is valid.
+    """
+
+    __slots__ = ("source", "segments", "errors")
+
+    def __init__(self, source: str, fields: Sequence[str]) -> None:
+        """
+        Parses a template.
+
+        Args:
+            source (str): The template.
+            fields (Sequence[str]): The placeholders it may use.
+        """
+        self.source: str = source or ""
+        self.segments: List[str] = [""]
+        self.errors: List[str] = []
+
+        position = 0
+        for match in TOKEN.finditer(self.source):
+            self.segments[-1] += self.source[position : match.start()]
+            position = match.end()
+
+            token, name = match.group(), match.group(1)
+            if token in ("{{", "}}"):
+                self.segments[-1] += token[0]
+            elif name is not None and name.strip() in fields:
+                self.segments.extend([name.strip(), ""])
+            else:
+                self.segments[-1] += token
+                if name is None:
+                    self.errors.append(f"Kurung kurawal {token} tanpa pasangan")
+                else:
+                    self.errors.append(f"Placeholder {token} tidak dikenal")
+        self.segments[-1] += self.source[position:]
+
+        self.errors.extend(HTMLChecker().check("".join(self.segments[::2])))
+
+    def __bool__(self) -> bool:
+        return bool(self.source)
+
+    @property
+    def fields(self) -> List[str]:
+        """The placeholders the template uses, in order."""
+        return self.segments[1::2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Fills in the placeholders.
+
+        Args:
+            values (Dict[str, str]): The (HTML-safe) value of each placeholder;
+                missing ones render empty.
+
+        Returns:
+            str: The rendered text.
+        """
+        segments = self.segments[:]
+        for i in range(1, len(segments), 2):
+            segments[i] = str(values.get(segments[i]) or "")
+        return "".join(segments)
+
+    def describe_errors(self) -> str:
+        """Formats the problems found for the settings menu."""
+        return "\n".join(f"- {error}" for error in self.errors)
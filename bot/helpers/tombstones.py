@@ -0,0 +1,127 @@
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class Tombstones:
+    """
+    The set of deleted database-channel message IDs, checked before fetching.
+
+    Filled from delete events and from the empty `get_messages` results
+    and `MessageIndex` records below the newest message seen (above it, an
+    ID is not posted yet rather than deleted), so a dead ID is fetched at
+    most once. An ID seen live again is discarded. `live` walks a link's
+    IDs without the dead ones, which packs every fetch page with live
+    messages only.
+
+    Each chat keeps at most `MAX_PER_CHAT` IDs, dropping the oldest first;
+    a dropped ID is merely looked up in the index again.
+
+    Links that delivered fewer messages than they reference are counted
+    per deep-link code, so admins can find and replace them.
+
+    Attributes:
+        MAX_LINKS (int): The maximum number of links tracked.
+        MAX_PER_CHAT (int): The maximum number of deleted IDs kept per chat.
+        dead (Dict[int, Dict[int, None]]): Chat ID -> deleted message IDs,
+            oldest first.
+        skipped (int): Dead IDs skipped without fetching.
+        links (Dict[str, List[int]]): Code -> [deliveries, messages missing].
+    """
+
+    MAX_LINKS: int = 1000
+    MAX_PER_CHAT: int = 100_000
+
+    def __init__(self) -> None:
+        """Initializes an empty set."""
+        self.dead: Dict[int, Dict[int, None]] = {}
+        self.skipped: int = 0
+        self.links: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(message_ids) for message_ids in self.dead.values())
+
+    def add(self, chat_id: int, message_ids: Iterable[int]) -> None:
+        """
+        Records messages as deleted.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The deleted message IDs.
+        """
+        dead = self.dead.setdefault(chat_id, {})
+        dead.update(dict.fromkeys(message_ids))
+        excess = len(dead) - self.MAX_PER_CHAT
+        if excess > 0:
+            for message_id in list(islice(dead, excess)):
+                del dead[message_id]
+
+    def discard(self, chat_id: int, message_ids: Iterable[int]) -> None:
+        """
+        Forgets messages seen live, e.g. an ID posted after it was fetched.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The live message IDs.
+        """
+        dead = self.dead.get(chat_id)
+        if dead:
+            for message_id in message_ids:
+                dead.pop(message_id, None)
+
+    def live(self, chat_id: int, message_ids: Iterable[int]) -> Iterator[int]:
+        """
+        Yields the IDs not known to be deleted, in order.
+
+        Args:
+            chat_id (int): The ID of the chat holding the messages.
+            message_ids (Iterable[int]): The IDs of a link; a `range` stays lazy.
+
+        Yields:
+            int: A message ID worth fetching.
+        """
+        dead = self.dead.get(chat_id)
+        if not dead:
+            yield from message_ids
+            return
+
+        for message_id in message_ids:
+            if message_id in dead:
+                self.skipped += 1
+            else:
+                yield message_id
+
+    def report_link(self, code: str, missing: int) -> None:
+        """
+        Counts a delivery of a link that points at missing content.
+
+        Args:
+            code (str): The deep-link code.
+            missing (int): The number of messages that could not be delivered.
+        """
+        if missing <= 0:
+            return
+
+        entry = self.links.pop(code, None) or [0, 0]
+        entry[0] += 1
+        entry[1] += missing
+        # Re-inserted last, so the least recently hit link is dropped first
+        self.links[code] = entry
+        if len(self.links) > self.MAX_LINKS:
+            del self.links[next(iter(self.links))]
+
+    def worst_links(self, limit: int = 10) -> List[Tuple[str, int, int]]:
+        """
+        Lists the links that most often hit missing content.
+
+        Args:
+            limit (int): The maximum number of links returned.
+
+        Returns:
+            List[Tuple[str, int, int]]: (code, deliveries, messages missing),
+            most delivered first.
+        """
+        ranked = sorted(self.links.items(), key=lambda item: item[1][0], reverse=True)
+        return [(code, hits, missing) for code, (hits, missing) in ranked[:limit]]
+
+
+tombstones: Tombstones = Tombstones()
@@ -0,0 +1,146 @@
+import heapq
+import operator
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, Iterator, Set
+
+
+class UserIndex:
+    """
+    A compact, sorted set of user IDs backed by `array('q')`.
+
+    Each ID costs 8 bytes instead of the ~36 bytes of a Python int inside a
+    list or set, and membership is a binary search. Single additions and
+    removals go to two small overlay sets; once these grow past
+    `COMPACT_THRESHOLD` they are merged into the array with C-level slice
+    copies, never element by element.
+
+    The array is only ever replaced, not mutated in place, so iterating the
+    index (e.g. during a broadcast) is safe while users are added or removed.
+
+    Attributes:
+        COMPACT_THRESHOLD (int): Overlay size that triggers a merge.
+    """
+
+    COMPACT_THRESHOLD: int = 4096
+
+    def __init__(self, user_ids: Iterable[int] = ()) -> None:
+        """
+        Builds the index.
+
+        Args:
+            user_ids (Iterable[int]): Initial IDs; sorted input is loaded
+                without an extra sort.
+        """
+        ids = user_ids if isinstance(user_ids, array) else array("q", user_ids)
+        if not all(map(operator.lt, ids, islice(ids, 1, None))):
+            ids = array("q", sorted(set(ids)))
+
+        self._ids: array = ids
+        self._added: Set[int] = set()
+        self._removed: Set[int] = set()
+
+    def _in_array(self, user_id: int) -> bool:
+        ids = self._ids
+        pos = bisect_left(ids, user_id)
+        return pos < len(ids) and ids[pos] == user_id
+
+    def __contains__(self, user_id: int) -> bool:
+        if user_id in self._added:
+            return True
+        return user_id not in self._removed and self._in_array(user_id)
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._removed) + len(self._added)
+
+    def __iter__(self) -> Iterator[int]:
+        """Yields every user ID in ascending order."""
+        ids, added, removed = self._ids, sorted(self._added), set(self._removed)
+        for user_id in heapq.merge(ids, added):
+            if user_id not in removed:
+                yield user_id
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the stored IDs."""
+        return self._ids.itemsize * len(self._ids) + 64 * (
+            len(self._added) + len(self._removed)
+        )
+
+    def add(self, user_id: int) -> bool:
+        """
+        Adds a user ID.
+
+        Args:
+            user_id (int): The ID to add.
+
+        Returns:
+            bool: True if the ID was not in the index before.
+        """
+        if user_id in self._removed:
+            self._removed.discard(user_id)
+            return True
+        if user_id in self._added or self._in_array(user_id):
+            return False
+
+        self._added.add(user_id)
+        self._maybe_compact()
+        return True
+
+    def discard(self, user_id: int) -> None:
+        """
+        Removes a user ID if present.
+
+        Args:
+            user_id (int): The ID to remove.
+        """
+        if user_id in self._added:
+            self._added.discard(user_id)
+        elif self._in_array(user_id):
+            self._removed.add(user_id)
+            self._maybe_compact()
+
+    def merge(self, user_ids: Iterable[int]) -> int:
+        """
+        Adds many user IDs with a single merge into the array.
+
+        Args:
+            user_ids (Iterable[int]): The IDs to add.
+
+        Returns:
+            int: The number of IDs that were new.
+        """
+        added = sum(self.add(user_id) for user_id in user_ids)
+        self.compact()
+        return added
+
+    def _maybe_compact(self) -> None:
+        if len(self._added) + len(self._removed) >= self.COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self) -> None:
+        """Merges the overlay sets into a new sorted array."""
+        ids = self._ids
+
+        if self._removed:
+            kept, start = array("q"), 0
+            for pos in sorted(bisect_left(ids, user_id) for user_id in self._removed):
+                kept.extend(ids[start:pos])
+                start = pos + 1
+            kept.extend(ids[start:])
+            ids = kept
+
+        if self._added:
+            merged, start = array("q"), 0
+            for user_id in sorted(self._added):
+                pos = bisect_left(ids, user_id, start)
+                merged.extend(ids[start:pos])
+                merged.append(user_id)
+                start = pos
+            merged.extend(ids[start:])
+            ids = merged
+
+        self._ids = ids
+        self._added = set()
+        self._removed = set()
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from array import array
+from typing import Optional, Set
+
+from bot.base import database
+from bot.db_funcs import add_users, del_users
+from bot.utils import config, logger
+
+from .user_index import UserIndex
+
+
+class UserRegistry:
+    """
+    A write-behind registry of bot users.
+
+    Known user IDs are kept in memory in a compact `UserIndex`, so
+    registering a returning user costs no database write at all. New IDs are
+    buffered and written in one bulk write every `USERS_FLUSH_INTERVAL`
+    seconds, or as soon as `USERS_FLUSH_BATCH` IDs are waiting. `stop()`
+    flushes whatever is left.
+
+    Attributes:
+        known (UserIndex): Every user ID seen so far.
+        pending (Set[int]): New user IDs not yet written to the database.
+        flushes (int): The number of bulk writes done.
+        flushed (int): The number of user IDs written.
+        last_flush_ms (float): Duration of the latest bulk write.
+        max_depth (int): The deepest the buffer has been.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty registry."""
+        self.known: UserIndex = UserIndex()
+        self.pending: Set[int] = set()
+        self.flushes: int = 0
+        self.flushed: int = 0
+        self.last_flush_ms: float = 0.0
+        self.max_depth: int = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """The number of user IDs waiting to be written."""
+        return len(self.pending)
+
+    async def load(self) -> int:
+        """
+        Loads the stored user IDs into memory.
+
+        IDs arrive sorted from the database, so they are appended straight
+        into the index array. Buffered IDs not yet written are kept.
+
+        Returns:
+            int: The number of known users.
+        """
+        user_ids = array("q")
+        async for user_id in database.iter_users():
+            user_ids.append(user_id)
+
+        known = UserIndex(user_ids)
+        known.merge(self.pending)
+        self.known = known
+        logger.info(f"User Registry: {len(self.known)} Users Loaded")
+        return len(self.known)
+
+    def add(self, user_id: int) -> bool:
+        """
+        Registers a user, buffering the write if the user is new.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the user was not known before.
+        """
+        if user_id in self.known:
+            return False
+
+        self.known.add(user_id)
+        self.pending.add(user_id)
+        self.max_depth = max(self.max_depth, len(self.pending))
+        if self._wakeup and len(self.pending) >= config.USERS_FLUSH_BATCH:
+            self._wakeup.set()
+
+        return True
+
+    async def discard(self, user_id: int) -> None:
+        """
+        Forgets a user and removes it from the database.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        self.known.discard(user_id)
+        self.pending.discard(user_id)
+        await del_users([user_id])
+
+    async def flush(self) -> int:
+        """
+        Writes the buffered user IDs in one bulk write.
+
+        On failure the IDs go back into the buffer for the next attempt.
+
+        Returns:
+            int: The number of user IDs written.
+        """
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, set()
+        start = time.perf_counter()
+        try:
+            await add_users(batch)
+        except asyncio.CancelledError:
+            self.pending |= batch
+            raise
+        except Exception as exc:
+            self.pending |= batch
+            logger.error(f"User Registry Flush: {exc}")
+            return 0
+
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.flushed += len(batch)
+        logger.info(
+            f"User Registry: Flushed {len(batch)} in {self.last_flush_ms:.1f} ms "
+            f"(Depth {self.depth})"
+        )
+        return len(batch)
+
+    async def run(self) -> None:
+        """Flushes the buffer periodically, or early when it fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=config.USERS_FLUSH_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Starts the background flush loop."""
+        if not self._task:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stops the flush loop and writes whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+
+user_registry: UserRegistry = UserRegistry()
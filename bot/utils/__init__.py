@@ -1,12 +1,24 @@
+from .cache import TTLCache
 from .config import config
 from .logger import logger
+from .metrics import get_histogram, histograms
+from .singleflight import SingleFlight, single_flight
 
 BOT_ID = config.BOT_TOKEN.split(":", 1)[0]
 
-__all__ = ["config", "logger", "expired_date", "BOT_ID", "get_active_db_channel"]
+__all__ = [
+    "config",
+    "logger",
+    "expired_date",
+    "BOT_ID",
+    "get_chat",
+    "get_histogram",
+    "histograms",
+    "SingleFlight",
+    "single_flight",
+    "TTLCache",
+]
 
-# Fungsi utilitas untuk mengambil DB Channel aktif
-async def get_active_db_channel():
-    from bot.base import database
-    doc = await database.get_doc(int(BOT_ID))
-    return doc.get("DATABASE_CHAT_ID_OVERRIDE", [config.DATABASE_CHAT_ID])[0] if doc else config.DATABASE_CHAT_ID
+# Ambil info chat; panggilan bersamaan untuk chat yang sama berbagi satu RPC
+async def get_chat(client, chat_id):
+    return await single_flight.do(("get_chat", chat_id), client.get_chat, chat_id)
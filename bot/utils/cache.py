@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A bounded LRU cache whose entries expire after a per-entry TTL.
+
+    Expired entries are dropped lazily when they are read; once `maxsize`
+    entries are stored, the least recently used one is evicted.
+
+    Attributes:
+        maxsize (int): The maximum number of entries.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found nothing, or only an expired entry.
+        evictions (int): Entries dropped because the cache was full.
+        expirations (int): Entries dropped because their TTL ran out.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries.
+        """
+        self.maxsize: int = maxsize
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups answered from the cache, between 0 and 1."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Retrieves a live entry and marks it as recently used.
+
+        Args:
+            key (K): The key to look up.
+            default (Optional[V]): Returned when there is no live entry.
+
+        Returns:
+            Optional[V]: The cached value, or `default`.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float) -> None:
+        """
+        Stores an entry, evicting the least recently used one if full.
+
+        Args:
+            key (K): The key to store.
+            value (V): The value to store.
+            ttl (float): Seconds until the entry expires.
+        """
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Any:
+        """
+        Removes an entry if present.
+
+        Args:
+            key (K): The key to remove.
+
+        Returns:
+            Any: The removed value, or None.
+        """
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._data.clear()
@@ -10,8 +10,38 @@ class Config:
         self.BOT_TOKEN: str = os.environ.get("BOT_TOKEN", "your_bot_token")
         self.OWNER_ID: int = int(os.environ.get("OWNER_ID", 987654321))
         self.MONGODB_URL: str = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
+        # Storage backend: "mongo" (default) or "sqlite" for small single-dyno deployments
+        self.DATABASE_BACKEND: str = os.environ.get("DATABASE_BACKEND", "mongo").lower()
+        self.SQLITE_PATH: str = os.environ.get("SQLITE_PATH", "database.sqlite3")
         self.DATABASE_CHAT_ID: int = int(os.environ.get("DATABASE_CHAT_ID", -1001234567890))
         self.OWNER_USERNAME: str = os.environ.get("OWNER_USERNAME", "admin")
+        # Write-behind user registry: flush every N seconds, or once N new users wait
+        self.USERS_FLUSH_INTERVAL: float = float(os.environ.get("USERS_FLUSH_INTERVAL", 5))
+        self.USERS_FLUSH_BATCH: int = int(os.environ.get("USERS_FLUSH_BATCH", 1000))
+        # Seconds between settings version checks when change streams are unavailable
+        self.SETTINGS_POLL_INTERVAL: int = int(os.environ.get("SETTINGS_POLL_INTERVAL", 30))
+        # Force-sub checks: concurrent RPCs, seconds per call, and whether a failed
+        # or timed-out check lets the user through (fail-open) or not (fail-closed)
+        self.FSUB_CHECK_CONCURRENCY: int = int(os.environ.get("FSUB_CHECK_CONCURRENCY", 10))
+        self.FSUB_CHECK_TIMEOUT: float = float(os.environ.get("FSUB_CHECK_TIMEOUT", 5))
+        self.FSUB_FAIL_OPEN: bool = os.environ.get("FSUB_FAIL_OPEN", "false").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        # Membership cache: seconds to trust "joined" / "not joined", and max entries
+        self.FSUB_CACHE_TTL: int = int(os.environ.get("FSUB_CACHE_TTL", 3600))
+        self.FSUB_CACHE_NEGATIVE_TTL: int = int(os.environ.get("FSUB_CACHE_NEGATIVE_TTL", 15))
+        self.FSUB_CACHE_SIZE: int = int(os.environ.get("FSUB_CACHE_SIZE", 100_000))
+        # Seconds a join/leave seen in a chat_member update is trusted (7 days)
+        self.FSUB_INDEX_MAX_AGE: int = int(os.environ.get("FSUB_INDEX_MAX_AGE", 604800))
+        # Database-channel messages kept for hot links: max entries, seconds valid
+        self.MESSAGE_CACHE_SIZE: int = int(os.environ.get("MESSAGE_CACHE_SIZE", 50_000))
+        self.MESSAGE_CACHE_TTL: int = int(os.environ.get("MESSAGE_CACHE_TTL", 3600))
+        # Link manifests (bundled files) kept in memory, most recently used first
+        self.MANIFEST_CACHE_SIZE: int = int(os.environ.get("MANIFEST_CACHE_SIZE", 10_000))
+        # Seconds a "Next Page" button of a long link keeps working (7 days)
+        self.PAGE_CODE_TTL: int = int(os.environ.get("PAGE_CODE_TTL", 604800))
 
         self._validate()
 
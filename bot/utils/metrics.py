@@ -0,0 +1,110 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+
+class LatencyHistogram:
+    """
+    A fixed-bucket latency histogram, cheap enough to update on every request.
+
+    Percentiles are reported as the upper bound of the bucket they fall in
+    (capped at the largest value seen), which is precise enough to follow
+    p50/p95 trends without keeping individual samples.
+
+    Attributes:
+        BUCKETS (Tuple[float, ...]): Bucket upper bounds in milliseconds.
+        name (str): The name shown in summaries.
+        count (int): The number of observations.
+        total_ms (float): The sum of all observations.
+        max_ms (float): The largest observation.
+    """
+
+    BUCKETS: Tuple[float, ...] = (
+        1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000
+    )
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes an empty histogram.
+
+        Args:
+            name (str): The name shown in summaries.
+        """
+        self.name: str = name
+        self.counts: List[int] = [0] * (len(self.BUCKETS) + 1)
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+
+    def observe(self, ms: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            ms (float): The latency in milliseconds.
+        """
+        self.counts[bisect_left(self.BUCKETS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Records the time spent inside the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter() - start) * 1000)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimates a percentile.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The estimated latency in milliseconds, 0 if empty.
+        """
+        if not self.count:
+            return 0.0
+
+        rank, seen = math.ceil(self.count * percent / 100), 0
+        for bound, count in zip(self.BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> str:
+        """Formats the count, mean and main percentiles on one line."""
+        if not self.count:
+            return f"{self.name}: No Data"
+
+        mean = self.total_ms / self.count
+        return (
+            f"{self.name}: {self.count} | avg {mean:.0f} | "
+            f"p50 {self.percentile(50):.0f} | p95 {self.percentile(95):.0f} | "
+            f"p99 {self.percentile(99):.0f} | max {self.max_ms:.0f} ms"
+        )
+
+
+histograms: Dict[str, LatencyHistogram] = {}
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    """
+    Retrieves the histogram with the given name, creating it on first use.
+
+    Args:
+        name (str): The histogram name.
+
+    Returns:
+        LatencyHistogram: The shared histogram.
+    """
+    if name not in histograms:
+        histograms[name] = LatencyHistogram(name)
+    return histograms[name]
@@ -0,0 +1,63 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key starts the call; everyone arriving while it
+    runs awaits that same call and gets the same result (or exception).
+    The key is forgotten as soon as the call finishes, so nothing is cached
+    beyond the call's lifetime. A caller being cancelled does not cancel
+    the shared call for the others.
+
+    Attributes:
+        calls (int): The number of calls actually made.
+        coalesced (int): The number of callers that joined an in-flight call.
+    """
+
+    def __init__(self) -> None:
+        """Initializes with no call in flight."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls: int = 0
+        self.coalesced: int = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Runs `func(*args, **kwargs)`, or joins the call already running for `key`.
+
+        Args:
+            key (Hashable): Identifies calls that would return the same result.
+            func (Callable[..., Awaitable[Any]]): The coroutine function to call.
+            *args (Any): Positional arguments for `func`.
+            **kwargs (Any): Keyword arguments for `func`.
+
+        Returns:
+            Any: The result of the shared call.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = future
+            future.add_done_callback(partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not future.cancelled():
+            future.exception()
+
+
+single_flight: SingleFlight = SingleFlight()
@@ -1,11 +1,15 @@
 import asyncio
 import os
+import time
+from typing import Awaitable, Coroutine, List, Set, Tuple, TypeVar
+
 from hydrogram import errors
 from hydrogram.helpers import ikb
 
 from bot import (
     ForceStopLoop,
     bot,
+    channel_registry,
     config,
     del_broadcast_data_id,
     get_broadcast_data_ids,
@@ -13,10 +17,43 @@ from bot import (
     helper_handlers,
     initial_database,
     logger,
+    member_index,
+    migrate_users,
+    prune_page_codes,
+    settings,
+    user_registry,
 )
 
 from http_server import HTTPServer  # Import HTTP server
 
+T = TypeVar("T")
+startup_timeline: List[Tuple[str, float]] = []
+# The loop keeps only weak references to tasks; these keep them alive
+background_tasks: Set[asyncio.Task] = set()
+
+def task_done(task: asyncio.Task) -> None:
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Task {task.get_name()}: {task.exception()!r}")
+
+def spawn(name: str, coro: Coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(task_done)
+    return task
+
+async def cancel_background_tasks() -> None:
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+async def timed(phase: str, coro: Awaitable[T]) -> T:
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        startup_timeline.append((phase, (time.perf_counter() - start) * 1000))
+
 async def chat_db_init() -> None:
     chat_id = config.DATABASE_CHAT_ID
     try:
@@ -50,16 +87,8 @@ async def send_restart_msg(chat_id: int, message_id: int, text: str) -> None:
         logger.warning(f"Failed to send restart message: {e}")
 
 async def cache_db_init() -> None:
-    await asyncio.gather(
-        helper_handlers.force_text_init(),
-        helper_handlers.start_text_init(),
-        helper_handlers.generate_status_init(),
-        helper_handlers.protect_content_init(),
-        helper_handlers.admins_init(),
-        helper_handlers.fs_chats_init(),
-        helper_handlers.sponsor_text_init(),
-        helper_handlers.sponsor_photo_init(),
-    )
+    await helper_handlers.settings_init()  # Served from the settings snapshot
+    await channel_registry.load()
 
 async def restart_data_init() -> None:
     try:
@@ -81,21 +110,50 @@ async def restart_data_init() -> None:
     except Exception as exc:
         logger.error(f"Restart Init Error: {exc}")
 
+async def users_migration_init() -> None:
+    try:
+        if await migrate_users():
+            await user_registry.load()  # Pick up the users moved out of the array
+    except Exception as exc:
+        logger.error(f"Users Migration Error: {exc}")
+
+async def page_codes_prune_loop() -> None:
+    while True:
+        try:
+            removed = await prune_page_codes()
+            if removed:
+                logger.info(f"Page Codes: {removed} Expired Removed")
+        except Exception as exc:
+            logger.error(f"Page Codes Prune Error: {exc}")
+        await asyncio.sleep(86400)  # Daily; codes live for days
+
 async def main() -> None:
-    await bot.start()
+    boot_start = time.perf_counter()
+    await timed("Client", bot.start())
     bot_user_id, bot_username = bot.me.id, bot.me.username
 
-    await initial_database()
-    await chat_db_init()
-    await cache_db_init()
-    await restart_data_init()
+    await timed("Settings", initial_database())  # Defaults and snapshot, one round trip
+    spawn("UsersMigration", users_migration_init())  # Runs online, in chunks
+    spawn("PageCodesPrune", page_codes_prune_loop())
+    await timed("Users", user_registry.load())
+    user_registry.start()
+    await timed("Members", member_index.load())
+    member_index.start()
+    await timed("ChatDB", chat_db_init())
+    await timed("Cache", cache_db_init())
+    spawn("SettingsWatch", settings.watch())  # Picks up writes from other replicas
+    await timed("Restart", restart_data_init())
 
     logger.info(f"@{bot_username} {bot_user_id}")
 
+    total_ms = (time.perf_counter() - boot_start) * 1000
+    phases = " | ".join(f"{phase} {ms:.0f} ms" for phase, ms in startup_timeline)
+    logger.info(f"Startup: {phases} | Total {total_ms:.0f} ms")
+
     # HTTP server init (for Koyeb or health checks)
     port = int(os.environ.get("PORT", 8080))
     http_server = HTTPServer("0.0.0.0", port)
-    asyncio.create_task(http_server.run_server())
+    spawn("HTTPServer", http_server.run_server())
 
     logger.info(f"HTTP server running on port {port}")
 
@@ -112,5 +170,8 @@ if __name__ == "__main__":
         logger.error(str(fsl))
     finally:
         logger.info("Bot: Stopping...")
+        loop.run_until_complete(cancel_background_tasks())
+        loop.run_until_complete(user_registry.stop())  # Flush buffered users
+        loop.run_until_complete(member_index.stop())  # Flush buffered joins/leaves
         loop.run_until_complete(bot.stop())
         loop.close()
@@ -1,10 +1,14 @@
 list_available_commands = [
     "batch",
     "broadcast",
+    "bundle",
+    "deadlinks",
     "bc",
     "log",
+    "metrics",
     "ping",
     "privacy",
+    "reindex",
     "start",
     "stop",
     "users",
@@ -1,18 +1,39 @@
+from typing import List, Optional, Tuple
+
 from hydrogram import Client, errors, filters
 from hydrogram.helpers import ikb
 from hydrogram.types import Message
 
-from bot import authorized_users_only, config, logger, url_safe
-from bot.utils import get_active_db_channel
+from bot import (
+    authorized_users_only,
+    channel_registry,
+    config,
+    link_codec,
+    link_manifests,
+    logger,
+)
 
 
 @Client.on_message(filters.private & filters.command("batch"))
 @authorized_users_only
 async def batch_handler(client: Client, message: Message) -> None:
-    database_chat_id = await get_active_db_channel()
-    database_ch_link = f"tg://openmessage?chat_id={str(database_chat_id)[4:]}"  # 🔥 PINDAH KE SINI
+    # Satu tombol per DB Channel aktif; pesan boleh dari DB Channel mana pun
+    active = channel_registry.active
+    if len(active) == 1:
+        channel_buttons = [[("📂 Buka Database Channel", channel_link(active[0]), "url")]]
+    else:
+        channel_buttons = [
+            [
+                (
+                    f"📂 Buka DB Channel {channel_registry.index(chat_id) + 1}",
+                    channel_link(chat_id),
+                    "url",
+                )
+            ]
+            for chat_id in active
+        ]
 
-    async def ask_for_message_id(ask_msg: str) -> int:
+    async def ask_for_message_id(ask_msg: str, allowed: List[int]) -> Optional[Tuple[int, int]]:
         chat_id, user_id = message.chat.id, message.from_user.id
 
         try:
@@ -20,12 +41,12 @@ async def batch_handler(client: Client, message: Message) -> None:
                 chat_id=chat_id,
                 text=(
                     f"<b>{ask_msg}:</b>\n"
-                    f"Silakan teruskan pesan dari <a href='{database_ch_link}'>Database Channel</a>!\n\n"
+                    "Silakan teruskan pesan dari Database Channel!\n\n"
                     f"<b>Timeout:</b> 45 detik"
                 ),
                 user_id=user_id,
                 timeout=45,
-                reply_markup=ikb([[("📂 Buka Database Channel", database_ch_link, "url")]]),
+                reply_markup=ikb(channel_buttons),
             )
         except errors.ListenerTimeout:
             await message.reply_text(
@@ -35,7 +56,7 @@ async def batch_handler(client: Client, message: Message) -> None:
 
         if (
             not ask_message.forward_from_chat
-            or ask_message.forward_from_chat.id != database_chat_id
+            or ask_message.forward_from_chat.id not in allowed
         ):
             await ask_message.reply_text(
                 "<b>Pesan tidak valid! Harap teruskan pesan dari Database Channel.</b>",
@@ -43,22 +64,25 @@ async def batch_handler(client: Client, message: Message) -> None:
             )
             return None
 
-        return ask_message.forward_from_message_id
+        return ask_message.forward_from_chat.id, ask_message.forward_from_message_id
 
-    # Get the start and end message IDs
-    first_message_id = await ask_for_message_id("Awal Pesan Batch")
-    if first_message_id is None:
+    # Get the start and end message IDs; both must come from the same channel
+    first = await ask_for_message_id("Awal Pesan Batch", channel_registry.channels)
+    if first is None:
         return
+    database_chat_id, first_message_id = first
 
-    last_message_id = await ask_for_message_id("Akhir Pesan Batch")
-    if last_message_id is None:
+    last = await ask_for_message_id("Akhir Pesan Batch", [database_chat_id])
+    if last is None:
         return
+    _, last_message_id = last
 
     # Encode data
     try:
-        first_id = first_message_id * abs(database_chat_id)
-        last_id = last_message_id * abs(database_chat_id)
-        encoded_data = url_safe.encode_data(f"id-{first_id}-{last_id}")
+        step = 1 if last_message_id >= first_message_id else -1
+        encoded_data = link_codec.encode(
+            database_chat_id, range(first_message_id, last_message_id + step, step)
+        )
         encoded_data_url = f"https://t.me/{client.me.username}?start={encoded_data}"
         share_encoded_data_url = f"https://t.me/share?url={encoded_data_url}"
 
@@ -67,7 +91,7 @@ async def batch_handler(client: Client, message: Message) -> None:
             encoded_data_url,
             quote=True,
             reply_markup=ikb([
-                [("📂 Buka Database Channel", database_ch_link, "url")],
+                [("📂 Buka Database Channel", channel_link(database_chat_id), "url")],
                 [("🔗 Bagikan", share_encoded_data_url, "url")]
             ]),
             disable_web_page_preview=True,
@@ -75,3 +99,90 @@ async def batch_handler(client: Client, message: Message) -> None:
     except Exception as exc:
         logger.error(f"Batch: {exc}")
         await message.reply_text("<b>Terjadi kesalahan!</b>", quote=True)
+
+
+def channel_link(chat_id: int) -> str:
+    return f"tg://openmessage?chat_id={str(chat_id)[4:]}"
+
+
+# Telegram caps /start payloads at 64 characters
+MAX_START_PAYLOAD = 64
+
+
+def parse_bundle_ids(
+    tokens: List[str], limit: int
+) -> Optional[Tuple[Optional[int], List[int]]]:
+    chat_ids, message_ids = set(), []
+    for token in tokens:
+        # Accepts an ID, a range "awal-akhir", or a Database Channel message link
+        parts = token.rstrip("/").split("/")
+        if len(parts) >= 3 and parts[-3] == "c" and parts[-2].isdigit():
+            chat_ids.add(int(f"-100{parts[-2]}"))
+        first, _, last = parts[-1].partition("-")
+        if not first.isdigit() or (last and not last.isdigit()):
+            return None
+        start, end = int(first), int(last or first)
+        # Counted before expanding, so a typo like 1-1000000000 costs nothing
+        if len(message_ids) + abs(end - start) + 1 > limit:
+            return None
+        step = 1 if end >= start else -1
+        message_ids.extend(range(start, end + step, step))
+
+    # Satu bundle hanya untuk satu DB Channel
+    if len(chat_ids) > 1:
+        return None
+    return next(iter(chat_ids), None), message_ids
+
+
+@Client.on_message(filters.private & filters.command("bundle"))
+@authorized_users_only
+async def bundle_handler(client: Client, message: Message) -> None:
+    # A bundle is encoded as runs or stored as a manifest; both cap the ID count
+    limit = min(link_codec.MAX_MULTI_IDS, link_manifests.MAX_IDS)
+    parsed = parse_bundle_ids(message.command[1:], limit)
+    if not parsed or not parsed[1] or (parsed[0] and parsed[0] not in channel_registry):
+        await message.reply_text(
+            "<b>Usage:</b> <code>/bundle id id awal-akhir ...</code>\n"
+            "ID boleh diganti link pesan Database Channel (satu channel saja). "
+            "Jika DB Channel aktif lebih dari satu, sertakan minimal satu link pesan. "
+            "Urutan ID = urutan kirim.\n"
+            f"Maksimal {limit} ID per bundle; untuk range panjang gunakan /batch.",
+            quote=True,
+        )
+        return
+
+    database_chat_id, message_ids = parsed
+    if database_chat_id is None:
+        # Angka saja tidak menunjukkan channel; jangan menebak di antara beberapa
+        active = channel_registry.active
+        if len(active) != 1:
+            await message.reply_text(
+                f"<b>Ada {len(active)} DB Channel aktif.</b> Sertakan link pesan "
+                "Database Channel (mis. <code>https://t.me/c/123/45</code>) "
+                "agar channel-nya jelas.",
+                quote=True,
+            )
+            return
+        database_chat_id = active[0]
+
+    try:
+        encoded_data = link_codec.encode(database_chat_id, message_ids)
+        # Too many scattered IDs for a deep link: store them server-side
+        if len(encoded_data) > MAX_START_PAYLOAD:
+            key = await link_manifests.create(database_chat_id, message_ids)
+            encoded_data = link_codec.encode_manifest(database_chat_id, key)
+    except ValueError as exc:
+        await message.reply_text(f"<b>Gagal:</b> {exc}", quote=True)
+        return
+    except Exception as exc:
+        logger.error(f"Bundle: {exc}")
+        await message.reply_text("<b>Terjadi kesalahan!</b>", quote=True)
+        return
+
+    encoded_data_url = f"https://t.me/{client.me.username}?start={encoded_data}"
+    await message.reply_text(
+        f"{encoded_data_url}\n\n<b>Bundle:</b> {len(message_ids)} Pesan",
+        quote=True,
+        reply_markup=ikb([[("🔗 Bagikan", f"https://t.me/share?url={encoded_data_url}", "url")]]),
+        disable_web_page_preview=True,
+    )
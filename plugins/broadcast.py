@@ -8,11 +8,10 @@ from bot import (
     add_broadcast_data_id,
     authorized_users_only,
     del_broadcast_data_id,
-    del_user,
-    get_users,
     helper_buttons,
     helper_handlers,
     logger,
+    user_registry,
 )
 
 
@@ -39,18 +38,22 @@ class BroadcastManager:
             reply_markup=ikb(helper_buttons.Broadcast),
         )
 
-        users, admins = await get_users(), helper_handlers.admins
-        user_ids = [user for user in users if user not in admins]
+        await user_registry.flush()  # Include users still in the write-behind buffer
+        await user_registry.load()  # Include users registered by other replicas
+        users, admins = user_registry.known, set(helper_handlers.admins)
 
-        self.is_running, self.total = True, len(user_ids)
+        self.is_running = True
+        self.total = len(users) - sum(admin in users for admin in admins)
         logger.info("Broadcast: Starting...")
 
         chat_id, message_id = message.chat.id, progress_msg.id
         await add_broadcast_data_id(chat_id, message_id)
 
-        for user_id in user_ids:
+        for user_id in users:
             if not self.is_running:
                 break
+            if user_id in admins:
+                continue
 
             try:
                 await broadcast_msg.copy(
@@ -61,7 +64,7 @@ class BroadcastManager:
                 logger.warning(f"FloodWait: Sleep {fw.value}")
                 await asyncio.sleep(fw.value)
             except errors.RPCError:
-                await del_user(user_id)
+                await user_registry.discard(user_id)
                 self.failed += 1
 
             if (self.sent + self.failed) % 250 == 0:
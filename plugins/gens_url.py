@@ -1,13 +1,20 @@
-from hydrogram import Client, filters
+from hydrogram import Client, errors, filters
 from hydrogram.helpers import ikb
 from hydrogram.types import Message
 from hydrogram.enums import ParseMode
 import asyncio
 
-from bot import authorized_users_only, config, helper_handlers, logger, url_safe
+from bot import (
+    authorized_users_only,
+    channel_registry,
+    config,
+    helper_handlers,
+    link_codec,
+    logger,
+    message_index,
+)
 from plugins import list_available_commands
-from bot.utils import get_active_db_channel
-from bot.db_funcs.text import get_custom_caption_enabled, get_custom_caption_text
+from bot.db_funcs.text import get_custom_caption_enabled
 
 
 @Client.on_message(
@@ -20,30 +27,26 @@ async def generate_handler(client: Client, message: Message) -> None:
         return
 
     try:
-        database_chat_id = await get_active_db_channel()
         custom_caption_enabled = await get_custom_caption_enabled()
-        custom_caption_template = await get_custom_caption_text()
+        custom_caption_template = helper_handlers.caption_template
 
-        original_caption = message.caption or ""
+        # HTML form keeps the caption's formatting and escapes stray < >
+        original_caption = message.caption.html if message.caption else ""
 
         # Copy the message to the database chat dulu
-        message_db = await message.copy(
-            database_chat_id,
-            caption=None,  # Caption sementara None, nanti diupdate setelah dapat link
-            parse_mode=ParseMode.HTML
-        )
+        message_db = await store_message(message)
+        database_chat_id = message_db.chat.id
 
         # Encode message ID
-        encoded_data = url_safe.encode_data(
-            f"id-{message_db.id * abs(database_chat_id)}"
-        )
+        encoded_data = link_codec.encode(database_chat_id, [message_db.id])
         encoded_data_url = f"https://t.me/{client.me.username}?start={encoded_data}"
 
         # Baru lakukan replace di custom caption
         if custom_caption_enabled and custom_caption_template:
-            caption = custom_caption_template
-            caption = caption.replace("{original_caption}", original_caption)
-            caption = caption.replace("{link_file}", encoded_data_url)
+            caption = custom_caption_template.render({
+                "original_caption": original_caption,
+                "link_file": encoded_data_url,
+            })
         else:
             caption = original_caption if original_caption else None
 
@@ -51,7 +54,7 @@ async def generate_handler(client: Client, message: Message) -> None:
         await asyncio.sleep(3)  # 3 detik, bisa dinaikkan jika masih sering FloodWait
 
         # Update caption di pesan yang sudah dikirim (edit caption)
-        await client.edit_message_caption(
+        message_db = await client.edit_message_caption(
             chat_id=database_chat_id,
             message_id=message_db.id,
             caption=caption,
@@ -72,7 +75,30 @@ async def generate_handler(client: Client, message: Message) -> None:
             ]),
             disable_web_page_preview=True,
         )
+
+        # Simpan metadata pesan, agar delivery tidak perlu get_messages dulu
+        await message_index.add(database_chat_id, [message_db])
     except Exception as exc:
         # Log the error and inform the user
         logger.error(f"Generator: {exc}")
         await message.reply_text("<b>An Error Occurred!</b>", quote=True)
+
+
+async def store_message(message: Message) -> Message:
+    # Bergiliran di semua DB Channel aktif; channel yang kena FloodWait dilewati dulu
+    while True:
+        database_chat_id = channel_registry.next_channel()
+        await asyncio.sleep(channel_registry.flood_wait(database_chat_id))
+        try:
+            message_db = await message.copy(
+                database_chat_id,
+                caption=None,  # Caption sementara None, nanti diupdate setelah dapat link
+                parse_mode=ParseMode.HTML
+            )
+        except errors.FloodWait as fw:
+            logger.warning(f"FloodWait: DB Channel {database_chat_id}, {fw.value}s")
+            channel_registry.report_flood(database_chat_id, fw.value)
+            continue
+
+        channel_registry.report_stored(database_chat_id)
+        return message_db
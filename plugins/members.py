@@ -0,0 +1,35 @@
+from hydrogram import Client, enums, filters
+from hydrogram.types import ChatMember, ChatMemberUpdated
+
+from bot import helper_handlers, member_index
+
+JOINED_STATUSES = {
+    enums.ChatMemberStatus.OWNER,
+    enums.ChatMemberStatus.ADMINISTRATOR,
+    enums.ChatMemberStatus.MEMBER,
+}
+
+
+def is_joined(member: ChatMember) -> bool:
+    if member.status == enums.ChatMemberStatus.RESTRICTED:
+        return bool(member.is_member)
+    return member.status in JOINED_STATUSES
+
+
+fsub_chat_filter = filters.create(
+    lambda _, __, update: update.chat.id in helper_handlers.fs_chats
+)
+
+
+@Client.on_chat_member_updated(fsub_chat_filter)
+async def chat_member_handler(_, update: ChatMemberUpdated) -> None:
+    # `new_chat_member` is None when the user left or was removed
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+
+    chat_id, user_id = update.chat.id, member.user.id
+    joined = bool(update.new_chat_member) and is_joined(update.new_chat_member)
+
+    member_index.set(chat_id, user_id, joined)
+    helper_handlers.membership_cache.pop((chat_id, user_id))
@@ -0,0 +1,32 @@
+from typing import List
+
+from hydrogram import Client, filters
+from hydrogram.types import Message
+
+from bot import channel_registry, message_cache, message_fetcher, message_index
+
+
+@Client.on_message(filters.channel)
+async def channel_post_handler(_, message: Message) -> None:
+    # A post may reuse an ID fetched as empty before it existed
+    if message.chat.id in channel_registry:
+        await message_fetcher.mark_posted(message.chat.id, [message])
+    else:
+        message_cache.invalidate(message.chat.id, [message.id])
+
+
+@Client.on_edited_message(filters.channel)
+async def edited_message_handler(_, message: Message) -> None:
+    message_cache.invalidate(message.chat.id, [message.id])
+    if message.chat.id in channel_registry:
+        await message_index.add(message.chat.id, [message])
+
+
+@Client.on_deleted_messages(filters.channel)
+async def deleted_messages_handler(_, messages: List[Message]) -> None:
+    # Deletions arrive per channel, so the batch shares one chat
+    chat_id, message_ids = messages[0].chat.id, [message.id for message in messages]
+    if chat_id in channel_registry:
+        await message_fetcher.mark_deleted(chat_id, message_ids)
+    else:
+        message_cache.invalidate(chat_id, message_ids)
@@ -0,0 +1,48 @@
+from hydrogram import Client, errors, filters
+from hydrogram.types import Message
+
+from bot import authorized_users_only, channel_registry, logger, message_index
+
+
+@Client.on_message(filters.private & filters.command("reindex"))
+@authorized_users_only
+async def reindex_handler(client: Client, message: Message) -> None:
+    start = message.command[1] if len(message.command) > 1 else "1"
+    if not start.isdigit() or int(start) < 1:
+        await message.reply_text("<b>Usage:</b> <code>/reindex [first_message_id]</code>", quote=True)
+        return
+
+    progress_message = await message.reply_text("<b>Indexing...</b>", quote=True)
+    totals = [0, 0]
+
+    async def progress(scanned: int, found: int) -> None:
+        # Edit every 10 pages, editing on every page would hit flood limits
+        if scanned % (message_index.PAGE_SIZE * 10):
+            return
+        try:
+            await progress_message.edit_text(
+                f"<b>Indexing...</b>\n  - <code>Scanned:</code> {totals[0] + scanned} IDs\n"
+                f"  - <code>Found  :</code> {totals[1] + found} Messages"
+            )
+        except errors.RPCError:
+            pass
+
+    try:
+        # Every registered DB Channel, retired ones included: their links still work
+        for database_chat_id in channel_registry.channels:
+            scanned, found = await message_index.backfill(
+                client, database_chat_id, int(start), progress
+            )
+            totals[0] += scanned
+            totals[1] += found
+    except Exception as exc:
+        logger.error(f"Reindex: {exc}")
+        await progress_message.edit_text("<b>An Error Occurred!</b>")
+        return
+
+    await progress_message.edit_text(
+        "<b>Message Index Updated</b>\n"
+        f"  - <code>Channels:</code> {len(channel_registry)}\n"
+        f"  - <code>Scanned :</code> {totals[0]} IDs (From {start})\n"
+        f"  - <code>Found   :</code> {totals[1]} Messages"
+    )
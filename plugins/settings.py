@@ -1,12 +1,19 @@
+from html import escape
+from typing import Sequence
+
 from hydrogram import Client, errors, filters
 from hydrogram.enums import ChatType
 from hydrogram.helpers import ikb
 from hydrogram.types import CallbackQuery
 
 from bot import (
+    CAPTION_FIELDS,
+    USER_FIELDS,
+    Template,
     add_admin,
     add_fs_chat,
     authorized_users_only,
+    channel_registry,
     config,
     del_admin,
     del_fs_chat,
@@ -19,14 +26,40 @@ from bot import (
     update_start_text_msg,
 )
 from bot.db_funcs.text import (
-    get_sponsor_enabled, set_sponsor_enabled,
-    get_custom_caption_text, set_custom_caption_text, del_custom_caption_text,
-    get_custom_caption_enabled, set_custom_caption_enabled,
-    add_start_photo_msg, del_start_photo_msg,
-    add_force_photo_msg, del_force_photo_msg,
+    get_sponsor_enabled, toggle_sponsor_enabled,
+    set_custom_caption_text, del_custom_caption_text,
+    get_custom_caption_enabled, toggle_custom_caption_enabled,
+    update_start_photo_msg, del_start_photo_msg,
+    update_force_photo_msg, del_force_photo_msg,
     get_start_photo_msg, get_force_photo_msg
 )
-from bot.base import database
+from bot.db_funcs import (
+    del_db_channel,
+    get_delivery_page_size,
+    update_db_channel,
+    update_delivery_page_size,
+)
+from bot.utils import get_chat
+
+
+def format_template(template: Template) -> str:
+    # Template yang tidak valid ditampilkan apa adanya, beserta kesalahannya
+    if not template.errors:
+        return template.source
+    return (
+        f"<code>{escape(template.source)}</code>\n\n"
+        f"<b>⚠️ Template tidak valid:</b>\n{escape(template.describe_errors())}"
+    )
+
+
+def template_error_text(template: Template, fields: Sequence[str]) -> str:
+    return (
+        "<b>Template tidak valid, tidak disimpan:</b>\n"
+        f"{escape(template.describe_errors()) or '- Template kosong'}\n\n"
+        "Placeholder: "
+        + ", ".join(f"<code>{{{field}}}</code>" for field in fields)
+        + "\nGunakan <code>{{</code> dan <code>}}</code> untuk kurung kurawal biasa."
+    )
 
 
 @Client.on_callback_query(filters.regex(r"\bcancel\b"))
@@ -142,8 +175,7 @@ async def update_start_photo_handler(client: Client, query: CallbackQuery) -> No
         buttons = await helper_buttons.get_start_buttons()
         await query.message.edit_text("<b>Link tidak valid! Harus berupa URL gambar (http/https) untuk Set Photo Start.</b>", reply_markup=ikb(buttons))
         return
-    from bot.db_funcs.text import add_start_photo_msg
-    await add_start_photo_msg(user_input)
+    await update_start_photo_msg(user_input)
     buttons = await helper_buttons.get_start_buttons()
     await query.message.edit_text(f"<b>Set Photo Start berhasil diubah:</b>\n{user_input}", reply_markup=ikb([[('« Back', 'menu start')]]))
 
@@ -176,8 +208,7 @@ async def update_force_photo_handler(client: Client, query: CallbackQuery) -> No
         buttons = await helper_buttons.get_force_buttons()
         await query.message.edit_text("<b>Link tidak valid! Harus berupa URL gambar (http/https) untuk Set Photo Force.</b>", reply_markup=ikb(buttons))
         return
-    from bot.db_funcs.text import add_force_photo_msg
-    await add_force_photo_msg(user_input)
+    await update_force_photo_msg(user_input)
     buttons = await helper_buttons.get_force_buttons()
     await query.message.edit_text(f"<b>Set Photo Force berhasil diubah:</b>\n{user_input}", reply_markup=ikb([[('« Back', 'menu force')]]))
 
@@ -217,6 +248,10 @@ async def set_text_handler_query(client: Client, query: CallbackQuery) -> None:
     if not user_input:
         await query.message.edit_text(f"<b>Invalid! Kirim pesan text untuk Set Text {label_text}.</b>", reply_markup=ikb(back_buttons))
         return
+    template = Template(user_input, USER_FIELDS)
+    if template.errors:
+        await query.message.edit_text(template_error_text(template, USER_FIELDS), reply_markup=ikb(back_buttons))
+        return
     if query_data == "start":
         await update_start_text_msg(user_input)
         await helper_handlers.start_text_init()
@@ -251,7 +286,7 @@ async def delete_force_photo_handler(_, query: CallbackQuery):
 async def menu_start_handler_query(_, query: CallbackQuery) -> None:
     from bot.db_funcs.text import get_start_photo_msg
     photo = await get_start_photo_msg()
-    text = f"<b>Start Text:</b>\n  {helper_handlers.start_text}\n\n"
+    text = f"<b>Start Text:</b>\n  {format_template(helper_handlers.start_template)}\n\n"
     if photo:
         text += f"<b>Start Photo:</b> <code>{photo}</code>"
     else:
@@ -265,7 +300,7 @@ async def menu_start_handler_query(_, query: CallbackQuery) -> None:
 async def menu_force_handler_query(_, query: CallbackQuery) -> None:
     from bot.db_funcs.text import get_force_photo_msg
     photo = await get_force_photo_msg()
-    text = f"<b>Force Text:</b>\n  {helper_handlers.force_text}\n\n"
+    text = f"<b>Force Text:</b>\n  {format_template(helper_handlers.force_template)}\n\n"
     if photo:
         text += f"<b>Force Photo:</b> <code>{photo}</code>"
     else:
@@ -323,7 +358,7 @@ async def add_handler_query(client: Client, query: CallbackQuery) -> None:
         return
 
     try:
-        chat = await client.get_chat(new_id)
+        chat = await get_chat(client, new_id)
         if (query_data == "admin" and chat.type != ChatType.PRIVATE) or (
             query_data == "fsub"
             and chat.type not in [ChatType.SUPERGROUP, ChatType.CHANNEL]
@@ -424,7 +459,7 @@ async def menu_sponsor_handler_query(_, query: CallbackQuery) -> None:
     sponsor_enabled = await get_sponsor_enabled()
     text = f"""
 <b>📝 Sponsor Text</b>
-{helper_handlers.sponsor_text or '<i>Belum diatur</i>'}
+{format_template(helper_handlers.sponsor_template) or '<i>Belum diatur</i>'}
 
 <b>🖼️ Sponsor Photo</b>
 {helper_handlers.sponsor_photo or '<i>Belum diatur</i>'}
@@ -470,6 +505,10 @@ async def update_sponsor_text_handler(client: Client, query: CallbackQuery) -> N
     if not new_text:
         await query.message.edit_text("<b>Pesan tidak valid!</b>", reply_markup=ikb(helper_buttons.Sponsor_))
         return
+    template = Template(new_text, USER_FIELDS)
+    if template.errors:
+        await query.message.edit_text(template_error_text(template, USER_FIELDS), reply_markup=ikb(helper_buttons.Sponsor_))
+        return
 
     from bot.db_funcs.text import update_sponsor_text_msg
     await update_sponsor_text_msg(new_text)
@@ -539,16 +578,13 @@ async def delete_sponsor_photo_handler(_, query: CallbackQuery):
 @Client.on_callback_query(filters.regex(r"toggle sponsor"))
 @authorized_users_only
 async def toggle_sponsor_handler(_, query: CallbackQuery):
-    from bot.db_funcs.text import get_sponsor_enabled, set_sponsor_enabled
-    sponsor_enabled = await get_sponsor_enabled()
-    await set_sponsor_enabled(not sponsor_enabled)
+    sponsor_enabled = await toggle_sponsor_enabled()
     # Ambil data terbaru
     await helper_handlers.sponsor_text_init()
     await helper_handlers.sponsor_photo_init()
-    sponsor_enabled = await get_sponsor_enabled()
     text = f"""
 <b>📝 Sponsor Text</b>
-{helper_handlers.sponsor_text or '<i>Belum diatur</i>'}
+{format_template(helper_handlers.sponsor_template) or '<i>Belum diatur</i>'}
 
 <b>🖼️ Sponsor Photo</b>
 {helper_handlers.sponsor_photo or '<i>Belum diatur</i>'}
@@ -575,15 +611,22 @@ async def toggle_sponsor_handler(_, query: CallbackQuery):
 @Client.on_callback_query(filters.regex(r"menu dbchannel"))
 @authorized_users_only
 async def menu_dbchannel_handler_query(client: Client, query: CallbackQuery):
-    # Cek override di database
-    doc = await database.get_doc(int(config.BOT_TOKEN.split(":")[0]))
-    db_id = doc.get("DATABASE_CHAT_ID_OVERRIDE", [config.DATABASE_CHAT_ID])[0] if doc else config.DATABASE_CHAT_ID
-    try:
-        chat = await client.get_chat(db_id)
-        name = chat.title or chat.username or "-"
-    except Exception:
-        name = "<i>Tidak ditemukan</i>"
-    text = f"<b>🗄️ DB Channel</b>\nID: <code>{db_id}</code>\nNama: <b>{name}</b>"
+    # Semua DB Channel terdaftar; link lama tetap jalan walau channel sudah pensiun
+    lines = []
+    for i, db_id in enumerate(channel_registry.channels):
+        try:
+            chat = await get_chat(client, db_id)
+            name = chat.title or chat.username or "-"
+        except Exception:
+            name = "<i>Tidak ditemukan</i>"
+        status = "🔴 Pensiun" if db_id in channel_registry.retired else "🟢 Aktif"
+        stored = channel_registry.stored.get(db_id, 0)
+        lines.append(f"{i}. <code>{db_id}</code> - <b>{name}</b> ({status}, {stored} file)")
+
+    text = (
+        "<b>🗄️ DB Channel</b>\n"
+        "File baru disimpan bergiliran di semua channel aktif.\n\n" + "\n".join(lines)
+    )
     await query.message.edit_text(
         text,
         reply_markup=ikb(helper_buttons.DBChannel),
@@ -594,7 +637,7 @@ async def menu_dbchannel_handler_query(client: Client, query: CallbackQuery):
 @authorized_users_only
 async def update_dbchannel_handler(client: Client, query: CallbackQuery):
     await query.message.edit_text(
-        "Kirim ID channel baru!\n\n<b>Timeout:</b> 45s",
+        "Kirim ID channel yang mau ditambahkan!\n\n<b>Timeout:</b> 45s",
         reply_markup=ikb(helper_buttons.DBChannel_),
     )
     chat_id, user_id = query.message.chat.id, query.from_user.id
@@ -605,13 +648,15 @@ async def update_dbchannel_handler(client: Client, query: CallbackQuery):
     except Exception:
         await query.message.edit_text("<b>Proses dibatalkan atau ID tidak valid!</b>", reply_markup=ikb(helper_buttons.DBChannel_))
         return
-    # Validasi: pastikan bot admin di channel
+    # Validasi: pastikan bot admin di channel dan bisa posting
     try:
-        chat = await client.get_chat(new_id)
-        # Cek bot admin, dst...
-        await database.clear_value(int(config.BOT_TOKEN.split(":")[0]), "DATABASE_CHAT_ID_OVERRIDE")
-        await database.add_value(int(config.BOT_TOKEN.split(":")[0]), "DATABASE_CHAT_ID_OVERRIDE", new_id)
-        await query.message.edit_text(f"<b>DB Channel berhasil diganti ke:</b>\nID: <code>{new_id}</code>\nNama: <b>{chat.title or chat.username or '-'}</b>", reply_markup=ikb(helper_buttons.DBChannel_))
+        chat = await get_chat(client, new_id)
+        me = await client.get_chat_member(new_id, "me")
+        if not me.privileges or not me.privileges.can_post_messages:
+            raise Exception
+        await update_db_channel(new_id)
+        await channel_registry.load()
+        await query.message.edit_text(f"<b>DB Channel ditambahkan (index {channel_registry.index(new_id)}):</b>\nID: <code>{new_id}</code>\nNama: <b>{chat.title or chat.username or '-'}</b>", reply_markup=ikb(helper_buttons.DBChannel_))
     except Exception:
         await query.message.edit_text("<b>Gagal! Pastikan bot admin di channel tersebut.</b>", reply_markup=ikb(helper_buttons.DBChannel_))
 
@@ -619,22 +664,27 @@ async def update_dbchannel_handler(client: Client, query: CallbackQuery):
 @Client.on_callback_query(filters.regex(r"reset dbchannel"))
 @authorized_users_only
 async def reset_dbchannel_handler(_, query: CallbackQuery):
-    await database.clear_value(int(config.BOT_TOKEN.split(":")[0]), "DATABASE_CHAT_ID_OVERRIDE")
-    await query.message.edit_text("<b>DB Channel direset ke default dari config!</b>", reply_markup=ikb(helper_buttons.DBChannel_))
+    await del_db_channel()
+    await channel_registry.load()
+    await query.message.edit_text("<b>DB Channel direset ke default dari config!</b>\nChannel lain dipensiunkan, link lama tetap jalan.", reply_markup=ikb(helper_buttons.DBChannel_))
 
 
 @Client.on_callback_query(filters.regex(r"menu custom_caption"))
 @authorized_users_only
 async def menu_custom_caption_handler(_, query: CallbackQuery):
     enabled = await get_custom_caption_enabled()
-    template = await get_custom_caption_text()
+    template = helper_handlers.caption_template
     status = "🟢 Aktif" if enabled else "🔴 Nonaktif"
+    if template.errors:
+        shown = format_template(template)
+    else:
+        shown = f"<code>{escape(template.source) or 'Belum diatur'}</code>"
     text = f"""
 <b>📝 Custom Caption</b>
 Status: <b>{status}</b>
 
 Template:
-<code>{template or 'Belum diatur'}</code>
+{shown}
 
 <b>Placeholder yang bisa digunakan:</b>
 - <code>{{original_caption}}</code> = Caption asli file (jika ada)
@@ -672,7 +722,15 @@ async def update_custom_caption_handler(client: Client, query: CallbackQuery):
     except Exception:
         await query.message.edit_text("<b>Proses dibatalkan!</b>", reply_markup=ikb(helper_buttons.CustomCaption_))
         return
+    template = Template(new_caption, CAPTION_FIELDS)
+    if not new_caption or template.errors:
+        await query.message.edit_text(
+            template_error_text(template, CAPTION_FIELDS),
+            reply_markup=ikb(helper_buttons.CustomCaption_),
+        )
+        return
     await set_custom_caption_text(new_caption)
+    await helper_handlers.custom_caption_init()
     await query.message.edit_text("<b>Custom caption berhasil diubah!</b>", reply_markup=ikb(helper_buttons.CustomCaption_))
 
 
@@ -680,15 +738,54 @@ async def update_custom_caption_handler(client: Client, query: CallbackQuery):
 @authorized_users_only
 async def delete_custom_caption_handler(_, query: CallbackQuery):
     await del_custom_caption_text()
+    await helper_handlers.custom_caption_init()
     await query.message.edit_text("<b>Custom caption berhasil dihapus!</b>", reply_markup=ikb(helper_buttons.CustomCaption_))
 
 
 @Client.on_callback_query(filters.regex(r"toggle custom_caption"))
 @authorized_users_only
 async def toggle_custom_caption_handler(_, query: CallbackQuery):
-    enabled = await get_custom_caption_enabled()
-    await set_custom_caption_enabled(not enabled)
+    await toggle_custom_caption_enabled()
     # Langsung refresh menu custom caption tanpa pesan konfirmasi
     await menu_custom_caption_handler(_, query)
 
 
+@Client.on_callback_query(filters.regex(r"menu pagesize"))
+@authorized_users_only
+async def menu_pagesize_handler(_, query: CallbackQuery):
+    page_size = await get_delivery_page_size()
+    current = f"<code>{page_size}</code> pesan" if page_size else "<code>Semua</code> sekaligus"
+    text = f"""
+<b>📄 Delivery Page</b>
+Per halaman: <b>{current}</b>
+
+Link batch yang lebih panjang dikirim per halaman, dengan tombol <b>Next Page</b> untuk melanjutkan.
+Kirim <code>0</code> untuk mengirim semua pesan sekaligus.
+"""
+    await query.message.edit_text(text, reply_markup=ikb(helper_buttons.PageSize))
+
+
+@Client.on_callback_query(filters.regex(r"update pagesize"))
+@authorized_users_only
+async def update_pagesize_handler(client: Client, query: CallbackQuery):
+    await query.message.edit_text(
+        "Kirim jumlah pesan per halaman (0 = semua)!\n\n<b>Timeout:</b> 45s",
+        reply_markup=ikb(helper_buttons.Cancel),
+    )
+    chat_id, user_id = query.message.chat.id, query.from_user.id
+    try:
+        listening = await client.listen(chat_id=chat_id, user_id=user_id, timeout=45)
+        await listening.delete()
+        page_size = int(listening.text)
+        if page_size < 0:
+            raise ValueError
+    except Exception:
+        await query.message.edit_text("<b>Proses dibatalkan atau angka tidak valid!</b>", reply_markup=ikb(helper_buttons.PageSize_))
+        return
+
+    await update_delivery_page_size(page_size)
+    logger.info(f"Delivery Page Size: {page_size}")
+    await query.message.edit_text(
+        f"<b>Delivery Page berhasil diubah:</b> <code>{page_size or 'Semua'}</code>",
+        reply_markup=ikb(helper_buttons.PageSize_),
+    )
@@ -1,31 +1,49 @@
+from html import escape
+
 from hydrogram import Client, errors, filters
 from hydrogram.helpers import ikb
-from hydrogram.types import Message, User
+from hydrogram.types import CallbackQuery, Message, User
 from hydrogram.enums import ParseMode
 
 from bot import (
-    add_user,
     admin_buttons,
     config,
+    delivery_engine,
     helper_buttons,
+    Template,
     helper_handlers,
     join_buttons,
+    media_cache,
+    tombstones,
+    user_registry,
 )
+from bot.db_funcs import add_page_code, get_delivery_page_size, get_page_code
 from bot.db_funcs.text import get_sponsor_enabled, get_start_photo_msg, get_force_photo_msg
-from bot.utils import get_active_db_channel
+from bot.utils import get_histogram
+
+start_latency = get_histogram("/start")
 
 
 @Client.on_message(filters.private & filters.command("start"))
 async def start_handler(client: Client, message: Message) -> None:
+    with start_latency.time():
+        await start_message(client, message)
+
+
+async def start_message(client: Client, message: Message) -> None:
     user = message.from_user
-    await add_user(user.id)
+    user_registry.add(user.id)  # Buffered, written in the background
 
-    # Ambil di dalam handler, agar selalu update
-    text_sponsor = await helper_handlers.sponsor_text_init()
-    photo_sponsor = await helper_handlers.sponsor_photo_init()
+    # Parsed when set (and refreshed by the settings listener), not per request
+    text_sponsor = helper_handlers.sponsor_text
+    if text_sponsor and text_sponsor != "0":
+        text_sponsor = format_text_message(helper_handlers.sponsor_template, user)
+    photo_sponsor = helper_handlers.sponsor_photo
 
-    start_text = format_text_message(helper_handlers.start_text, user)
-    user_buttons = await join_buttons(client, message, user.id)
+    start_text = format_text_message(helper_handlers.start_template, user)
+    # Resolved once and shared by the join buttons and the force-sub gate
+    no_join_ids = await helper_handlers.user_is_not_join(user.id)
+    user_buttons = await join_buttons(client, message, user.id, no_join_ids)
 
     # Ambil photo start dan force
     start_photo = await get_start_photo_msg()
@@ -34,9 +52,11 @@ async def start_handler(client: Client, message: Message) -> None:
     if len(message.command) == 1:
         buttons = admin_buttons() if user.id in helper_handlers.admins else user_buttons
         if start_photo:
-            await client.send_photo(
-                chat_id=user.id,
-                photo=start_photo,
+            await media_cache.send_photo(
+                client,
+                user.id,
+                "START_PHOTO",
+                start_photo,
                 caption=start_text,
                 parse_mode=ParseMode.HTML,
                 reply_markup=buttons
@@ -44,12 +64,14 @@ async def start_handler(client: Client, message: Message) -> None:
         else:
             await message.reply_text(start_text, quote=True, reply_markup=buttons)
     else:
-        force_text = format_text_message(helper_handlers.force_text, user)
-        if await helper_handlers.user_is_not_join(user.id):
+        force_text = format_text_message(helper_handlers.force_template, user)
+        if no_join_ids:
             if force_photo:
-                await client.send_photo(
-                    chat_id=user.id,
-                    photo=force_photo,
+                await media_cache.send_photo(
+                    client,
+                    user.id,
+                    "FORCE_PHOTO",
+                    force_photo,
                     caption=force_text,
                     parse_mode=ParseMode.HTML,
                     reply_markup=user_buttons
@@ -59,15 +81,7 @@ async def start_handler(client: Client, message: Message) -> None:
             return
 
         try:
-            message_ids = helper_handlers.decode_data(message.command[1])
-            db_channel_id = await get_active_db_channel()
-            msgs = await client.get_messages(db_channel_id, message_ids)
-
-            for msg in msgs:
-                if not msg.empty:
-                    await msg.copy(
-                        user.id, protect_content=helper_handlers.protect_content
-                    )
+            await deliver_page(client, user.id, message.command[1], 0)
 
             # === Kirim sponsor (fleksibel) ===
             sponsor_enabled = await get_sponsor_enabled()
@@ -76,17 +90,16 @@ async def start_handler(client: Client, message: Message) -> None:
 
             if sponsor_enabled:
                 if photo_valid and text_valid:
-                    await client.send_photo(
-                        chat_id=user.id,
-                        photo=photo_sponsor,
+                    await media_cache.send_photo(
+                        client,
+                        user.id,
+                        "SPONSOR_PHOTO",
+                        photo_sponsor,
                         caption=text_sponsor,
                         parse_mode=ParseMode.HTML
                     )
                 elif photo_valid:
-                    await client.send_photo(
-                        chat_id=user.id,
-                        photo=photo_sponsor
-                    )
+                    await media_cache.send_photo(client, user.id, "SPONSOR_PHOTO", photo_sponsor)
                 elif text_valid:
                     await client.send_message(
                         chat_id=user.id,
@@ -99,6 +112,77 @@ async def start_handler(client: Client, message: Message) -> None:
             pass
 
 
+async def deliver_page(client: Client, user_id: int, code: str, offset: int) -> None:
+    decoded = await helper_handlers.decode_data(code)
+    if not decoded:
+        await client.send_message(user_id, "<b>This link is invalid.</b>")
+        return
+
+    db_channel_id, message_ids = decoded
+    page_size = await get_delivery_page_size() or len(message_ids)
+
+    # Streams 200-ID pages, so large ranges never sit in memory at once
+    page_ids = message_ids[offset : offset + page_size]
+    sent = await delivery_engine.deliver(
+        user_id,
+        db_channel_id,
+        page_ids,
+        protect_content=helper_handlers.protect_content,
+    )
+    tombstones.report_link(code, len(page_ids) - sent)
+
+    next_offset = offset + page_size
+    if next_offset >= len(message_ids):
+        if not sent:
+            await client.send_message(user_id, "<b>This content is no longer available.</b>")
+        return
+
+    # An emptied page must not hide the live content on the pages after it
+    if sent:
+        text = f"<b>Showing {offset + 1}-{next_offset} of {len(message_ids)} messages.</b>"
+    else:
+        text = (
+            f"<b>Messages {offset + 1}-{next_offset} of {len(message_ids)} "
+            "are no longer available.</b>"
+        )
+    await client.send_message(
+        user_id,
+        text,
+        reply_markup=ikb([[("Next Page »", await page_callback_data(code, next_offset))]]),
+    )
+
+
+async def page_callback_data(code: str, offset: int) -> str:
+    data = f"page {offset} {code}"
+    # Telegram caps callback data at 64 bytes; long codes are stored instead
+    if len(data.encode()) > 64:
+        data = f"page {offset} #{await add_page_code(code)}"
+    return data
+
+
+# Runs before the other callback handlers, whose patterns could match inside a code
+@Client.on_callback_query(filters.regex(r"^page \d+ \S+$"), group=-1)
+async def next_page_handler(client: Client, query: CallbackQuery) -> None:
+    _, offset, code = query.data.split()
+    user_id = query.from_user.id
+
+    if code.startswith("#"):
+        code = await get_page_code(code[1:])
+    if not code:
+        await query.answer("This link has expired.", show_alert=True)
+    elif await helper_handlers.user_is_not_join(user_id):
+        await query.answer("Join the required chats first, then try again.", show_alert=True)
+    else:
+        await query.answer()
+        await query.message.edit_reply_markup(None)
+        try:
+            await deliver_page(client, user_id, code, int(offset))
+        except errors.RPCError:
+            pass
+
+    query.stop_propagation()
+
+
 @Client.on_message(filters.private & filters.command("privacy"))
 async def privacy_handler(client: Client, message: Message) -> None:
     privacy_policy = f"""
@@ -150,13 +234,14 @@ This Privacy Policy explains how we collect, use, and protect your information w
     )
 
 
-def format_text_message(text: str, user: User) -> str:
-    first_name, last_name = user.first_name, user.last_name
-    full_name = f"{first_name} {last_name}".strip() if last_name else first_name
+def format_text_message(template: Template, user: User) -> str:
+    first_name, last_name = user.first_name or "", user.last_name or ""
+    full_name = f"{first_name} {last_name}".strip()
 
-    return text.format(
-        first_name=first_name,
-        last_name=last_name,
-        full_name=full_name,
-        mention=user.mention(full_name),
-    )
+    # Names are user input; escape them so they cannot break the HTML
+    return template.render({
+        "first_name": escape(first_name),
+        "last_name": escape(last_name),
+        "full_name": escape(full_name),
+        "mention": user.mention(full_name),
+    })
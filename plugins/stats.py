@@ -6,12 +6,20 @@ from hydrogram.types import CallbackQuery, Message
 
 from bot import (
     authorized_users_only,
+    channel_registry,
     config,
-    get_users,
+    delivery_engine,
     helper_buttons,
     helper_handlers,
     logger,
+    media_cache,
+    member_index,
+    message_cache,
+    message_index,
+    tombstones,
+    user_registry,
 )
+from bot.utils import histograms, single_flight
 
 startup_date = datetime.datetime.now()
 
@@ -23,20 +31,78 @@ async def log_handler(_, message: Message) -> None:
     await message.reply_document("logs.txt", quote=True)
 
 
+@Client.on_message(
+    filters.private & filters.user(config.OWNER_ID) & filters.command("metrics")
+)
+async def metrics_handler(_, message: Message) -> None:
+    latencies = "\n".join(
+        f"  - <code>{histogram.summary()}</code>" for histogram in histograms.values()
+    )
+    policy = "Fail-Open" if config.FSUB_FAIL_OPEN else "Fail-Closed"
+    cache = helper_handlers.membership_cache
+    engine = delivery_engine
+
+    await message.reply_text(
+        "<b>Latency (ms):</b>\n"
+        f"{latencies or '  - No Data'}\n\n"
+        "<b>Force-Sub Checks:</b>\n"
+        f"  - <code>Failed:</code> {helper_handlers.fsub_failures} ({policy})\n"
+        f"  - <code>Limit :</code> {config.FSUB_CHECK_CONCURRENCY} Concurrent, "
+        f"{config.FSUB_CHECK_TIMEOUT:g} s Timeout\n\n"
+        "<b>Membership Cache:</b>\n"
+        f"  - <code>Entries:</code> {len(cache)} / {cache.maxsize}\n"
+        f"  - <code>Hits   :</code> {cache.hits} ({cache.hit_rate:.1%})\n"
+        f"  - <code>Evicted:</code> {cache.evictions} (Expired {cache.expirations})\n\n"
+        "<b>Member Index:</b>\n"
+        f"  - <code>Entries:</code> {len(member_index)}\n"
+        f"  - <code>Hits   :</code> {member_index.hits} (Misses {member_index.misses})\n\n"
+        "<b>Delivery:</b>\n"
+        f"  - <code>Links   :</code> {engine.deliveries} ({engine.messages} Messages)\n"
+        f"  - <code>RPCs    :</code> {engine.rpcs} (Last {engine.last_rpcs})\n"
+        f"  - <code>Saved   :</code> {engine.saved} RPCs ({engine.albums} Albums Intact)\n"
+        f"  - <code>Fallback:</code> {engine.fallbacks} Chunks\n"
+        f"  - <code>Pages   :</code> {engine.fetcher.pages} "
+        f"({engine.fetcher.skipped} Empty Skipped)\n\n"
+        "<b>Message Cache:</b>\n"
+        f"  - <code>Entries:</code> {len(message_cache)} / {message_cache.entries.maxsize}\n"
+        f"  - <code>Hits   :</code> {message_cache.entries.hits} "
+        f"({message_cache.entries.hit_rate:.1%})\n"
+        f"  - <code>Dropped:</code> {message_cache.invalidations} Edited/Deleted, "
+        f"{message_cache.entries.evictions} Evicted\n\n"
+        "<b>Message Index:</b>\n"
+        f"  - <code>Hits   :</code> {message_index.hits} (Misses {message_index.misses})\n"
+        f"  - <code>Deleted:</code> {len(tombstones)} Known, {tombstones.skipped} Skipped\n"
+        f"  - <code>Links  :</code> {len(tombstones.links)} Hit Missing Content\n\n"
+        "<b>DB Channels:</b>\n"
+        f"  - <code>Active :</code> {len(channel_registry.active)} / {len(channel_registry)}\n"
+        f"  - <code>Stored :</code> {sum(channel_registry.stored.values())} Files\n\n"
+        "<b>Photos:</b>\n"
+        f"  - <code>By file_id:</code> {media_cache.hits} ({media_cache.uploads} Uploads)\n\n"
+        "<b>Coalescing:</b>\n"
+        f"  - <code>Calls    :</code> {single_flight.calls} ({len(single_flight)} In Flight)\n"
+        f"  - <code>Coalesced:</code> {single_flight.coalesced} Waiters",
+        quote=True,
+    )
+
+
 @Client.on_message(filters.private & filters.command("users"))
 @authorized_users_only
 async def users_handler(_, message: Message) -> None:
     counting_message = await message.reply_text("<b>Counting...</b>", quote=True)
 
     try:
-        all_users = await get_users()
-        bot_users = [user for user in all_users if user not in helper_handlers.admins]
+        all_users = user_registry.known
+        admin_users = sum(admin in all_users for admin in helper_handlers.admins)
 
         msg_users = (
             "<b>Bot Users:</b>\n"
-            f"  - <code>Users :</code> {len(bot_users)}\n"
+            f"  - <code>Users :</code> {len(all_users) - admin_users}\n"
             f"  - <code>Admins:</code> {len(helper_handlers.admins)}\n\n"
-            f"<b>Total:</b> {len(all_users)} Users"
+            f"<b>Total:</b> {len(all_users)} Users\n\n"
+            "<b>Write-Behind:</b>\n"
+            f"  - <code>Pending:</code> {user_registry.depth} (Max {user_registry.max_depth})\n"
+            f"  - <code>Flush  :</code> {user_registry.last_flush_ms:.1f} ms\n"
+            f"  - <code>Index  :</code> {all_users.nbytes / 1024 / 1024:.1f} MiB"
         )
         await counting_message.edit_text(msg_users)
     except Exception as exc:
@@ -44,6 +110,26 @@ async def users_handler(_, message: Message) -> None:
         await counting_message.edit_text("<b>An Error Occurred!</b>")
 
 
+@Client.on_message(filters.private & filters.command("deadlinks"))
+@authorized_users_only
+async def deadlinks_handler(client: Client, message: Message) -> None:
+    worst_links = tombstones.worst_links(10)
+    if not worst_links:
+        await message.reply_text("<b>No Links Hit Missing Content.</b>", quote=True)
+        return
+
+    lines = [
+        f"{i}. <code>https://t.me/{client.me.username}?start={code}</code>\n"
+        f"  - <code>Opened :</code> {hits}x ({missing} Messages Missing)"
+        for i, (code, hits, missing) in enumerate(worst_links, 1)
+    ]
+    await message.reply_text(
+        "<b>Links Hitting Missing Content:</b>\n\n" + "\n".join(lines),
+        quote=True,
+        disable_web_page_preview=True,
+    )
+
+
 @Client.on_message(filters.private & filters.command("uptime"))
 async def uptime_handler(_, message: Message) -> None:
     uptime_text = uptime_func()
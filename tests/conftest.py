@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The bot reads its configuration when imported; BOT_ID comes from the token
+os.environ.setdefault("BOT_TOKEN", "12345:test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
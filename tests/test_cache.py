@@ -0,0 +1,90 @@
+import pytest
+
+from bot.utils import cache as cache_module
+from bot.utils.cache import TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_get_and_set(clock):
+    cache = TTLCache(10)
+    cache.set("a", 1, ttl=5)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", 2) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_rate == pytest.approx(1 / 3)
+
+
+def test_entries_expire(clock):
+    cache = TTLCache(10)
+    cache.set("a", 1, ttl=5)
+    cache.set("b", 2, ttl=60)
+    clock.now += 5
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.expirations == 1
+    assert len(cache) == 1
+
+
+def test_set_renews_the_ttl(clock):
+    cache = TTLCache(10)
+    cache.set("a", 1, ttl=5)
+    clock.now += 4
+    cache.set("a", 2, ttl=5)
+    clock.now += 4
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = TTLCache(2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_overwrite_does_not_evict(clock):
+    cache = TTLCache(2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.set("a", 3, ttl=60)
+    assert len(cache) == 2 and cache.evictions == 0
+
+
+def test_falsy_values_are_cached(clock):
+    cache = TTLCache(10)
+    cache.set("a", 0, ttl=60)
+    cache.set("b", False, ttl=60)
+    assert cache.get("a", "missing") == 0
+    assert cache.get("b", "missing") is False
+
+
+def test_pop_and_clear(clock):
+    cache = TTLCache(10)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_hit_rate_without_lookups():
+    assert TTLCache(1).hit_rate == 0.0
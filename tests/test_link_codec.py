@@ -0,0 +1,205 @@
+import base64
+
+import pytest
+
+from bot.helpers.channel_registry import ChannelRegistry
+from bot.helpers.link_codec import LinkCodec, ManifestRef
+from bot.utils import config
+
+CHANNEL = -1001234567890
+OTHER_CHANNEL = -1009876543210
+UNREGISTERED = -1005555555555
+
+
+@pytest.fixture
+def codec() -> LinkCodec:
+    registry = ChannelRegistry()
+    registry.channels = [CHANNEL, OTHER_CHANNEL]
+    return LinkCodec(registry)
+
+
+def payload(code: str) -> bytes:
+    return base64.urlsafe_b64decode(code + "=" * (-len(code) % 4))
+
+
+def to_code(data: bytes) -> str:
+    return LinkCodec.to_code(bytearray(data))
+
+
+def legacy_code(*numbers: int) -> str:
+    text = "id-" + "-".join(str(number) for number in numbers)
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 16_383, 16_384, 2**35])
+def test_varint_round_trip(value):
+    buffer = bytearray(b"\xff")
+    LinkCodec.write_varint(buffer, value)
+    assert LinkCodec.read_varint(bytes(buffer), 1) == (value, len(buffer))
+
+
+def test_varint_sizes():
+    for value, size in [(0, 1), (127, 1), (128, 2), (16_383, 2), (16_384, 3)]:
+        buffer = bytearray()
+        LinkCodec.write_varint(buffer, value)
+        assert len(buffer) == size
+
+
+def test_zigzag():
+    assert [LinkCodec.zigzag(value) for value in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+    for value in range(-1000, 1000):
+        assert LinkCodec.unzigzag(LinkCodec.zigzag(value)) == value
+
+
+def test_runs():
+    assert LinkCodec.runs([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 1), (9, 2)]
+    assert LinkCodec.runs([3, 2, 1]) == [(3, 1), (2, 1), (1, 1)]
+    assert LinkCodec.runs([]) == []
+
+
+def test_is_run():
+    assert LinkCodec.is_run(range(5, 10))
+    assert LinkCodec.is_run(range(10, 4, -1))
+    assert not LinkCodec.is_run(range(1, 10, 2))
+    assert LinkCodec.is_run([4, 5, 6])
+    assert LinkCodec.is_run([6, 5, 4])
+    assert not LinkCodec.is_run([4, 6, 5])
+    assert not LinkCodec.is_run([])
+
+
+@pytest.mark.parametrize(
+    "message_ids",
+    [
+        [48_213],
+        range(48_213, 48_713),
+        range(48_712, 48_212, -1),
+        [30, 29, 28, 27],
+        [*range(100, 140), *range(300, 320), 512, 777, *range(900, 950)],
+        [50, 10, 11, 12, 3],
+    ],
+)
+@pytest.mark.parametrize("chat_id", [CHANNEL, OTHER_CHANNEL, UNREGISTERED])
+def test_round_trip(codec, chat_id, message_ids):
+    decoded = codec.decode(codec.encode(chat_id, message_ids))
+    assert decoded is not None
+    assert decoded[0] == chat_id
+    assert list(decoded[1]) == list(message_ids)
+
+
+def test_backward_range_decodes_to_a_range(codec):
+    _, message_ids = codec.decode(codec.encode(CHANNEL, [30, 29, 28, 27]))
+    assert message_ids == range(30, 26, -1)
+
+
+def test_registered_channels_use_their_index(codec):
+    assert payload(codec.encode(CHANNEL, [1]))[:2] == bytes([LinkCodec.VERSION, 0])
+    assert payload(codec.encode(OTHER_CHANNEL, [1]))[:2] == bytes([LinkCodec.VERSION, 1])
+    assert payload(codec.encode(UNREGISTERED, [1]))[0] == LinkCodec.VERSION_CHANNEL_ID
+
+
+def test_channel_id_codes_for_the_configured_channel():
+    codec = LinkCodec(ChannelRegistry())
+    codec.registry.channels = []
+    code = codec.encode(config.DATABASE_CHAT_ID, [7])
+    assert payload(code)[:2] == bytes([LinkCodec.VERSION_CHANNEL_ID, 0])
+    assert codec.decode(code) == (config.DATABASE_CHAT_ID, [7])
+
+
+def test_manifest_round_trip(codec):
+    code = codec.encode_manifest(OTHER_CHANNEL, 123_456)
+    assert codec.decode(code) == (OTHER_CHANNEL, ManifestRef(123_456))
+
+
+def test_max_multi_ids_boundary(codec):
+    limit = LinkCodec.MAX_MULTI_IDS
+    scattered = list(range(1, 2 * limit + 3, 2))
+
+    decoded = codec.decode(codec.encode(CHANNEL, scattered[:limit]))
+    assert decoded is not None and decoded[1] == scattered[:limit]
+    with pytest.raises(ValueError):
+        codec.encode(CHANNEL, scattered[: limit + 1])
+
+    # Runs are expanded on decode, so their total is capped too
+    runs = [*range(1, 10), *range(20, limit + 11)]
+    assert codec.decode(codec.encode(CHANNEL, runs))[1] == runs
+    with pytest.raises(ValueError):
+        codec.encode(CHANNEL, [*range(1, 10), *range(20, limit + 12)])
+
+
+def test_long_runs_are_ranges(codec):
+    code = codec.encode(CHANNEL, list(range(20_000, 0, -1)))
+    assert payload(code)[2] == LinkCodec.KIND_RANGE
+    assert codec.decode(code)[1] == range(20_000, 0, -1)
+
+
+@pytest.mark.parametrize("chat_id", [CHANNEL, OTHER_CHANNEL])
+def test_legacy_single_for_each_candidate(codec, chat_id):
+    code = legacy_code(48_213 * abs(chat_id))
+    assert codec.decode(code, [CHANNEL, OTHER_CHANNEL]) == (chat_id, [48_213])
+    assert codec.decode(code, [OTHER_CHANNEL, CHANNEL]) == (chat_id, [48_213])
+
+
+@pytest.mark.parametrize("chat_id", [CHANNEL, OTHER_CHANNEL])
+def test_legacy_range_for_each_candidate(codec, chat_id):
+    forward = legacy_code(100 * abs(chat_id), 200 * abs(chat_id))
+    backward = legacy_code(200 * abs(chat_id), 100 * abs(chat_id))
+    candidates = [CHANNEL, OTHER_CHANNEL]
+    assert codec.decode(forward, candidates) == (chat_id, range(100, 201))
+    assert codec.decode(backward, candidates) == (chat_id, range(200, 99, -1))
+
+
+def test_legacy_defaults_to_the_configured_channel(codec):
+    code = legacy_code(7 * abs(config.DATABASE_CHAT_ID))
+    assert codec.decode(code) == (config.DATABASE_CHAT_ID, [7])
+
+
+def test_legacy_ids_are_exact_for_large_numbers(codec):
+    # Float division by the channel ID used to round these off
+    message_id = 2**40 + 1
+    code = legacy_code(message_id * abs(CHANNEL))
+    assert codec.decode(code, [CHANNEL]) == (CHANNEL, [message_id])
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        legacy_code(48_213 * abs(CHANNEL) + 1),
+        legacy_code(1, 2, 3),
+        base64.urlsafe_b64encode(b"id-abc").decode(),
+        base64.urlsafe_b64encode(b"id-").decode(),
+    ],
+)
+def test_legacy_invalid(codec, code):
+    assert codec.decode(code, [CHANNEL, OTHER_CHANNEL]) is None
+
+
+@pytest.mark.parametrize(
+    "message_ids",
+    [[48_213], range(100, 200), [1, 2, 3, 10, 20, 21], [5, 3]],
+)
+def test_truncated_payloads(codec, message_ids):
+    data = payload(codec.encode(CHANNEL, message_ids))
+    for end in range(len(data)):
+        assert codec.decode(to_code(data[:end])) is None
+
+
+def test_forged_payloads(codec):
+    valid = payload(codec.encode(CHANNEL, [48_213]))
+    assert codec.decode(to_code(bytes([9]) + valid[1:])) is None  # unknown version
+    assert codec.decode(to_code(valid[:2] + bytes([9]) + valid[3:])) is None  # unknown kind
+    assert codec.decode(to_code(valid + b"\x00")) is None  # trailing bytes
+    assert codec.decode(to_code(bytes([LinkCodec.VERSION, 5]) + valid[2:])) is None  # no index 5
+    assert codec.decode(to_code(valid[:-1] + b"\x80")) is None  # unterminated varint
+
+
+def test_forged_multi_cannot_expand_past_the_limit(codec):
+    buffer = bytearray([LinkCodec.VERSION, 0, LinkCodec.KIND_MULTI])
+    LinkCodec.write_varint(buffer, 1)
+    LinkCodec.write_varint(buffer, LinkCodec.zigzag(1))
+    LinkCodec.write_varint(buffer, 10**9)
+    assert codec.decode(LinkCodec.to_code(buffer)) is None
+
+
+@pytest.mark.parametrize("code", ["", "!!!", "a", "A"])
+def test_garbage(codec, code):
+    assert codec.decode(code) is None
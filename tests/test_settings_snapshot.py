@@ -0,0 +1,63 @@
+"""
+The settings snapshot on a scratch SQLite file.
+"""
+
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from bot.base.sqlite import SQLiteDatabase
+from bot.db_funcs.settings import SettingsSnapshot
+
+# `bot.db_funcs.settings` the attribute is the snapshot; this is the module
+settings_module = importlib.import_module("bot.db_funcs.settings")
+
+
+@pytest.fixture
+def snapshot(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[SettingsSnapshot]:
+    database = SQLiteDatabase(str(tmp_path / "settings.db"))
+    asyncio.run(database.connect())
+    monkeypatch.setattr(settings_module, "database", database)
+    yield SettingsSnapshot()
+    asyncio.run(database.close())
+
+
+def test_values_fill_in_defaults(snapshot: SettingsSnapshot) -> None:
+    values = asyncio.run(snapshot.values())
+
+    assert values == snapshot.FIELDS
+    assert (snapshot.hits, snapshot.misses) == (0, 1)
+
+
+def test_values_follow_writes(snapshot: SettingsSnapshot) -> None:
+    async def main() -> None:
+        await snapshot.load()
+        await snapshot.set_value("START_TEXT", "hello")
+        await snapshot.toggle_value("GENERATE_URL")
+        await snapshot.add_value("FSUB_CHATS", -100)
+
+        values = await snapshot.values()
+        assert values["START_TEXT"] == "hello"
+        assert values["GENERATE_URL"] is True
+        assert values["FSUB_CHATS"] == [-100]
+        assert values["PROTECT_CONTENT"] is False
+        assert (snapshot.hits, snapshot.misses) == (1, 0)
+
+    asyncio.run(main())
+
+
+def test_values_are_copies(snapshot: SettingsSnapshot) -> None:
+    async def main() -> None:
+        await snapshot.add_value("BOT_ADMINS", 1)
+        (await snapshot.values())["BOT_ADMINS"].append(2)
+        # The defaults are not shared either
+        (await snapshot.values())["FSUB_CHATS"].append(3)
+
+        assert await snapshot.get_value("BOT_ADMINS") == [1]
+        assert await snapshot.get_value("FSUB_CHATS") == []
+        assert snapshot.FIELDS["FSUB_CHATS"] == []
+
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Settings sync through a real change stream.
+
+Change streams need a replica set; a local single-node one is enough::
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+    MONGODB_REPLSET_URL="mongodb://localhost:27017/?replicaSet=rs0" \\
+        python -m pytest tests/test_settings_watch.py
+
+Each test uses a scratch collection in `FSUB_TEST`, dropped afterwards.
+"""
+
+import asyncio
+import importlib
+import os
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, List, Set, Tuple
+
+import pytest
+from async_pymongo import AsyncClient
+from pymongo.errors import AutoReconnect
+
+from bot.base.mongo import Database
+from bot.db_funcs.settings import SettingsSnapshot
+from bot.utils import BOT_ID
+
+# `bot.db_funcs.settings` the attribute is the snapshot; this is the module
+settings_module = importlib.import_module("bot.db_funcs.settings")
+
+URL = os.environ.get("MONGODB_REPLSET_URL")
+pytestmark = pytest.mark.skipif(not URL, reason="MONGODB_REPLSET_URL is not set")
+
+
+def connect(collection: str) -> Database:
+    """Opens a separate client, as another bot process would."""
+    database = Database()
+    database.client = AsyncClient(URL)
+    database.db = database.client["FSUB_TEST"][collection]
+    return database
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 10) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+async def start(
+    monkeypatch: pytest.MonkeyPatch, local: Database
+) -> Tuple[SettingsSnapshot, List[Set[str]], asyncio.Task]:
+    """Loads a snapshot on `local`, records its refreshes and starts watching."""
+    monkeypatch.setattr(settings_module, "database", local)
+    snapshot = SettingsSnapshot()
+    snapshot.RETRY_DELAY = 0.1
+    await snapshot.load(defaults={"START_TEXT": "", "FORCE_TEXT": ""})
+
+    refreshed: List[Set[str]] = []
+    refresh = snapshot.refresh
+
+    async def recording_refresh(keys=()):
+        refreshed.append(set(keys))
+        return await refresh(keys)
+
+    snapshot.refresh = recording_refresh
+    task = asyncio.create_task(snapshot.watch())
+    # The stream only sees changes made after it is open
+    await asyncio.sleep(1)
+    return snapshot, refreshed, task
+
+
+def run(test: Callable[[Database, Database], Awaitable[None]]) -> None:
+    async def main() -> None:
+        collection = f"SETTINGS_{uuid.uuid4().hex}"
+        local, remote = connect(collection), connect(collection)
+        try:
+            await test(local, remote)
+        finally:
+            await local.db.drop()
+
+    asyncio.run(main())
+
+
+def test_remote_write_refreshes_only_changed_keys(monkeypatch):
+    async def test(local: Database, remote: Database) -> None:
+        snapshot, refreshed, task = await start(monkeypatch, local)
+        changed: List[Set[str]] = []
+
+        async def listener(keys: Set[str]) -> None:
+            changed.append(keys)
+
+        snapshot.add_listener(listener)
+        await remote.set_value(int(BOT_ID), "START_TEXT", "from another process")
+        await wait_for(lambda: changed)
+        task.cancel()
+
+        assert refreshed == [{"START_TEXT", local.VERSION_KEY}]
+        assert changed == [{"START_TEXT"}]
+        assert await snapshot.get_value("START_TEXT") == "from another process"
+
+    run(test)
+
+
+def test_own_writes_are_not_refreshed(monkeypatch):
+    async def test(local: Database, remote: Database) -> None:
+        snapshot, refreshed, task = await start(monkeypatch, local)
+        await snapshot.set_value("FORCE_TEXT", "written here")
+        # A remote write afterwards marks the point the stream has reached
+        await remote.set_value(int(BOT_ID), "START_TEXT", "marker")
+        await wait_for(lambda: refreshed)
+        task.cancel()
+
+        assert refreshed == [{"START_TEXT", local.VERSION_KEY}]
+        assert not snapshot.written
+        assert await snapshot.get_value("FORCE_TEXT") == "written here"
+
+    run(test)
+
+
+def test_stream_reconnects_after_a_drop(monkeypatch):
+    async def test(local: Database, remote: Database) -> None:
+        watch_doc = local.watch_doc
+        opened = []
+
+        async def dropping_watch_doc(_id: int) -> AsyncIterator:
+            opened.append(_id)
+            async for change in watch_doc(_id):
+                if len(opened) == 1:
+                    raise AutoReconnect("connection dropped")
+                yield change
+
+        monkeypatch.setattr(local, "watch_doc", dropping_watch_doc)
+        snapshot, refreshed, task = await start(monkeypatch, local)
+
+        # Breaks the first stream; picked up by the check before reopening
+        await remote.set_value(int(BOT_ID), "START_TEXT", "during the drop")
+        await wait_for(lambda: len(opened) == 2)
+        await asyncio.sleep(1)
+        # Streamed by the reopened stream
+        await remote.set_value(int(BOT_ID), "FORCE_TEXT", "after the drop")
+        await wait_for(lambda: any("FORCE_TEXT" in keys for keys in refreshed))
+        task.cancel()
+
+        assert snapshot.streaming
+        assert await snapshot.get_value("START_TEXT") == "during the drop"
+        assert await snapshot.get_value("FORCE_TEXT") == "after the drop"
+
+    run(test)
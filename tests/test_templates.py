@@ -0,0 +1,102 @@
+import pytest
+
+from bot.helpers.templates import CAPTION_FIELDS, USER_FIELDS, Template
+
+
+def test_placeholders_are_rendered():
+    template = Template("Hi {first_name} ({mention})!", USER_FIELDS)
+    assert not template.errors
+    assert template.fields == ["first_name", "mention"]
+    assert template.render({"first_name": "Ana", "mention": "@ana"}) == "Hi Ana (@ana)!"
+
+
+def test_placeholder_names_may_be_padded():
+    template = Template("{ first_name }", USER_FIELDS)
+    assert not template.errors
+    assert template.render({"first_name": "Ana"}) == "Ana"
+
+
+def test_missing_values_render_empty():
+    template = Template("{original_caption}\n{link_file}", CAPTION_FIELDS)
+    assert template.render({"link_file": "https://t.me/x"}) == "\nhttps://t.me/x"
+
+
+def test_values_are_not_parsed_again():
+    template = Template("{first_name}", USER_FIELDS)
+    assert template.render({"first_name": "{last_name} }{"}) == "{last_name} }{"
+
+
+def test_escaped_braces():
+    template = Template("{{first_name}} is {first_name}, }} {{", USER_FIELDS)
+    assert not template.errors
+    assert template.fields == ["first_name"]
+    assert template.render({"first_name": "Ana"}) == "{first_name} is Ana, } {"
+
+
+def test_unknown_placeholder():
+    template = Template("Hi {username}", USER_FIELDS)
+    assert template.errors == ["Placeholder {username} tidak dikenal"]
+    assert template.fields == []
+
+
+def test_placeholders_depend_on_the_kind_of_template():
+    assert Template("{mention}", USER_FIELDS).errors == []
+    assert Template("{mention}", CAPTION_FIELDS).errors
+
+
+@pytest.mark.parametrize("source, brace", [("Hi {", "{"), ("Hi }", "}"), ("{a{b}", "{")])
+def test_stray_brace(source, brace):
+    template = Template(source, USER_FIELDS)
+    assert f"Kurung kurawal {brace} tanpa pasangan" in template.errors
+
+
+@pytest.mark.parametrize(
+    "source, error",
+    [
+        ("<b>bold", "Tag <b> tidak ditutup"),
+        ("bold</b>", "Tag penutup </b> tanpa pasangan"),
+        ("<b><i>x</b></i>", "Tag penutup </b> tanpa pasangan"),
+        ("<div>x</div>", "Tag <div> tidak didukung Telegram"),
+        ("1 < 2", "Karakter < atau > harus ditulis &lt; / &gt;"),
+        ("2 > 1", "Karakter < atau > harus ditulis &lt; / &gt;"),
+    ],
+)
+def test_invalid_html(source, error):
+    assert error in Template(source, USER_FIELDS).errors
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        '<b>Hi</b> <a href="https://t.me/x">{first_name}</a>',
+        "<blockquote>{mention}</blockquote> 1 &lt; 2 &amp; more",
+        '<tg-spoiler>x</tg-spoiler><span class="tg-spoiler">y</span>',
+    ],
+)
+def test_valid_html(source):
+    assert Template(source, USER_FIELDS).errors == []
+
+
+def test_placeholders_are_ignored_by_the_html_check():
+    # A value may hold "<", but the placeholder itself is not HTML
+    assert Template("<b>{mention}</b>", USER_FIELDS).errors == []
+
+
+def test_invalid_template_still_renders_its_text():
+    template = Template("Hi {username} {first_name} {", USER_FIELDS)
+    assert len(template.errors) == 2
+    assert template.render({"first_name": "Ana"}) == "Hi {username} Ana {"
+
+
+def test_describe_errors():
+    template = Template("{x} }", USER_FIELDS)
+    assert template.describe_errors() == (
+        "- Placeholder {x} tidak dikenal\n- Kurung kurawal } tanpa pasangan"
+    )
+
+
+def test_empty_template():
+    template = Template("", USER_FIELDS)
+    assert not template
+    assert template.render({}) == ""
+    assert Template(None, USER_FIELDS).source == ""
@@ -0,0 +1,106 @@
+import random
+from array import array
+
+import pytest
+
+from bot.helpers.user_index import UserIndex
+
+
+@pytest.fixture
+def index(monkeypatch) -> UserIndex:
+    # A small threshold exercises compaction on every few changes
+    monkeypatch.setattr(UserIndex, "COMPACT_THRESHOLD", 4)
+    return UserIndex([5, 1, 9, 3, 3])
+
+
+def test_unsorted_input_is_sorted_and_deduplicated(index):
+    assert list(index) == [1, 3, 5, 9]
+    assert len(index) == 4
+
+
+def test_sorted_array_is_kept_as_is():
+    ids = array("q", [1, 2, 3])
+    assert UserIndex(ids)._ids is ids
+
+
+def test_membership(index):
+    assert 3 in index and 9 in index
+    assert 0 not in index and 4 not in index and 10 not in index
+
+
+def test_add(index):
+    assert index.add(4) is True
+    assert index.add(4) is False
+    assert index.add(5) is False
+    assert list(index) == [1, 3, 4, 5, 9]
+
+
+def test_discard(index):
+    index.discard(3)
+    index.discard(3)
+    index.discard(100)
+    assert 3 not in index
+    assert list(index) == [1, 5, 9]
+    assert len(index) == 3
+
+
+def test_add_after_discard(index):
+    index.discard(5)
+    assert index.add(5) is True
+    assert 5 in index and len(index) == 4
+
+
+def test_discard_after_add(index):
+    index.add(7)
+    index.discard(7)
+    assert 7 not in index and len(index) == 4
+
+
+def test_merge(index):
+    assert index.merge([2, 3, 10, 2]) == 2
+    assert list(index) == [1, 2, 3, 5, 9, 10]
+    assert not index._added and not index._removed
+
+
+def test_compact_keeps_contents(index):
+    index.add(0)
+    index.add(11)
+    index.discard(1)
+    index.discard(9)
+    index.compact()
+    assert list(index._ids) == [0, 3, 5, 11]
+    assert list(index) == [0, 3, 5, 11]
+
+
+def test_iteration_is_unaffected_by_changes(index):
+    seen = []
+    for user_id in index:
+        seen.append(user_id)
+        index.add(user_id + 100)
+        index.discard(user_id)
+    assert seen == [1, 3, 5, 9]
+
+
+def test_empty():
+    index = UserIndex()
+    assert list(index) == [] and len(index) == 0 and 1 not in index
+    index.discard(1)
+    assert index.add(1) and list(index) == [1]
+
+
+def test_matches_a_set_under_random_changes(index):
+    rng = random.Random(7)
+    model = {1, 3, 5, 9}
+    for _ in range(5000):
+        user_id = rng.randrange(-50, 200)
+        if rng.random() < 0.6:
+            assert index.add(user_id) is (user_id not in model)
+            model.add(user_id)
+        else:
+            index.discard(user_id)
+            model.discard(user_id)
+        assert (user_id in index) is (user_id in model)
+        assert len(index) == len(model)
+    assert list(index) == sorted(model)
+    index.compact()
+    assert list(index._ids) == sorted(model)